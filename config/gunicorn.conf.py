@@ -0,0 +1,93 @@
+"""
+Gunicorn configuration for production serving.
+
+    gunicorn -c config/gunicorn.conf.py
+
+The app and the embedding model are loaded once in the master process
+(``preload_app``) and inherited by the workers copy-on-write, so the model
+weights are resident once per node instead of once per worker. Each worker
+builds its RAG engine, and with it the ChromaDB and Gemini clients, after fork.
+
+Environment variables:
+    SERVER_MODE              wsgi (gthread workers, default) or asgi (uvicorn workers)
+    WEB_CONCURRENCY          number of worker processes (default: 2)
+    GUNICORN_THREADS         threads per worker in wsgi mode (default: 4)
+    WORKER_TORCH_THREADS     torch / BLAS threads per worker (default: 1)
+    GUNICORN_MAX_REQUESTS    recycle a worker after this many requests (default: 1000, 0 = off)
+    GUNICORN_TIMEOUT         worker timeout in seconds (default: 120)
+    PRELOAD_ENGINE           load the embedding model in the master (default: True)
+"""
+import gc
+import os
+
+# BLAS / OpenMP read these once at import, so they must be set before numpy or
+# torch are loaded by the preloaded app.
+WORKER_TORCH_THREADS = int(os.getenv('WORKER_TORCH_THREADS', '1'))
+for _var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS'):
+    os.environ.setdefault(_var, str(WORKER_TORCH_THREADS))
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+preload_app = True
+
+# Graceful recycling: workers restart after a jittered number of requests and
+# get graceful_timeout seconds to finish in-flight requests.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = max(max_requests // 10, 0)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    """Load the embedding model in the master once the app has been preloaded."""
+    if os.getenv('PRELOAD_ENGINE', 'True') != 'True':
+        return
+
+    try:
+        # Only the model: the engine's clients import chromadb, whose
+        # onnxruntime state crashes workers that inherit it when they exit.
+        from rag.services.rag_engine import preload_embedding_model
+        preload_embedding_model()
+        server.log.info('Embedding model preloaded in master')
+    except Exception as e:
+        # Workers will load it lazily on the first request
+        server.log.warning(f'Embedding model preload failed: {e}')
+
+    # Move everything allocated so far out of the GC's reach, so collections in
+    # the workers do not touch (and un-share) the inherited pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Per-worker setup: thread caps and the engine on the preloaded model."""
+    import sys
+
+    if 'torch' in sys.modules:
+        import torch
+        torch.set_num_threads(WORKER_TORCH_THREADS)
+
+    if os.getenv('PRELOAD_ENGINE', 'True') != 'True':
+        return
+
+    from rag.services.rag_engine import get_rag_engine
+    try:
+        get_rag_engine()
+    except Exception as e:
+        # Retried lazily on the first request
+        server.log.warning(f'Worker {worker.pid} could not create the RAG engine: {e}')
@@ -172,14 +172,76 @@ REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
 # RAG Parameters
 CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', '1000'))
 CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', '100'))
+# 'patent' (Chinese-aware splitter) or 'recursive' (LangChain RecursiveCharacterTextSplitter)
+TEXT_SPLITTER = os.getenv('TEXT_SPLITTER', 'patent')
+# Document processing pool: worker processes (0 = one per CPU, 1 = serial) and
+# documents sent to a worker per task
+PROCESS_WORKERS = int(os.getenv('PROCESS_WORKERS', '0'))
+PROCESS_BATCH_SIZE = int(os.getenv('PROCESS_BATCH_SIZE', '32'))
+# TIPO XML parsing pool: worker processes (0 = one per CPU, 1 = serial) and
+# files sent to a worker per task
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '0'))
+PARSE_BATCH_SIZE = int(os.getenv('PARSE_BATCH_SIZE', '16'))
+# Parsed patents ({section}_docs.jsonl): '' (plain JSON lines) or 'zstd'
+# ({section}_docs.jsonl.zst, needs the zstandard package)
+PATENTS_COMPRESSION = os.getenv('PATENTS_COMPRESSION', '')
+# Chunks at least this similar (MinHash estimate of shingle Jaccard) to an
+# earlier chunk of the section are marked duplicates and not embedded; 0 disables
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.9'))
 TOP_K_RESULTS = int(os.getenv('TOP_K_RESULTS', '5'))
+
+# Index build pipeline
+INDEX_BATCH_SIZE = int(os.getenv('INDEX_BATCH_SIZE', '100'))
+INDEX_WRITERS = int(os.getenv('INDEX_WRITERS', '4'))
+INDEX_QUEUE_SIZE = int(os.getenv('INDEX_QUEUE_SIZE', '4'))
+
+# Blue/green rebuilds: how long queries may keep a resolved alias, and how long
+# a replaced collection version is kept before it is deleted
+ALIAS_CACHE_SECONDS = float(os.getenv('ALIAS_CACHE_SECONDS', '30'))
+INDEX_GC_GRACE_SECONDS = float(os.getenv('INDEX_GC_GRACE_SECONDS', '3600'))
+
+# Index sharding: 'year' (section + publication year) or 'section'; applies
+# to new index versions (build_index --rebuild)
+INDEX_SHARD_BY = os.getenv('INDEX_SHARD_BY', 'year')
+SHARD_QUERY_WORKERS = int(os.getenv('SHARD_QUERY_WORKERS', '8'))
 MAX_PAGES_TO_SCRAPE = int(os.getenv('MAX_PAGES_TO_SCRAPE', '200'))
 
+# Embedding model registry (populate with `manage.py download_models`)
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+EMBEDDING_MODELS = {
+    # name -> hub repo and the revision pinned by download_models
+    'all-MiniLM-L6-v2': {
+        'repo_id': 'sentence-transformers/all-MiniLM-L6-v2',
+        'revision': os.getenv('EMBEDDING_MODEL_REVISION', 'main'),
+    },
+    'all-mpnet-base-v2': {
+        'repo_id': 'sentence-transformers/all-mpnet-base-v2',
+        'revision': 'main',
+    },
+}
+# Refuse to fall back to the hub when the model is missing from the registry
+MODEL_OFFLINE = os.getenv('MODEL_OFFLINE', 'False') == 'True'
+
+# Shared embedding server (`manage.py embedding_server`); empty = embed in-process.
+# e.g. http://127.0.0.1:8765 or unix:///tmp/embedding.sock
+EMBEDDING_SERVER_URL = os.getenv('EMBEDDING_SERVER_URL', '')
+# Load the model in-process if the embedding server is unreachable
+EMBEDDING_SERVER_FALLBACK = os.getenv('EMBEDDING_SERVER_FALLBACK', 'True') == 'True'
+# After a failed request, encode in-process for this long before trying the server again
+EMBEDDING_SERVER_RETRY_SECONDS = float(os.getenv('EMBEDDING_SERVER_RETRY_SECONDS', '60'))
+
+# Cold-start import budget enforced by `manage.py check_import_time`
+IMPORT_TIME_BUDGET_MS = int(os.getenv('IMPORT_TIME_BUDGET_MS', '1500'))
+
 # Data directories
 DATA_DIR = BASE_DIR / 'data'
 RAW_DATA_DIR = DATA_DIR / 'raw'
 PROCESSED_DATA_DIR = DATA_DIR / 'processed'
 VECTOR_STORE_DIR = DATA_DIR / 'vector_store'
+INDEX_CHECKPOINT_DIR = DATA_DIR / 'checkpoints'
+MODEL_REGISTRY_DIR = Path(os.getenv('MODEL_REGISTRY_DIR', str(DATA_DIR / 'models')))
+# Parse results of TIPO XML files, reused while a file is unchanged (empty disables)
+PARSE_CACHE_PATH = os.getenv('PARSE_CACHE_PATH', str(RAW_DATA_DIR / 'parse_cache.sqlite3'))
 
 # Create data directories if they don't exist
 for directory in [RAW_DATA_DIR, PROCESSED_DATA_DIR, VECTOR_STORE_DIR]:
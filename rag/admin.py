@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Patent, PatentChunk
+
+
+@admin.register(Patent)
+class PatentAdmin(admin.ModelAdmin):
+    list_display = ('key', 'title', 'section', 'publication_date')
+    list_filter = ('section',)
+    search_fields = ('key', 'title', 'applicant')
+
+
+@admin.register(PatentChunk)
+class PatentChunkAdmin(admin.ModelAdmin):
+    list_display = ('chunk_id', 'patent', 'part', 'chunk_index')
+    list_filter = ('index_section', 'part')
+    raw_id_fields = ('patent',)
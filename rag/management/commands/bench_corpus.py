@@ -0,0 +1,123 @@
+"""
+Management command to benchmark parsing, processing and indexing on a TIPO XML corpus.
+"""
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .generate_xml_corpus import add_corpus_arguments, corpus_options
+
+
+class Command(BaseCommand):
+    help = 'Benchmark parse + process_docs + build_index on a synthetic (or existing) TIPO XML corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--xml-dir',
+            type=str,
+            default=None,
+            help='Benchmark this directory of patent XML files or period archives '
+                 'instead of generating a corpus (the generator options are ignored)'
+        )
+        add_corpus_arguments(parser)
+        parser.add_argument(
+            '--embeddings',
+            choices=['model', 'hash'],
+            default='model',
+            help="'model' runs the configured embedding model; 'hash' uses cheap "
+                 "deterministic vectors to measure the pipeline without it"
+        )
+        parser.add_argument(
+            '--parse-workers',
+            type=int,
+            default=None,
+            help='XML parsing processes (0 = one per CPU, 1 = serial). Default: PARSE_WORKERS'
+        )
+        parser.add_argument(
+            '--process-workers',
+            type=int,
+            default=None,
+            help='Chunking processes (0 = one per CPU, 1 = serial). Default: PROCESS_WORKERS'
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=None,
+            help='Parallel vector-store writers. Default: INDEX_WRITERS'
+        )
+        parser.add_argument(
+            '--json',
+            type=str,
+            default=None,
+            help='Also write the report as JSON to this file'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the scratch directory (generated XML, parsed patents, chunks, vector store)'
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        from rag.services.index_benchmark import HashEmbeddings
+        from rag.services.synthetic_xml import generate_corpus
+        from rag.services.xml_benchmark import run_xml_benchmark
+
+        workdir = Path(tempfile.mkdtemp(prefix='bench_corpus_'))
+        self.stdout.write(f'Scratch directory: {workdir}')
+
+        try:
+            if options['xml_dir']:
+                xml_dir = Path(options['xml_dir'])
+                if not xml_dir.exists():
+                    raise CommandError(f'Not found: {xml_dir}')
+                source = str(xml_dir)
+            else:
+                xml_dir = workdir / 'xml'
+                corpus = generate_corpus(xml_dir, **corpus_options(options))
+                layout = ', zip periods' if options['archive'] else ''
+                source = f"{corpus['files']} synthetic patents (seed {options['seed']}{layout})"
+            self.stdout.write(self.style.SUCCESS(f'Benchmarking with {source}'))
+
+            parse_workers = settings.PARSE_WORKERS if options['parse_workers'] is None else options['parse_workers']
+            report = run_xml_benchmark(
+                xml_dir,
+                workdir / 'bench',
+                parse_workers=parse_workers,
+                parse_batch_size=settings.PARSE_BATCH_SIZE,
+                embedding_service=HashEmbeddings() if options['embeddings'] == 'hash' else None,
+                writers=options['writers'],
+                process_workers=options['process_workers']
+            )
+        finally:
+            if not options['keep']:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        self.stdout.write(
+            f"\n{report['files']} XML files ({report['xml_mb']:.1f} MB) -> {report['patents']} patents "
+            f"({report['failed']} failed) -> {report['chunks']} chunks; embeddings: {report['embedding_model']}, "
+            f"{report['parse_workers']} parsing / {report['process_workers']} chunking process(es)"
+        )
+        self.stdout.write(
+            f"{'stage':<8} {'items':>8} {'seconds':>9} {'items/s':>9} {'files/s':>9} {'MB/s':>8} {'peak RSS MB':>12}"
+        )
+        for stage in report['stages']:
+            self.stdout.write(
+                f"{stage['stage']:<8} {stage['items']:>8} {stage['seconds']:>9.2f} {stage['items_per_sec']:>9.1f} "
+                f"{stage['files_per_sec']:>9.1f} {stage['mb_per_sec']:>8.2f} {stage['peak_rss_mb']:>12.0f}"
+            )
+        self.stdout.write('(items: patents for parse, chunks for process and index; files/s and MB/s of XML)')
+        pipeline = ', '.join(f"{stage['stage']} {stage['items_per_sec']:.0f}/s" for stage in report['pipeline'])
+        self.stdout.write(f'Index pipeline: {pipeline}')
+        self.stdout.write(f"Total: {report['seconds']:.2f}s")
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(dict(report, source=source), f, indent=2)
+            self.stdout.write(f"Report: {options['json']}")
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -0,0 +1,154 @@
+"""
+Management command to benchmark document processing and index building.
+"""
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Benchmark process_docs + build_index on a synthetic or sampled corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--docs',
+            type=int,
+            default=500,
+            help='Number of documents in the corpus (default: 500)'
+        )
+        parser.add_argument(
+            '--sample',
+            type=str,
+            default=None,
+            help='Sample the first --docs documents of this scraped section instead of generating them'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed for the synthetic corpus'
+        )
+        parser.add_argument(
+            '--embeddings',
+            choices=['model', 'hash'],
+            default='model',
+            help="'model' runs the configured embedding model; 'hash' uses cheap "
+                 "deterministic vectors to measure the pipeline without it"
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=None,
+            help='Parallel vector-store writers. Default: INDEX_WRITERS'
+        )
+        parser.add_argument(
+            '--process-workers',
+            type=int,
+            default=None,
+            help='Chunking processes (0 = one per CPU, 1 = serial). Default: PROCESS_WORKERS'
+        )
+        parser.add_argument(
+            '--duplicate-threshold',
+            type=float,
+            default=None,
+            help='Near-duplicate threshold (0 = embed every chunk). Default: NEAR_DUPLICATE_THRESHOLD'
+        )
+        parser.add_argument(
+            '--profile',
+            type=str,
+            default=None,
+            help='cProfile output file. Default: data/benchmarks/bench_index_<time>.prof'
+        )
+        parser.add_argument(
+            '--no-profile',
+            action='store_true',
+            help='Do not profile (profiling adds overhead to the timings)'
+        )
+        parser.add_argument(
+            '--json',
+            type=str,
+            default=None,
+            help='Also write the report as JSON to this file'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the scratch data directory and vector store'
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        from rag.services.index_benchmark import (
+            HashEmbeddings, run_benchmark, sample_documents, synthetic_documents
+        )
+
+        if options['sample']:
+            documents = sample_documents(options['sample'], options['docs'])
+            source = f"first {options['docs']} documents of {options['sample']}"
+        else:
+            documents = synthetic_documents(options['docs'], seed=options['seed'])
+            source = f"{options['docs']} synthetic documents (seed {options['seed']})"
+
+        profile_path = None
+        if not options['no_profile']:
+            profile_path = Path(
+                options['profile']
+                or settings.DATA_DIR / 'benchmarks' / f"bench_index_{time.strftime('%Y%m%d_%H%M%S')}.prof"
+            )
+
+        embedding_service = HashEmbeddings() if options['embeddings'] == 'hash' else None
+
+        workdir = Path(tempfile.mkdtemp(prefix='bench_index_'))
+        self.stdout.write(self.style.SUCCESS(f'Benchmarking with {source}'))
+        self.stdout.write(f'Scratch directory: {workdir}')
+
+        try:
+            report = run_benchmark(
+                documents,
+                workdir,
+                embedding_service=embedding_service,
+                writers=options['writers'],
+                process_workers=options['process_workers'],
+                profile_path=profile_path,
+                duplicate_threshold=options['duplicate_threshold']
+            )
+        finally:
+            if not options['keep']:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        self.stdout.write(
+            f"\n{report['documents']} documents ({report['corpus_bytes'] / 1e6:.1f} MB) -> "
+            f"{report['chunks']} chunks, embeddings: {report['embedding_model']}, "
+            f"{report['process_workers']} chunking process(es)"
+        )
+        self.stdout.write(f"{'stage':<10} {'chunks':>8} {'seconds':>9} {'chunks/s':>10} {'written MB':>11} {'peak RSS MB':>12}")
+        for stage in report['stages']:
+            self.stdout.write(
+                f"{stage['stage']:<10} {stage['items']:>8} {stage['seconds']:>9.2f} "
+                f"{stage['items_per_sec']:>10.1f} {stage['bytes_written'] / 1e6:>11.1f} "
+                f"{stage['peak_rss_mb']:>12.0f}"
+            )
+        pipeline = ', '.join(f"{stage['stage']} {stage['items_per_sec']:.0f}/s" for stage in report['pipeline'])
+        self.stdout.write(f'Index pipeline: {pipeline}')
+        duplicates = report['duplicates']
+        self.stdout.write(
+            f"Near-duplicates: {duplicates['chunks']} chunks not embedded "
+            f"({duplicates['embedding_chars_saved']:.1%} of the text, "
+            f"{duplicates['vector_bytes_saved'] / 1e6:.1f} MB of vectors)"
+        )
+        self.stdout.write(f"Total: {report['seconds']:.2f}s, peak RSS {report['peak_rss_mb']:.0f} MB")
+
+        if profile_path:
+            self.stdout.write(f'Profile: {profile_path} (snakeviz / flameprof)')
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(dict(report, source=source), f, indent=2)
+            self.stdout.write(f"Report: {options['json']}")
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -0,0 +1,64 @@
+"""
+Management command to compare the TIPO XML parsers on a directory of patents.
+"""
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the streaming lxml patent parser against the ElementTree parser (time, peak memory per file)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory',
+            type=str,
+            help='Directory with TIPO patent XML files or period archives (searched recursively), '
+                 'or a single period archive'
+        )
+        parser.add_argument(
+            '--max-files',
+            type=int,
+            default=None,
+            help='Only parse the first N XML files'
+        )
+
+    def handle(self, *args, **options):
+        from rag.services.period_archive import is_archive
+        from rag.services.tipo_xml_parser import TIPOXMLParser, compare_parsers
+
+        directory = options['directory']
+        if not Path(directory).is_dir() and not (Path(directory).is_file() and is_archive(directory)):
+            raise CommandError(f'Not a directory or period archive: {directory}')
+
+        xml_files = TIPOXMLParser().find_xml_files(directory, options['max_files'])
+        if not xml_files:
+            raise CommandError(f'No patent XML files in {directory}')
+
+        report = compare_parsers(xml_files)
+        first = next(iter(report.values()))
+        self.stdout.write(self.style.SUCCESS(f"{first['files']} files, {first['mb']:.1f} MB"))
+
+        self.stdout.write(
+            f"{'parser':<22} {'seconds':>8} {'files/s':>8} {'MB/s':>7} {'ms/file':>8} "
+            f"{'avg peak MB':>12} {'max peak MB':>12}"
+        )
+        for method, row in report.items():
+            peaks = (
+                f"{row['avg_peak_mb']:>12.2f} {row['max_peak_mb']:>12.2f}"
+                if row['max_peak_mb'] is not None else f"{'n/a':>12} {'n/a':>12}"
+            )
+            self.stdout.write(
+                f"{method:<22} {row['seconds']:>8.2f} {row['files_per_sec']:>8.0f} {row['mb_per_sec']:>7.1f} "
+                f"{row['ms_per_file']:>8.2f} {peaks}"
+            )
+
+        tree, stream = report['parse_patent_xml_tree'], report['parse_patent_xml']
+        if stream['seconds']:
+            self.stdout.write(f"Speedup: {tree['seconds'] / stream['seconds']:.1f}x")
+        if stream['mismatches']:
+            self.stdout.write(self.style.ERROR(
+                f"{len(stream['mismatches'])} files parse differently, e.g. {stream['mismatches'][0]}"
+            ))
+        else:
+            self.stdout.write('Output identical for every file')
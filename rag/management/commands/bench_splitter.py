@@ -0,0 +1,88 @@
+"""
+Management command to compare text splitters on patent descriptions.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the Chinese-aware patent splitter against RecursiveCharacterTextSplitter'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--section',
+            type=str,
+            default=None,
+            help='Scraped section to take descriptions from (RAW_DATA_DIR/{section}_docs.jsonl)'
+        )
+        parser.add_argument(
+            '--docs',
+            type=int,
+            default=1000,
+            help='Number of documents (default: 1000)'
+        )
+        parser.add_argument(
+            '--synthetic',
+            action='store_true',
+            help='Use generated descriptions instead of scraped ones'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Default: CHUNK_SIZE'
+        )
+        parser.add_argument(
+            '--chunk-overlap',
+            type=int,
+            default=None,
+            help='Default: CHUNK_OVERLAP'
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        from rag.services.document_processor import make_text_splitter
+        from rag.services.index_benchmark import sample_documents, synthetic_documents
+        from rag.services.text_splitter import compare_splitters
+
+        if options['synthetic']:
+            documents = synthetic_documents(options['docs'])
+            source = 'synthetic'
+        elif options['section']:
+            try:
+                documents = sample_documents(options['section'], options['docs'])
+            except FileNotFoundError as e:
+                raise CommandError(str(e))
+            source = options['section']
+        else:
+            raise CommandError('Pass --section <name> (real TIPO descriptions) or --synthetic')
+
+        texts = [doc['description'] for doc in documents if doc.get('description')]
+        if not texts:
+            raise CommandError('No descriptions found')
+
+        chunk_size = options['chunk_size'] or settings.CHUNK_SIZE
+        chunk_overlap = options['chunk_overlap'] or settings.CHUNK_OVERLAP
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(texts)} descriptions from {source}, {sum(map(len, texts)) / 1e6:.1f}M chars, '
+            f'chunk_size={chunk_size}, chunk_overlap={chunk_overlap}'
+        ))
+
+        report = compare_splitters(texts, {
+            kind: make_text_splitter(chunk_size, chunk_overlap, kind).split_text
+            for kind in ('recursive', 'patent')
+        })
+
+        self.stdout.write(
+            f"{'splitter':<10} {'seconds':>8} {'Mchars/s':>9} {'chunks':>8} {'avg len':>8} "
+            f"{'max len':>8} {'sentence ends':>14}"
+        )
+        for name, row in report.items():
+            self.stdout.write(
+                f"{name:<10} {row['seconds']:>8.2f} {row['chars_per_sec'] / 1e6:>9.2f} {row['chunks']:>8} "
+                f"{row['avg_length']:>8.0f} {row['max_length']:>8} {row['sentence_end_ratio']:>13.0%}"
+            )
+
+        baseline, patent = report['recursive'], report['patent']
+        if patent['seconds']:
+            self.stdout.write(f"Speedup: {baseline['seconds'] / patent['seconds']:.1f}x")
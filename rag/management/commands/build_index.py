@@ -2,7 +2,6 @@
 Management command to build the vector database index.
 """
 from django.core.management.base import BaseCommand
-from rag.services.rag_engine import RAGEngine
 
 
 class Command(BaseCommand):
@@ -16,10 +15,21 @@ class Command(BaseCommand):
             default=None,
             help='Sections to index. Default: all available'
         )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=None,
+            help='Parallel vector-store writers. Default: INDEX_WRITERS'
+        )
         parser.add_argument(
             '--rebuild',
             action='store_true',
-            help='Rebuild index from scratch (delete existing data)'
+            help='Rebuild into a new collection version and swap it in once validated'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue an interrupted build from its checkpoints'
         )
 
     def handle(self, *args, **options):
@@ -28,19 +38,50 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('Starting index build...'))
 
         if options['rebuild']:
-            self.stdout.write(self.style.WARNING('Rebuilding index from scratch'))
+            self.stdout.write(self.style.WARNING('Rebuilding index into a new collection version'))
+
+        if options['resume']:
+            self.stdout.write('Resuming from checkpoints')
+
+        from rag.services.rag_engine import RAGEngine
 
         rag_engine = RAGEngine()
 
         try:
-            rag_engine.index_documents(sections=sections)
+            result = rag_engine.index_documents(
+                sections=sections,
+                rebuild=options['rebuild'],
+                writers=options['writers'],
+                resume=options['resume']
+            )
 
             stats = rag_engine.get_stats()
+            self.stdout.write(
+                f'  upserted: {result["upserted"]}, deleted: {result["deleted"]}, '
+                f'unchanged: {result["unchanged"]}, resumed: {result["resumed"]}'
+            )
+            if result['duplicates']:
+                self.stdout.write(
+                    f'  near-duplicates (not embedded): {result["duplicates"]}, '
+                    f'{result["vector_bytes_saved"] / 1e6:.1f} MB of vectors saved'
+                )
+            for section, report in result['stages'].items():
+                stages = ', '.join(
+                    f'{stage["stage"]} {stage["items_per_sec"]:.0f}/s' for stage in report['stages']
+                )
+                self.stdout.write(f'  - {section}: {report["chunks_per_sec"]:.0f} chunks/s ({stages})')
+            if result['stages']:
+                peak = max(report['peak_rss_mb'] for report in result['stages'].values())
+                self.stdout.write(f'  Peak RSS: {peak:.0f} MB')
             self.stdout.write(
                 self.style.SUCCESS(
                     f'Successfully indexed {stats["total_documents"]} documents'
                 )
             )
+            self.stdout.write(
+                f'  Serving collection: {stats["collection_name"]} '
+                f'({len(stats["shards"])} shards, by {stats["shard_by"]})'
+            )
 
         except Exception as e:
             self.stdout.write(
@@ -0,0 +1,40 @@
+"""
+Management command to check cold-start import time against a budget.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from rag.services.import_budget import measure_startup
+
+
+class Command(BaseCommand):
+    help = 'Measure startup import time with python -X importtime and enforce a budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget-ms',
+            type=float,
+            default=None,
+            help='Maximum allowed import time in ms. Default: IMPORT_TIME_BUDGET_MS setting'
+        )
+
+    def handle(self, *args, **options):
+        budget_ms = options['budget_ms'] or settings.IMPORT_TIME_BUDGET_MS
+
+        report = measure_startup()
+
+        self.stdout.write(f'Startup import time: {report["total_ms"]:.0f} ms (budget {budget_ms:.0f} ms)')
+        for module, ms in report['slowest']:
+            self.stdout.write(f'  {ms:8.1f} ms  {module}')
+
+        if report['heavy_modules']:
+            raise CommandError(
+                'Heavy modules imported at startup: ' + ', '.join(report['heavy_modules'])
+            )
+
+        if report['total_ms'] > budget_ms:
+            raise CommandError(
+                f'Startup import time {report["total_ms"]:.0f} ms exceeds budget {budget_ms:.0f} ms'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Import time within budget'))
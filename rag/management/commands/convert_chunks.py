@@ -0,0 +1,73 @@
+"""
+Management command to convert legacy JSON chunk files into the chunk store format.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Convert {section}_chunks.json files to the compact chunk store and compare size / parse time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sections',
+            nargs='+',
+            type=str,
+            default=None,
+            help='Sections to convert. Default: all sections with a legacy JSON file'
+        )
+        parser.add_argument(
+            '--remove-json',
+            action='store_true',
+            help='Delete the legacy JSON file after converting'
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        from rag.services.chunk_store import (
+            LEGACY_SUFFIX, ChunkStoreReader, convert_legacy_file, legacy_path, store_path
+        )
+        from rag.services.json_stream import iter_json_array
+
+        sections = options['sections'] or sorted(
+            file.name[:-len(LEGACY_SUFFIX)]
+            for file in settings.PROCESSED_DATA_DIR.glob(f'*{LEGACY_SUFFIX}')
+        )
+
+        if not sections:
+            self.stdout.write(self.style.WARNING('No legacy chunk files found'))
+            return
+
+        for section in sections:
+            if not legacy_path(section).exists():
+                self.stdout.write(self.style.WARNING(f'  - {section}: no {section}{LEGACY_SUFFIX}'))
+                continue
+
+            result = convert_legacy_file(section)
+
+            # Full sequential parse of each format
+            started = time.perf_counter()
+            for _ in iter_json_array(legacy_path(section)):
+                pass
+            json_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for _ in ChunkStoreReader(store_path(section)):
+                pass
+            store_seconds = time.perf_counter() - started
+
+            ratio = result['json_bytes'] / result['store_bytes'] if result['store_bytes'] else 0
+            speedup = json_seconds / store_seconds if store_seconds else 0
+            self.stdout.write(
+                f'  - {section}: {result["chunks"]} chunks, {result["groups"]} metadata groups\n'
+                f'    size:  {result["json_bytes"] / 1e6:8.2f} MB -> {result["store_bytes"] / 1e6:8.2f} MB '
+                f'({ratio:.1f}x smaller)\n'
+                f'    parse: {json_seconds:8.2f} s  -> {store_seconds:8.2f} s  ({speedup:.1f}x faster)'
+            )
+
+            if options['remove_json']:
+                legacy_path(section).unlink()
+
+        self.stdout.write(self.style.SUCCESS('Conversion complete'))
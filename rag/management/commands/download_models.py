@@ -0,0 +1,53 @@
+"""
+Management command to populate the local embedding model registry.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Download and pin embedding models into MODEL_REGISTRY_DIR for offline loading'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models',
+            nargs='*',
+            type=str,
+            help='Model names to download. Default: EMBEDDING_MODEL'
+        )
+        parser.add_argument(
+            '--revision',
+            type=str,
+            default=None,
+            help='Branch, tag or commit to pin. Default: revision from EMBEDDING_MODELS'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-download even if the pinned snapshot exists'
+        )
+
+    def handle(self, *args, **options):
+        from rag.services.model_registry import ModelRegistry
+
+        models = options['models'] or [settings.EMBEDDING_MODEL]
+        registry = ModelRegistry()
+
+        self.stdout.write(self.style.SUCCESS(f'Model registry: {registry.root}'))
+
+        for name in models:
+            try:
+                entry = registry.download(
+                    name,
+                    revision=options['revision'],
+                    force=options['force']
+                )
+                self.stdout.write(
+                    f'  - {name}: {entry["repo_id"]}@{entry["revision"][:12]} -> {entry["path"]}'
+                )
+
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Error downloading {name}: {e}'))
+                raise
+
+        self.stdout.write(self.style.SUCCESS(f'Downloaded {len(models)} model(s)'))
@@ -0,0 +1,57 @@
+"""
+Management command to run the shared embedding server.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Serve embeddings for all workers on this node from one batched model instance'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            type=str,
+            default=None,
+            help="Listen address: 'http://host:port' or 'unix:///path/to.sock'. "
+                 "Default: EMBEDDING_SERVER_URL"
+        )
+        parser.add_argument(
+            '--max-batch',
+            type=int,
+            default=64,
+            help='Maximum texts per encode call. Default: 64'
+        )
+        parser.add_argument(
+            '--max-wait-ms',
+            type=float,
+            default=5.0,
+            help='How long to wait for more requests before encoding. Default: 5'
+        )
+
+    def handle(self, *args, **options):
+        from rag.services.embedding_server import create_server
+        from rag.services.embedding_service import EmbeddingService
+
+        url = options['url'] or settings.EMBEDDING_SERVER_URL or 'http://127.0.0.1:8765'
+
+        # The server always owns the model in-process
+        embedding_service = EmbeddingService(server_url='')
+
+        server = create_server(
+            embedding_service,
+            url,
+            max_batch=options['max_batch'],
+            max_wait_ms=options['max_wait_ms']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Embedding server ({embedding_service.model_name}) listening on {url}'
+        ))
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Shutting down embedding server')
+        finally:
+            server.server_close()
@@ -0,0 +1,108 @@
+"""
+Management command to write a synthetic TIPO patent XML corpus.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+
+def add_corpus_arguments(parser):
+    """Generator options shared with bench_corpus."""
+    parser.add_argument(
+        '--files',
+        type=int,
+        default=1000,
+        help='Number of patent XML files (default: 1000)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed (the same seed writes the same corpus)'
+    )
+    parser.add_argument(
+        '--period-size',
+        type=int,
+        default=500,
+        help='Patents per period directory or archive (default: 500)'
+    )
+    parser.add_argument(
+        '--archive',
+        action='store_true',
+        help='Pack each period as a zip archive with an index.xml and figure images'
+    )
+    parser.add_argument(
+        '--types',
+        nargs='+',
+        choices=['invention', 'utility', 'design'],
+        default=['invention'],
+        help='Patent types to draw from (default: invention)'
+    )
+    for name, default, what in (
+        ('description-paragraphs', (8, 30), 'description paragraphs (besides the agency boilerplate)'),
+        ('claims', (3, 15), 'claims'),
+        ('applicants', (1, 2), 'applicants'),
+        ('inventors', (1, 4), 'inventors'),
+        ('ipc-per-patent', (1, 4), 'IPC codes (main + further classifications)'),
+    ):
+        parser.add_argument(
+            f'--{name}',
+            type=int,
+            nargs=2,
+            metavar=('MIN', 'MAX'),
+            default=default,
+            help=f'Range of {what} per patent (default: {default[0]} {default[1]})'
+        )
+    parser.add_argument(
+        '--ipc-codes',
+        type=int,
+        default=200,
+        help='Distinct IPC codes in the corpus (default: 200)'
+    )
+
+
+def corpus_options(options) -> dict:
+    """generate_corpus keyword arguments from the parsed options."""
+    for name in ('description_paragraphs', 'claims', 'applicants', 'inventors', 'ipc_per_patent'):
+        low, high = options[name]
+        if not 0 <= low <= high:
+            raise CommandError(f"--{name.replace('_', '-')}: expected 0 <= MIN <= MAX, got {low} {high}")
+    if options['files'] < 1 or options['period_size'] < 1:
+        raise CommandError('--files and --period-size must be positive')
+    if options['ipc_per_patent'][0] < 1:
+        raise CommandError('--ipc-per-patent: every patent needs a main classification (MIN >= 1)')
+    if options['ipc_codes'] < options['ipc_per_patent'][1]:
+        raise CommandError('--ipc-codes must be at least the --ipc-per-patent maximum')
+    return {
+        'files': options['files'],
+        'seed': options['seed'],
+        'period_size': options['period_size'],
+        'archive': options['archive'],
+        'ipc_pool_size': options['ipc_codes'],
+        'types': tuple(options['types']),
+        'description_paragraphs': tuple(options['description_paragraphs']),
+        'claims': tuple(options['claims']),
+        'applicants': tuple(options['applicants']),
+        'inventors': tuple(options['inventors']),
+        'ipc_per_patent': tuple(options['ipc_per_patent']),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Write synthetic <tw-patent-grant> XML files for benchmarking the parser and processor'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory',
+            type=str,
+            help='Output directory (periods are written as {year}/vol{vv}_iss{ii})'
+        )
+        add_corpus_arguments(parser)
+
+    def handle(self, *args, **options):
+        from rag.services.synthetic_xml import generate_corpus
+
+        result = generate_corpus(options['directory'], **corpus_options(options))
+        layout = 'zip archives' if options['archive'] else 'directories'
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {result['files']} patent XML files ({result['bytes'] / 1e6:.1f} MB) "
+            f"in {result['periods']} period {layout} under {result['directory']}"
+        ))
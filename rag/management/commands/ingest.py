@@ -0,0 +1,150 @@
+"""
+Management command to stream TIPO XML files straight into the vector index.
+"""
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _tee(items, writer, counter):
+    """Pass items through while also writing them to a debug file."""
+    for item in items:
+        writer.write(item)
+        counter[0] += 1
+        yield item
+
+
+class Command(BaseCommand):
+    help = 'Parse TIPO XML, chunk, embed and upsert in one streaming pass (no intermediate JSON)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory',
+            type=str,
+            help='Directory with TIPO patent XML files or zip/tar period archives (searched '
+                 'recursively), or a single period archive'
+        )
+        parser.add_argument(
+            '--section',
+            type=str,
+            required=True,
+            help='Section to index the patents under (e.g. invention)'
+        )
+        parser.add_argument(
+            '--max-files',
+            type=int,
+            default=None,
+            help='Only ingest the first N XML files'
+        )
+        parser.add_argument(
+            '--parse-workers',
+            type=int,
+            default=None,
+            help='XML parsing processes (0 = one per CPU, 1 = serial). Default: PARSE_WORKERS'
+        )
+        parser.add_argument(
+            '--no-parse-cache',
+            action='store_true',
+            help='Parse every XML file instead of reusing results cached at PARSE_CACHE_PATH'
+        )
+        parser.add_argument(
+            '--process-workers',
+            type=int,
+            default=None,
+            help='Chunking processes (0 = one per CPU, 1 = serial). Default: PROCESS_WORKERS'
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=None,
+            help='Parallel vector-store writers. Default: INDEX_WRITERS'
+        )
+        parser.add_argument(
+            '--debug-dir',
+            type=str,
+            default=None,
+            help='Also write the parsed documents ({section}_docs.jsonl) and chunks '
+                 '({section}_chunks.jsonl) to this directory'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        section = options['section']
+
+        from rag.services.period_archive import is_archive
+
+        if not Path(directory).is_dir() and not (Path(directory).is_file() and is_archive(directory)):
+            raise CommandError(f'Not a directory or period archive: {directory}')
+
+        from django.conf import settings
+
+        from rag.services.chunk_store import ChunkStoreWriter, store_path
+        from rag.services.document_processor import DocumentProcessor
+        from rag.services.docs_store import PatentWriter, docs_path
+        from rag.services.parse_cache import open_parse_cache
+        from rag.services.profiling import peak_rss_mb
+        from rag.services.rag_engine import RAGEngine
+        from rag.services.tipo_xml_parser import TIPOXMLParser
+
+        started = time.perf_counter()
+        self.stdout.write(self.style.SUCCESS(f'Ingesting {directory} into section {section}...'))
+
+        rag_engine = RAGEngine(with_llm=False)
+        processor = DocumentProcessor(workers=options['process_workers'])
+        parsed = [0]
+        chunked = [0]
+
+        with ExitStack() as stack:
+            # XML -> documents -> chunks, all lazy; the index pipeline pulls
+            # from this chain through bounded queues
+            parse_workers = settings.PARSE_WORKERS if options['parse_workers'] is None else options['parse_workers']
+            parse_cache = None if options['no_parse_cache'] else open_parse_cache()
+            if parse_cache is not None:
+                stack.callback(parse_cache.close)
+            xml_parser = TIPOXMLParser(
+                workers=parse_workers, batch_size=settings.PARSE_BATCH_SIZE, cache=parse_cache
+            )
+            documents = xml_parser.iter_directory(directory, options['max_files'], progress=self._progress)
+            if options['debug_dir']:
+                debug_dir = Path(options['debug_dir'])
+                debug_dir.mkdir(parents=True, exist_ok=True)
+                docs_writer = stack.enter_context(PatentWriter(docs_path(section, debug_dir)))
+                documents = _tee(documents, docs_writer, parsed)
+            chunks = processor.iter_document_chunks(documents)
+            if options['debug_dir']:
+                chunks_writer = stack.enter_context(ChunkStoreWriter(store_path(section, debug_dir)))
+                chunks = _tee(chunks, chunks_writer, chunked)
+
+            try:
+                result = rag_engine.ingest_chunks(chunks, section, writers=options['writers'])
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Error during ingest: {e}'))
+                raise
+
+        report = result['report']
+        self.stdout.write(
+            f"  {result['total']} chunks: {result['upserted']} upserted, "
+            f"{result['deleted']} deleted, {result['unchanged']} unchanged"
+        )
+        if result['duplicates']:
+            self.stdout.write(
+                f"  {result['duplicates']} near-duplicate chunks not embedded "
+                f"({result['vector_bytes_saved'] / 1e6:.1f} MB of vectors saved)"
+            )
+        stages = ', '.join(f'{stage["stage"]} {stage["items_per_sec"]:.0f}/s' for stage in report['stages'])
+        self.stdout.write(f'  Pipeline: {report["chunks_per_sec"]:.0f} chunks/s ({stages})')
+        if options['debug_dir']:
+            self.stdout.write(f'  Debug output: {parsed[0]} documents, {chunked[0]} chunks in {options["debug_dir"]}')
+        self.stdout.write(f'  Peak RSS: {peak_rss_mb():.0f} MB')
+        self.stdout.write(self.style.SUCCESS(
+            f'Ingest complete in {time.perf_counter() - started:.1f}s; new patents are searchable now'
+        ))
+
+    def _progress(self, status):
+        eta = f", ~{status['eta_seconds']:.0f}s left" if status['eta_seconds'] else ''
+        self.stdout.write(
+            f"  Parsed {status['done']}/{status['total']} XML files "
+            f"({status['files_per_sec']:.0f}/s, {status['cached']} cached, {status['failed']} failed{eta})"
+        )
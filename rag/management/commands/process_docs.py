@@ -2,7 +2,6 @@
 Management command to process scraped documents into chunks.
 """
 from django.core.management.base import BaseCommand
-from rag.services.document_processor import DocumentProcessor
 
 
 class Command(BaseCommand):
@@ -16,28 +15,56 @@ class Command(BaseCommand):
             default=None,
             help='Sections to process. Default: all available'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Worker processes for chunking (0 = one per CPU, 1 = serial). Default: PROCESS_WORKERS'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-chunk every document instead of only new and changed ones'
+        )
 
     def handle(self, *args, **options):
         sections = options['sections']
 
         self.stdout.write(self.style.SUCCESS('Starting document processing...'))
 
-        processor = DocumentProcessor()
+        from rag.services.document_processor import DocumentProcessor
+        from rag.services.profiling import peak_rss_mb
+
+        processor = DocumentProcessor(workers=options['workers'])
+        self.stdout.write(f'Chunking with {processor.workers} worker process(es)')
 
         try:
-            all_processed = processor.process_all_sections(sections=sections)
+            all_processed = processor.process_all_sections(sections=sections, full=options['full'])
 
-            total_chunks = sum(len(chunks) for chunks in all_processed.values())
+            total_chunks = sum(stats.get('total_chunks', 0) for stats in all_processed.values())
             self.stdout.write(
                 self.style.SUCCESS(f'Successfully processed {total_chunks} chunks')
             )
 
-            for section, chunks in all_processed.items():
-                stats = processor.get_chunk_statistics(chunks)
-                self.stdout.write(f'  - {section}: {len(chunks)} chunks')
-                self.stdout.write(
-                    f'    Avg length: {stats["avg_chunk_length"]:.0f} chars'
-                )
+            for section, stats in all_processed.items():
+                self.stdout.write(f'  - {section}: {stats.get("total_chunks", 0)} chunks')
+                if 'documents' in stats:
+                    documents = stats['documents']
+                    self.stdout.write(
+                        f'    Documents: {documents["processed"]} chunked, {documents["reused"]} unchanged, '
+                        f'{documents["removed"]} removed'
+                    )
+                if stats.get('total_chunks'):
+                    self.stdout.write(
+                        f'    Avg length: {stats["avg_chunk_length"]:.0f} chars'
+                    )
+                    if stats['duplicate_chunks']:
+                        self.stdout.write(
+                            f'    Near-duplicates: {stats["duplicate_chunks"]} chunks will not be embedded '
+                            f'({stats["embedding_chars_saved"]:.1%} of the text to embed)'
+                        )
+
+            self.stdout.write(f'Peak RSS: {peak_rss_mb():.0f} MB')
 
         except Exception as e:
             self.stdout.write(
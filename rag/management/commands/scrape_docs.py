@@ -2,7 +2,6 @@
 Management command to scrape Taiwan patent data.
 """
 from django.core.management.base import BaseCommand
-from rag.services.scraper import TaiwanPatentScraper
 
 
 class Command(BaseCommand):
@@ -46,10 +45,12 @@ class Command(BaseCommand):
         self.stdout.write(f'只爬取最新年份: {"是" if latest_only else "否"}')
         self.stdout.write(f'每期最多檔案數: {max_files_per_period}')
 
+        from rag.services.scraper import TaiwanPatentScraper
+
         scraper = TaiwanPatentScraper(max_pages=max_periods)
 
         try:
-            patents = scraper.scrape_section(
+            result = scraper.scrape_section(
                 section=section,
                 latest_only=latest_only,
                 xml_only=True,
@@ -57,13 +58,15 @@ class Command(BaseCommand):
             )
 
             self.stdout.write(
-                self.style.SUCCESS(f'✓ 成功爬取 {len(patents)} 個專利文件')
+                self.style.SUCCESS(f'✓ 成功爬取 {result["patents"]} 個專利文件')
             )
+            if result['output_file']:
+                self.stdout.write(f'輸出檔案: {result["output_file"]}')
 
             # Display sample patent info
-            if patents:
+            sample = result['sample']
+            if sample:
                 self.stdout.write(self.style.SUCCESS('\n範例專利資訊:'))
-                sample = patents[0]
                 self.stdout.write(f'  專利號: {sample.get("patent_number", "N/A")}')
                 self.stdout.write(f'  專利名稱: {sample.get("title", "N/A")}')
                 self.stdout.write(f'  申請人: {sample.get("applicant", "N/A")}')
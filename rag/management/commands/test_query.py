@@ -2,7 +2,6 @@
 Management command to test a query.
 """
 from django.core.management.base import BaseCommand
-from rag.services.rag_engine import RAGEngine
 
 
 class Command(BaseCommand):
@@ -14,17 +13,43 @@ class Command(BaseCommand):
             type=str,
             help='Question to ask'
         )
+        parser.add_argument(
+            '--sections',
+            nargs='+',
+            type=str,
+            default=None,
+            help='Only search these sections (patent types)'
+        )
+        parser.add_argument(
+            '--year-from',
+            type=int,
+            default=None,
+            help='Earliest publication year'
+        )
+        parser.add_argument(
+            '--year-to',
+            type=int,
+            default=None,
+            help='Latest publication year'
+        )
 
     def handle(self, *args, **options):
         question = options['question']
+        filters = {
+            'sections': options['sections'],
+            'year_from': options['year_from'],
+            'year_to': options['year_to'],
+        }
 
         self.stdout.write(self.style.SUCCESS(f'Query: {question}'))
         self.stdout.write('-' * 80)
 
+        from rag.services.rag_engine import RAGEngine
+
         rag_engine = RAGEngine()
 
         try:
-            result = rag_engine.query(question)
+            result = rag_engine.query(question, filters=filters)
 
             self.stdout.write(self.style.SUCCESS('\nAnswer:'))
             self.stdout.write(result['answer'])
@@ -0,0 +1,42 @@
+"""
+Management command to report memory per app-server worker.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Report RSS / PSS / USS of a gunicorn master and its workers (Linux)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'pid',
+            type=int,
+            help='PID of the gunicorn master process'
+        )
+
+    def handle(self, *args, **options):
+        from rag.services.profiling import child_pids, process_memory
+
+        master = options['pid']
+
+        try:
+            workers = child_pids(master)
+        except FileNotFoundError:
+            raise CommandError(f'No such process: {master}')
+
+        self.stdout.write(f'{"pid":>8} {"role":<8} {"RSS MB":>9} {"PSS MB":>9} {"USS MB":>9} {"shared MB":>10}')
+
+        rows = [(master, 'master')] + [(pid, 'worker') for pid in workers]
+        total_pss = 0.0
+        for pid, role in rows:
+            mem = process_memory(pid)
+            total_pss += mem['pss']
+            self.stdout.write(
+                f'{pid:>8} {role:<8} {mem["rss"]:>9.0f} {mem["pss"]:>9.0f} '
+                f'{mem["uss"]:>9.0f} {mem["shared"]:>10.0f}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(workers)} workers, total PSS {total_pss:.0f} MB, '
+            f'{total_pss / max(len(workers), 1):.0f} MB per worker'
+        ))
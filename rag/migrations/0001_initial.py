@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Patent',
+            fields=[
+                ('key', models.CharField(max_length=512, primary_key=True, serialize=False)),
+                ('patent_number', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('title', models.TextField(blank=True)),
+                ('inventor', models.TextField(blank=True)),
+                ('applicant', models.TextField(blank=True)),
+                ('application_date', models.CharField(blank=True, max_length=32)),
+                ('publication_date', models.CharField(blank=True, max_length=32)),
+                ('ipc_classification', models.TextField(blank=True)),
+                ('section', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('source_url', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PatentChunk',
+            fields=[
+                ('chunk_id', models.CharField(max_length=600, primary_key=True, serialize=False)),
+                ('index_section', models.CharField(db_index=True, max_length=64)),
+                ('part', models.CharField(blank=True, max_length=32)),
+                ('heading', models.CharField(blank=True, max_length=255)),
+                ('chunk_index', models.PositiveIntegerField(default=0)),
+                ('total_chunks', models.PositiveIntegerField(default=1)),
+                ('text', models.TextField()),
+                ('patent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='rag.patent')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rag', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patentchunk',
+            name='duplicate_of',
+            field=models.CharField(blank=True, db_index=True, max_length=600),
+        ),
+    ]
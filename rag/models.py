@@ -1,3 +1,44 @@
 from django.db import models
 
-# Create your models here.
+
+class Patent(models.Model):
+    """
+    Patent-level attributes, stored once per patent.
+
+    Vector entries only carry the chunk ID, the patent key and the fields
+    queries filter on; everything else is looked up here after retrieval.
+    """
+    # patent_number, or the source URL for legacy (non-patent) documents
+    key = models.CharField(max_length=512, primary_key=True)
+    patent_number = models.CharField(max_length=32, blank=True, db_index=True)
+    title = models.TextField(blank=True)
+    inventor = models.TextField(blank=True)
+    applicant = models.TextField(blank=True)
+    application_date = models.CharField(max_length=32, blank=True)
+    publication_date = models.CharField(max_length=32, blank=True)
+    ipc_classification = models.TextField(blank=True)
+    # Patent type (invention / utility / design)
+    section = models.CharField(max_length=32, blank=True, db_index=True)
+    source_url = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.key} {self.title}'
+
+
+class PatentChunk(models.Model):
+    """Text of one indexed chunk (vector entries do not store it)."""
+    chunk_id = models.CharField(max_length=600, primary_key=True)
+    patent = models.ForeignKey(Patent, on_delete=models.CASCADE, related_name='chunks')
+    # Chunk file the chunk was indexed from
+    index_section = models.CharField(max_length=64, db_index=True)
+    part = models.CharField(max_length=32, blank=True)
+    heading = models.CharField(max_length=255, blank=True)
+    chunk_index = models.PositiveIntegerField(default=0)
+    total_chunks = models.PositiveIntegerField(default=1)
+    # Chunk this one is a near-duplicate of; such chunks have no vector
+    duplicate_of = models.CharField(max_length=600, blank=True, db_index=True)
+    text = models.TextField()
+
+    def __str__(self):
+        return self.chunk_id
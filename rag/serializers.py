@@ -4,7 +4,36 @@ Serializers for RAG API.
 from rest_framework import serializers
 
 
-class QuerySerializer(serializers.Serializer):
+class QueryFilterSerializer(serializers.Serializer):
+    """Serializer for the optional section / year filters of a query."""
+    sections = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+        help_text="Patent types (index sections) to search, e.g. invention, utility"
+    )
+    year_from = serializers.IntegerField(
+        required=False,
+        min_value=1900,
+        help_text="Earliest publication year"
+    )
+    year_to = serializers.IntegerField(
+        required=False,
+        min_value=1900,
+        help_text="Latest publication year"
+    )
+
+    FILTER_FIELDS = ('sections', 'year_from', 'year_to')
+
+    def filters(self) -> dict:
+        """Filters given in the validated data, for RAGEngine.query()."""
+        return {
+            key: self.validated_data[key]
+            for key in self.FILTER_FIELDS
+            if key in self.validated_data
+        }
+
+
+class QuerySerializer(QueryFilterSerializer):
     """Serializer for query requests."""
     question = serializers.CharField(
         required=True,
@@ -0,0 +1,318 @@
+"""
+Compact on-disk store for processed chunks.
+
+``{section}_chunks.jsonl``
+    JSON Lines with dictionary-encoded metadata. Every chunk of a patent part
+    shares the same patent-level metadata (title, applicant, dates, IPC, ...),
+    so it is written once as a group line and the following chunk rows only
+    carry what differs::
+
+        {"g": {"patent_number": "I123456", "title": "...", "part": "claims", ...}}
+        [0, 3, "chunk text ..."]          # [chunk_index, total_chunks, text]
+        [1, 3, "I123457:description:0:9f3a...", "chunk text ..."]
+
+    The optional third value is the ID of the chunk a near-duplicate chunk
+    duplicates (see near_duplicates).
+
+``{section}_chunks.idx``
+    Little-endian uint64 pairs (row offset, group offset) per chunk, giving
+    O(1) random access by row without scanning the file.
+
+The legacy pretty-printed ``{section}_chunks.json`` array is still readable
+(see iter_chunks) and can be converted with ``manage.py convert_chunks``.
+"""
+import json
+import logging
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+
+from .json_stream import iter_json_array
+
+logger = logging.getLogger(__name__)
+
+STORE_SUFFIX = '_chunks.jsonl'
+INDEX_SUFFIX = '_chunks.idx'
+LEGACY_SUFFIX = '_chunks.json'
+
+# Per-chunk metadata kept in the row instead of the group dictionary;
+# trailing empty values are not written
+ROW_FIELDS = ('chunk_index', 'total_chunks', 'duplicate_of')
+
+_INDEX_ENTRY = struct.Struct('<QQ')
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def store_path(section: str, directory: Optional[Path] = None) -> Path:
+    return Path(directory or settings.PROCESSED_DATA_DIR) / f'{section}{STORE_SUFFIX}'
+
+
+def legacy_path(section: str, directory: Optional[Path] = None) -> Path:
+    return Path(directory or settings.PROCESSED_DATA_DIR) / f'{section}{LEGACY_SUFFIX}'
+
+
+class ChunkStoreWriter:
+    """Stream chunks into a chunk store, replacing the target files on close."""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Target ``{section}_chunks.jsonl`` file
+        """
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name.replace(STORE_SUFFIX, INDEX_SUFFIX))
+        self._tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self._tmp_index_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        self._file = open(self._tmp_path, 'wb')
+        self._index = open(self._tmp_index_path, 'wb')
+        self._group = None
+        self._group_offset = 0
+        self.count = 0
+        self.groups = 0
+
+    def write(self, chunk: Dict):
+        """Append one chunk ({'text', 'metadata'})."""
+        metadata = dict(chunk['metadata'])
+        row_values = [metadata.pop(field, None) for field in ROW_FIELDS]
+        while len(row_values) > 2 and row_values[-1] is None:
+            row_values.pop()
+
+        # Chunks of the same patent part are contiguous: only compare with the
+        # current group, which keeps the writer's memory constant
+        if metadata != self._group:
+            self._group = metadata
+            self._group_offset = self._file.tell()
+            self._file.write((_dumps({'g': metadata}) + '\n').encode('utf-8'))
+            self.groups += 1
+
+        row_offset = self._file.tell()
+        self._file.write((_dumps(row_values + [chunk['text']]) + '\n').encode('utf-8'))
+        self._index.write(_INDEX_ENTRY.pack(row_offset, self._group_offset))
+        self.count += 1
+
+    def close(self):
+        """Flush and atomically move both files into place."""
+        for f in (self._file, self._index):
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+        os.replace(self._tmp_index_path, self.index_path)
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard partial output."""
+        for f, tmp in ((self._file, self._tmp_path), (self._index, self._tmp_index_path)):
+            f.close()
+            tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class ChunkStoreReader:
+    """Sequential and random access to a chunk store."""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: ``{section}_chunks.jsonl`` file
+        """
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name.replace(STORE_SUFFIX, INDEX_SUFFIX))
+        self._file = None
+        # The index stays open for the reader's lifetime (random access reads it per row)
+        self._index = None
+        self._rows = 0
+        self._read_group = lru_cache(maxsize=1024)(self._read_group_uncached)
+
+    def __len__(self) -> int:
+        self._open_index()
+        return self._rows
+
+    def __iter__(self) -> Iterator[Dict]:
+        group = {}
+        with open(self.path, 'rb') as f:
+            for line in f:
+                value = json.loads(line)
+                if isinstance(value, dict):
+                    group = value['g']
+                    continue
+                yield self._build(group, value)
+
+    def __getitem__(self, row: int) -> Dict:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+
+        row_offset, group_offset = self._entry(row)
+        return self._build(self._read_group(group_offset), self._read_line(row_offset))
+
+    def rows(self, first: int, count: int) -> List[Dict]:
+        """
+        Chunks ``first`` to ``first + count - 1``, read in one sequential pass.
+
+        Rows are stored in order, so after one index lookup the range is read
+        line by line without seeking.
+
+        Args:
+            first: First row
+            count: Number of rows
+
+        Returns:
+            Chunk dictionaries
+        """
+        if count <= 0:
+            return []
+        if first < 0 or first + count > len(self):
+            raise IndexError(f'rows {first}..{first + count - 1} of {len(self)}')
+
+        row_offset, group_offset = self._entry(first)
+        group = self._read_group(group_offset)
+        # A cached group does not reopen the file after close()
+        f = self._open_file()
+        f.seek(row_offset)
+        chunks = []
+        while len(chunks) < count:
+            value = json.loads(f.readline())
+            if isinstance(value, dict):
+                group = value['g']
+                continue
+            chunks.append(self._build(group, value))
+        return chunks
+
+    def close(self):
+        for name in ('_file', '_index'):
+            f = getattr(self, name)
+            if f is not None:
+                f.close()
+                setattr(self, name, None)
+
+    def _open_index(self):
+        if self._index is None:
+            self._index = open(self.index_path, 'rb')
+            self._rows = os.fstat(self._index.fileno()).st_size // _INDEX_ENTRY.size
+
+    def _entry(self, row: int):
+        """(row offset, group offset) of a row."""
+        self._open_index()
+        self._index.seek(row * _INDEX_ENTRY.size)
+        return _INDEX_ENTRY.unpack(self._index.read(_INDEX_ENTRY.size))
+
+    def _open_file(self):
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+        return self._file
+
+    def _read_line(self, offset: int):
+        f = self._open_file()
+        f.seek(offset)
+        return json.loads(f.readline())
+
+    def _read_group_uncached(self, offset: int) -> Dict:
+        return self._read_line(offset)['g']
+
+    @staticmethod
+    def _build(group: Dict, row: List) -> Dict:
+        metadata = dict(group)
+        for field, value in zip(ROW_FIELDS, row[:-1]):
+            if value is not None:
+                metadata[field] = value
+        return {'text': row[-1], 'metadata': metadata}
+
+
+# ========== Section-level helpers ==========
+
+def available_sections(directory: Optional[Path] = None) -> List[str]:
+    """Sections with processed chunks, in either format."""
+    directory = Path(directory or settings.PROCESSED_DATA_DIR)
+    sections = set()
+    for suffix in (STORE_SUFFIX, LEGACY_SUFFIX):
+        for file in directory.glob(f'*{suffix}'):
+            sections.add(file.name[:-len(suffix)])
+    return sorted(sections)
+
+
+def has_chunks(section: str, directory: Optional[Path] = None) -> bool:
+    return store_path(section, directory).exists() or legacy_path(section, directory).exists()
+
+
+def source_fingerprint(section: str, directory: Optional[Path] = None) -> Dict:
+    """Size and mtime of the file iter_chunks() would read for a section."""
+    path = store_path(section, directory)
+    if not path.exists():
+        path = legacy_path(section, directory)
+    stat = path.stat()
+    return {'file': path.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def iter_chunks(section: str, directory: Optional[Path] = None) -> Iterator[Dict]:
+    """
+    Stream a section's chunks from the chunk store, or the legacy JSON array.
+
+    Args:
+        section: Section name
+        directory: Processed data directory (default: settings.PROCESSED_DATA_DIR)
+
+    Yields:
+        Chunk dictionaries ({'text', 'metadata'})
+    """
+    path = store_path(section, directory)
+    if path.exists():
+        yield from ChunkStoreReader(path)
+        return
+
+    legacy = legacy_path(section, directory)
+    if legacy.exists():
+        yield from iter_json_array(legacy)
+
+
+def convert_legacy_file(section: str, directory: Optional[Path] = None,
+                        remove_legacy: bool = False) -> Dict:
+    """
+    Convert ``{section}_chunks.json`` into the chunk store format.
+
+    Args:
+        section: Section name
+        directory: Processed data directory
+        remove_legacy: Delete the JSON file after a successful conversion
+
+    Returns:
+        {'chunks', 'groups', 'json_bytes', 'store_bytes'}
+    """
+    legacy = legacy_path(section, directory)
+    target = store_path(section, directory)
+
+    with ChunkStoreWriter(target) as writer:
+        for chunk in iter_json_array(legacy):
+            writer.write(chunk)
+
+    result = {
+        'chunks': writer.count,
+        'groups': writer.groups,
+        'json_bytes': legacy.stat().st_size,
+        'store_bytes': target.stat().st_size + writer.index_path.stat().st_size,
+    }
+
+    if remove_legacy:
+        legacy.unlink()
+
+    logger.info(
+        f"Converted {legacy.name}: {result['chunks']} chunks in {result['groups']} groups, "
+        f"{result['json_bytes'] / 1e6:.1f} MB -> {result['store_bytes'] / 1e6:.1f} MB"
+    )
+    return result
@@ -0,0 +1,142 @@
+"""
+Alias pointer for blue/green vector index rebuilds.
+
+Rebuilds write into a new versioned collection (``taiwan_patents__v<time>``)
+while queries keep using the current one. Once the new collection has been
+validated, the alias is repointed in a single metadata update, and versions
+that were retired longer than the grace period ago are deleted.
+
+The alias lives in ChromaDB itself, as the metadata of an empty marker
+collection (``taiwan_patents__alias``), so every web worker and indexer sees
+the same pointer without extra infrastructure.
+"""
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from .shard_catalog import ShardCatalog
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionAlias:
+    """Read and atomically swap the collection an alias points to."""
+
+    def __init__(self, chroma_client, name: str):
+        """
+        Args:
+            chroma_client: ChromaDB client
+            name: Alias name (also the legacy, unversioned collection name)
+        """
+        self.chroma_client = chroma_client
+        self.name = name
+        self.marker_name = f'{name}__alias'
+
+    def _marker(self):
+        # Not get_or_create_collection(metadata=...): on an existing collection
+        # that replaces the metadata, i.e. would reset the pointer
+        try:
+            return self.chroma_client.get_collection(name=self.marker_name)
+        except Exception:
+            return self.chroma_client.get_or_create_collection(
+                name=self.marker_name,
+                metadata={'description': f'Alias pointer for {self.name}'}
+            )
+
+    def read(self) -> Dict:
+        """
+        Current alias state.
+
+        Returns:
+            {'target', 'building', 'retired': {collection: retired_at}}; target
+            falls back to the unversioned collection name for indexes built
+            before aliases existed
+        """
+        metadata = self._marker().metadata or {}
+        return {
+            'target': metadata.get('target') or self.name,
+            'building': metadata.get('building') or '',
+            'retired': json.loads(metadata.get('retired') or '{}'),
+        }
+
+    def _write(self, state: Dict):
+        # modify() replaces the metadata in one request: readers never see a
+        # half-updated pointer
+        self._marker().modify(metadata={
+            'description': f'Alias pointer for {self.name}',
+            'target': state['target'],
+            'building': state['building'],
+            'retired': json.dumps(state['retired']),
+            'updated_at': time.time(),
+        })
+
+    def new_version_name(self) -> str:
+        """Name for a fresh versioned collection."""
+        return f"{self.name}__v{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+    def mark_building(self, collection_name: str):
+        """Remember an in-progress build so it can be resumed."""
+        state = self.read()
+        state['building'] = collection_name
+        self._write(state)
+
+    def swap(self, collection_name: str) -> Optional[str]:
+        """
+        Point the alias at a new collection and retire the previous one.
+
+        Args:
+            collection_name: Validated collection to serve from
+
+        Returns:
+            The previous target
+        """
+        state = self.read()
+        previous = state['target']
+        if previous and previous != collection_name:
+            state['retired'][previous] = time.time()
+        state['retired'].pop(collection_name, None)
+        state['target'] = collection_name
+        state['building'] = ''
+        self._write(state)
+        logger.info(f"Alias {self.name}: {previous} -> {collection_name}")
+        return previous
+
+    def _delete_version(self, name: str):
+        """
+        Delete a retired version together with its shard collections.
+
+        The shards are read from the version's own catalog, so this also covers
+        the unversioned legacy collection once it has been built sharded.
+        """
+        try:
+            root = self.chroma_client.get_collection(name=name)
+            ShardCatalog(self.chroma_client, root).delete()
+        except Exception as e:
+            logger.warning(f"Could not delete retired collection {name}: {e}")
+
+    def garbage_collect(self, grace_seconds: float) -> list:
+        """
+        Delete collections retired more than grace_seconds ago.
+
+        In-flight queries on a retired collection have the grace period to
+        finish (and every worker's alias cache to expire) before it goes away.
+
+        Returns:
+            Names of deleted collections
+        """
+        state = self.read()
+        now = time.time()
+        deleted = []
+        for name, retired_at in list(state['retired'].items()):
+            if now - retired_at < grace_seconds or name == state['target']:
+                continue
+            self._delete_version(name)
+            del state['retired'][name]
+            deleted.append(name)
+
+        if deleted:
+            self._write(state)
+            logger.info(f"Garbage-collected collections: {deleted}")
+        return deleted
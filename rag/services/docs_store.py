@@ -0,0 +1,190 @@
+"""
+Append-only files of parsed patents.
+
+``{section}_docs.jsonl``
+    One patent dictionary (see tipo_xml_parser) per line, written as each
+    XML file is parsed, so memory does not grow with the corpus.
+
+``{section}_docs.jsonl.zst``
+    The same lines in a zstd stream (PATENTS_COMPRESSION=zstd, needs the
+    optional ``zstandard`` package).
+
+Output goes to a ``.tmp`` file that replaces the section's docs file on
+close, so readers never see a half-written file and an interrupted run
+keeps the previous one. The legacy ``{section}_docs.json`` array is still
+readable (see iter_patents).
+"""
+import io
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+
+from .json_stream import iter_json_array
+
+logger = logging.getLogger(__name__)
+
+DOCS_SUFFIX = '_docs.jsonl'
+ZSTD_SUFFIX = '.zst'
+LEGACY_SUFFIX = '_docs.json'
+
+# Lookup order of a section's docs file; the writer removes the others
+_SUFFIXES = (DOCS_SUFFIX + ZSTD_SUFFIX, DOCS_SUFFIX, LEGACY_SUFFIX)
+
+# Patents per flush: an interrupted run's .tmp file holds whole lines up to
+# the last flush (a decodable zstd block for compressed output)
+_FLUSH_EVERY = 256
+_ZSTD_LEVEL = 3
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "zstd-compressed patent files need the 'zstandard' package (pip install zstandard)"
+        ) from None
+    return zstandard
+
+
+def docs_path(section: str, directory: Optional[Path] = None, compression: str = None) -> Path:
+    """
+    File a section's parsed patents are written to.
+
+    Args:
+        section: Section name
+        directory: Raw data directory (default: settings.RAW_DATA_DIR)
+        compression: '' or 'zstd' (default: settings.PATENTS_COMPRESSION)
+    """
+    compression = settings.PATENTS_COMPRESSION if compression is None else compression
+    if compression not in ('', 'zstd'):
+        raise ValueError(f"Unknown PATENTS_COMPRESSION: {compression!r} (expected '' or 'zstd')")
+    suffix = DOCS_SUFFIX + (ZSTD_SUFFIX if compression else '')
+    return Path(directory or settings.RAW_DATA_DIR) / f'{section}{suffix}'
+
+
+def find_docs(section: str, directory: Optional[Path] = None) -> Optional[Path]:
+    """Existing docs file of a section, in any format (None if there is none)."""
+    directory = Path(directory or settings.RAW_DATA_DIR)
+    for suffix in _SUFFIXES:
+        path = directory / f'{section}{suffix}'
+        if path.exists():
+            return path
+    return None
+
+
+def available_sections(directory: Optional[Path] = None) -> List[str]:
+    """Sections with parsed patents, in any format."""
+    directory = Path(directory or settings.RAW_DATA_DIR)
+    sections = set()
+    for suffix in _SUFFIXES:
+        for file in directory.glob(f'*{suffix}'):
+            sections.add(file.name[:-len(suffix)])
+    return sorted(sections)
+
+
+def iter_patents(path: Path) -> Iterator[Dict]:
+    """
+    Stream the patents of a docs file.
+
+    Args:
+        path: ``.jsonl``, ``.jsonl.zst`` or legacy ``.json`` array file
+
+    Yields:
+        Patent dictionaries, in file order
+    """
+    path = Path(path)
+    if path.name.endswith(LEGACY_SUFFIX):
+        yield from iter_json_array(path)
+        return
+
+    with open(path, 'rb') as raw:
+        if path.name.endswith(ZSTD_SUFFIX):
+            stream = _zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        else:
+            stream = raw
+        for line in io.TextIOWrapper(stream, encoding='utf-8'):
+            if line.strip():
+                yield json.loads(line)
+
+
+class PatentWriter:
+    """Stream patents into a docs file, replacing the section's docs on close."""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Target ``{section}_docs.jsonl`` or ``{section}_docs.jsonl.zst`` file
+        """
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self._raw = open(self._tmp_path, 'wb')
+        self._zstd = None
+        self._file = self._raw
+        if self.path.name.endswith(ZSTD_SUFFIX):
+            self._zstd = _zstandard()
+            self._file = self._zstd.ZstdCompressor(level=_ZSTD_LEVEL).stream_writer(
+                self._raw, closefd=False
+            )
+        self.count = 0
+
+    def write(self, patent: Dict):
+        """Append one patent."""
+        line = json.dumps(patent, ensure_ascii=False, separators=(',', ':')) + '\n'
+        self._file.write(line.encode('utf-8'))
+        self.count += 1
+        if self.count % _FLUSH_EVERY == 0:
+            self._flush()
+
+    def write_all(self, patents: Iterable[Dict]) -> int:
+        """Append every patent of a stream; returns how many were written."""
+        for patent in patents:
+            self.write(patent)
+        return self.count
+
+    def _flush(self):
+        if self._zstd is not None:
+            self._file.flush(self._zstd.FLUSH_BLOCK)
+        self._raw.flush()
+
+    def close(self):
+        """Flush and atomically move the file into place."""
+        if self._zstd is not None:
+            self._file.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self._tmp_path, self.path)
+
+        # The section's docs in another format are now stale
+        for suffix in _SUFFIXES:
+            if self.path.name.endswith(suffix):
+                prefix = self.path.name[:-len(suffix)]
+                break
+        else:
+            return
+        for suffix in _SUFFIXES:
+            other = self.path.with_name(prefix + suffix)
+            if other != self.path and other.exists():
+                other.unlink()
+                logger.info(f"Removed {other.name}, replaced by {self.path.name}")
+
+    def abort(self):
+        """Discard the partial output."""
+        if self._zstd is not None:
+            self._file.close()
+        self._raw.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -1,39 +1,134 @@
 """
 Document processing service for chunking and preparing patent documents for embeddings.
 """
-import json
+import hashlib
 import logging
+import os
 import re
-from typing import List, Dict
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Iterable, Iterator, Optional
 from pathlib import Path
 
 from django.conf import settings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from .chunk_store import ChunkStoreReader, ChunkStoreWriter, source_fingerprint, store_path
+from .docs_store import available_sections, docs_path, find_docs, iter_patents
+from .processing_manifest import (
+    ChangeLog, ProcessingManifest, document_hash, document_key, duplicates_path
+)
+from .profiling import peak_rss_mb
+from .text_splitter import PatentTextSplitter
 
 logger = logging.getLogger(__name__)
 
 
+def patent_key(metadata: Dict) -> str:
+    """
+    Key of the patent a chunk belongs to.
+
+    Args:
+        metadata: Chunk metadata
+
+    Returns:
+        The patent number, or the source URL (title) for legacy documents
+    """
+    return metadata.get('patent_number') or metadata.get('source_url') or metadata.get('title', '')
+
+
+def chunk_id(chunk: Dict) -> str:
+    """
+    Stable, content-addressed ID for a chunk.
+
+    Built from the patent number (or source URL for legacy documents), part,
+    chunk index and a hash of the text, so re-processing unchanged patents
+    yields the same IDs and any edit yields a new one.
+
+    Args:
+        chunk: Chunk dictionary with 'text' and 'metadata'
+
+    Returns:
+        ID such as 'I123456:claims:3:5f2b9c0e1a7d4e21'
+    """
+    metadata = chunk['metadata']
+    key = patent_key(metadata)
+    part = metadata.get('part') or metadata.get('heading') or 'content'
+    digest = hashlib.sha1(chunk['text'].encode('utf-8')).hexdigest()[:16]
+    return f"{key}:{part}:{metadata.get('chunk_index', 0)}:{digest}"
+
+
+def make_text_splitter(chunk_size: int, chunk_overlap: int, kind: str = None):
+    """
+    Text splitter selected by TEXT_SPLITTER.
+
+    Args:
+        chunk_size: Maximum chunk length in characters
+        chunk_overlap: Overlap between consecutive chunks
+        kind: 'patent' (Chinese-aware, default) or 'recursive' (LangChain)
+
+    Returns:
+        Object with a split_text(text) -> List[str] method
+    """
+    kind = kind or settings.TEXT_SPLITTER
+    if kind == 'patent':
+        return PatentTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    if kind == 'recursive':
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
+    raise ValueError(f"Unknown TEXT_SPLITTER: {kind!r} (expected 'patent' or 'recursive')")
+
+
+# Processor of a pool worker process (see _init_worker)
+_worker_processor = None
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int):
+    global _worker_processor
+    _worker_processor = DocumentProcessor(chunk_size, chunk_overlap, workers=1)
+
+
+def _process_batch(documents: List[Optional[Dict]]) -> List[Optional[List[Dict]]]:
+    """Chunk a batch of documents in a pool worker, keeping document order."""
+    return [
+        None if document is None else _worker_processor.process_document(document)
+        for document in documents
+    ]
+
+
 class DocumentProcessor:
     """Process and chunk patent documents for RAG system."""
 
-    def __init__(self, chunk_size: int = None, chunk_overlap: int = None):
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None, workers: int = None,
+                 duplicate_threshold: float = None):
         """
         Initialize the document processor.
 
         Args:
             chunk_size: Size of each text chunk in characters
             chunk_overlap: Number of overlapping characters between chunks
+            workers: Processes used to chunk documents (default: PROCESS_WORKERS,
+                     0 = one per CPU; 1 processes in this process)
+            duplicate_threshold: Similarity at which a chunk is marked a near
+                                 duplicate (default: NEAR_DUPLICATE_THRESHOLD, 0 = off)
         """
         self.chunk_size = chunk_size or settings.CHUNK_SIZE
         self.chunk_overlap = chunk_overlap or settings.CHUNK_OVERLAP
-
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""]
+        workers = settings.PROCESS_WORKERS if workers is None else workers
+        self.workers = workers or os.cpu_count() or 1
+        self.duplicate_threshold = (
+            settings.NEAR_DUPLICATE_THRESHOLD if duplicate_threshold is None else duplicate_threshold
         )
 
+        self.text_splitter = make_text_splitter(self.chunk_size, self.chunk_overlap)
+
     def process_document(self, document: Dict) -> List[Dict]:
         """
         Process a single patent document into chunks.
@@ -105,6 +200,7 @@ class DocumentProcessor:
                             'inventor': document.get('inventor', ''),
                             'applicant': document.get('applicant', ''),
                             'application_date': document.get('application_date', ''),
+                            'publication_date': document.get('publication_date', ''),
                             'ipc_classification': document.get('ipc_classification', ''),
                         }
                     }
@@ -168,101 +264,402 @@ class DocumentProcessor:
 
         return text
 
+    def iter_section_documents(self, section: str) -> Iterator[Dict]:
+        """
+        Stream the scraped documents of a category one at a time.
+
+        Args:
+            section: Patent category (e.g., 'invention', 'utility', 'design')
+
+        Yields:
+            Patent document dictionaries
+        """
+        input_file = find_docs(section)
+
+        if input_file is None:
+            logger.error(f"Input file not found: {docs_path(section)}")
+            return
+
+        yield from iter_patents(input_file)
+
+    def iter_section_chunks(self, section: str) -> Iterator[Dict]:
+        """
+        Stream the chunks of a category, document by document.
+
+        Args:
+            section: Patent category
+
+        Yields:
+            Chunk dictionaries
+        """
+        yield from self.iter_document_chunks(self.iter_section_documents(section))
+
+    def iter_document_chunks(self, documents: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Stream the chunks of any document stream, in document order.
+
+        Near-duplicates of an earlier chunk in the stream get
+        metadata['duplicate_of'] set to that chunk's ID; the indexer stores
+        them without embedding them.
+
+        Args:
+            documents: Iterable of patent documents (consumed lazily)
+
+        Yields:
+            Chunk dictionaries
+        """
+        chunks = (chunk for chunks in self.iter_processed_documents(documents) for chunk in chunks)
+        if self.duplicate_threshold:
+            chunks = self._duplicate_detector().mark(chunks)
+        yield from chunks
+
+    def _duplicate_detector(self):
+        """New NearDuplicateDetector; imported here so importing this module does not load numpy."""
+        from .near_duplicates import NearDuplicateDetector
+
+        return NearDuplicateDetector(threshold=self.duplicate_threshold)
+
+    def iter_processed_documents(self, documents: Iterable[Optional[Dict]]) -> Iterator[Optional[List[Dict]]]:
+        """
+        Chunk documents one by one, on the process pool if workers > 1.
+
+        Args:
+            documents: Iterable of patent documents; None entries are passed
+                       through (placeholders for documents that need no work)
+
+        Yields:
+            The chunk list of each document (None for None), in input order
+        """
+        if self.workers > 1:
+            yield from self.iter_parallel(documents)
+            return
+
+        for document in documents:
+            yield None if document is None else self.process_document(document)
+
+    def iter_chunks_parallel(self, documents: Iterable[Dict], batch_size: int = None) -> Iterator[Dict]:
+        """
+        Chunk documents on a process pool, yielding chunks in input order.
+
+        Args:
+            documents: Iterable of patent documents
+            batch_size: Documents per task (default: PROCESS_BATCH_SIZE)
+
+        Yields:
+            Chunk dictionaries, in the same order as serial processing
+        """
+        for chunks in self.iter_parallel(documents, batch_size):
+            yield from chunks
+
+    def iter_parallel(self, documents: Iterable[Optional[Dict]], batch_size: int = None) -> Iterator[Optional[List[Dict]]]:
+        """
+        Chunk documents on a process pool, yielding each document's chunks in input order.
+
+        Documents are sent to the workers in batches, and only a few batches
+        per worker are in flight at once: reading, chunking and writing stay a
+        stream, and memory does not grow with the size of the section.
+
+        Args:
+            documents: Iterable of patent documents (None entries are passed through)
+            batch_size: Documents per task (default: PROCESS_BATCH_SIZE)
+
+        Yields:
+            Chunk list per document, in the same order as serial processing
+        """
+        batch_size = batch_size or settings.PROCESS_BATCH_SIZE
+        documents = iter(documents)
+        max_in_flight = self.workers * 2
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.chunk_size, self.chunk_overlap)
+        ) as pool:
+            in_flight = deque()
+            while True:
+                while len(in_flight) < max_in_flight:
+                    batch = list(islice(documents, batch_size))
+                    if not batch:
+                        break
+                    in_flight.append(pool.submit(_process_batch, batch))
+                if not in_flight:
+                    return
+                # Oldest batch first, so output order matches input order
+                yield from in_flight.popleft().result()
+
     def process_section(self, section: str) -> List[Dict]:
         """
         Process all patent documents from a category.
 
+        Loads every chunk into memory; use iter_section_chunks() for large corpora.
+
         Args:
             section: Patent category (e.g., 'invention', 'utility', 'design')
 
         Returns:
             List of all chunks from the category
         """
-        input_file = settings.RAW_DATA_DIR / f'{section}_docs.json'
+        all_chunks = list(self.iter_section_chunks(section))
+        logger.info(f"Created {len(all_chunks)} chunks from {section}")
+        return all_chunks
 
-        if not input_file.exists():
-            logger.error(f"Input file not found: {input_file}")
-            return []
+    def save_processed_chunks(self, chunks: Iterable[Dict], section: str) -> Dict:
+        """
+        Stream chunks to the section's chunk store ({section}_chunks.jsonl).
 
-        # Load documents
-        with open(input_file, 'r', encoding='utf-8') as f:
-            documents = json.load(f)
+        Args:
+            chunks: Iterable of chunk dictionaries (consumed lazily)
+            section: Section name
 
-        logger.info(f"Processing {len(documents)} documents from {section}")
+        Returns:
+            Chunk statistics (see get_chunk_statistics)
+        """
+        output_file = store_path(section)
+        stats = ChunkStats()
 
-        # Process each document
-        all_chunks = []
-        for doc in documents:
-            chunks = self.process_document(doc)
-            all_chunks.extend(chunks)
+        with ChunkStoreWriter(output_file) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+                stats.add(chunk)
 
-        logger.info(f"Created {len(all_chunks)} chunks from {section}")
-        return all_chunks
+        logger.info(f"Saved {stats.total_chunks} chunks to {output_file}")
+        return stats.as_dict()
 
-    def save_processed_chunks(self, chunks: List[Dict], section: str):
+    def processing_config(self) -> Dict:
+        """Settings that change the chunks produced from a document."""
+        return {
+            'chunk_size': self.chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'splitter': type(self.text_splitter).__name__,
+            'duplicate_threshold': self.duplicate_threshold,
+        }
+
+    def update_section(self, section: str, full: bool = False) -> Dict:
         """
-        Save processed chunks to JSON file.
+        Process a section, re-chunking only documents that changed.
+
+        Documents whose source fields and processing config hash to the same
+        value as in the section's manifest are copied from the previous
+        chunk store; new and changed documents are chunked. Patents that
+        were added, changed or removed (tombstones) are appended to the
+        change log for build_index. Near-duplicate representatives are kept
+        between runs, so unchanged chunks are not hashed again either.
 
         Args:
-            chunks: List of chunk dictionaries
             section: Section name
+            full: Re-chunk every document
+
+        Returns:
+            Chunk statistics, plus 'documents' counts (processed, reused, removed)
         """
-        output_file = settings.PROCESSED_DATA_DIR / f'{section}_chunks.json'
+        input_file = find_docs(section)
+        if input_file is None:
+            logger.error(f"Input file not found: {docs_path(section)}")
+            return {}
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(chunks, f, indent=2, ensure_ascii=False)
+        path = store_path(section)
+        before = source_fingerprint(section) if path.exists() else None
+        manifest = ProcessingManifest(section, self.processing_config())
+        previous = None if full else manifest.load(before)
+        token = uuid.uuid4().hex
+
+        detector = None
+        if self.duplicate_threshold:
+            detector = self._duplicate_detector()
+            if previous and not detector.load(duplicates_path(section), previous['token']):
+                logger.info(f"{section}: no near-duplicate state, reprocessing everything")
+                previous = None
+
+        old_documents = previous['documents'] if previous else {}
+        reader = ChunkStoreReader(path) if previous else None
+        # Read the documents once; the pool needs only the ones to re-chunk
+        plan = deque()
+
+        def to_chunk():
+            for document in iter_patents(input_file):
+                key = document_key(document)
+                digest = document_hash(document, manifest.digest)
+                old = old_documents.get(key)
+                reuse = old is not None and old[0] == digest
+                plan.append((key, digest, old, reuse))
+                yield None if reuse else document
+
+        def old_chunks(entry):
+            return reader.rows(entry[1], entry[2])
+
+        documents = {}
+        touched = set()        # patent keys of added and changed documents
+        tombstones = set()     # patent keys of removed documents
+        dead = set()           # chunk IDs that were in the old store only
+        referenced = set()     # representatives that duplicates point to
+        counts = {'processed': 0, 'reused': 0, 'removed': 0}
+        stats = ChunkStats()
+
+        writer = ChunkStoreWriter(path)
+        try:
+            for chunks in self.iter_processed_documents(to_chunk()):
+                key, digest, old, reuse = plan.popleft()
+                if reuse:
+                    chunks = old_chunks(old)
+                    counts['reused'] += 1
+                else:
+                    counts['processed'] += 1
+                    new_ids = [chunk_id(chunk) for chunk in chunks]
+                    touched.update(patent_key(chunk['metadata']) for chunk in chunks)
+                    if old is not None:
+                        previous_chunks = old_chunks(old)
+                        touched.update(patent_key(chunk['metadata']) for chunk in previous_chunks)
+                        gone = {chunk_id(chunk) for chunk in previous_chunks} - set(new_ids)
+                        dead.update(gone)
+                        if detector is not None:
+                            # Not the old version of the same text
+                            detector.discard(gone)
+                    if detector is not None:
+                        for cid, chunk in zip(new_ids, chunks):
+                            representative = detector.add(chunk['text'], cid)
+                            if representative is not None:
+                                chunk['metadata']['duplicate_of'] = representative
+
+                documents[key] = [digest, writer.count, len(chunks)]
+                for chunk in chunks:
+                    if chunk['metadata'].get('duplicate_of'):
+                        referenced.add(chunk['metadata']['duplicate_of'])
+                    writer.write(chunk)
+                    stats.add(chunk)
+
+            for key in old_documents.keys() - documents.keys():
+                counts['removed'] += 1
+                for chunk in old_chunks(old_documents[key]):
+                    tombstones.add(patent_key(chunk['metadata']))
+                    dead.add(chunk_id(chunk))
+        except BaseException:
+            writer.abort()
+            raise
+        finally:
+            if reader is not None:
+                reader.close()
+
+        if previous and documents == old_documents:
+            # Nothing changed: keep the store, manifest and change log as they are
+            writer.abort()
+            logger.info(f"{section}: {counts['reused']} documents unchanged")
+            return dict(stats.as_dict(), documents=counts)
+        writer.close()
+
+        if detector is not None and referenced & dead:
+            # Some duplicates point at chunks that are gone: cluster again
+            logger.info(f"{section}: near-duplicate representatives changed, re-marking duplicates")
+            detector = self._duplicate_detector()
+            stats = ChunkStats()
+            with ChunkStoreWriter(path) as writer:
+                for chunk in ChunkStoreReader(path):
+                    was = chunk['metadata'].pop('duplicate_of', None)
+                    representative = detector.add(chunk['text'], chunk_id(chunk))
+                    if representative is not None:
+                        chunk['metadata']['duplicate_of'] = representative
+                    if representative != was:
+                        touched.add(patent_key(chunk['metadata']))
+                    writer.write(chunk)
+                    stats.add(chunk)
+            dead = set()
+
+        after = source_fingerprint(section)
+        if detector is not None:
+            detector.discard(dead)
+            detector.save(duplicates_path(section), token)
+        manifest.save(documents, after, token)
+        changes = ChangeLog(section)
+        if previous:
+            changes.record(before, after, changed=touched, removed=tombstones - touched)
+        else:
+            changes.record(before, after, full=True)
 
-        logger.info(f"Saved {len(chunks)} chunks to {output_file}")
+        logger.info(
+            f"{section}: {counts['processed']} documents chunked, {counts['reused']} reused, "
+            f"{counts['removed']} removed"
+        )
+        return dict(stats.as_dict(), documents=counts)
 
-    def process_all_sections(self, sections: List[str] = None) -> Dict[str, List[Dict]]:
+    def process_all_sections(self, sections: List[str] = None, full: bool = False) -> Dict[str, Dict]:
         """
         Process all sections.
 
+        Documents are read, chunked and written as a stream, so memory use
+        does not grow with the size of the section. Only documents that
+        changed since the last run are chunked again (see update_section).
+
         Args:
             sections: List of section names to process (default: all available)
+            full: Re-chunk every document
 
         Returns:
-            Dictionary mapping section names to chunk lists
+            Dictionary mapping section names to chunk statistics
         """
         if sections is None:
             # Find all available section files
-            sections = []
-            for file in settings.RAW_DATA_DIR.glob('*_docs.json'):
-                section = file.stem.replace('_docs', '')
-                sections.append(section)
+            sections = available_sections()
 
         all_processed = {}
 
         for section in sections:
             logger.info(f"Processing section: {section}")
-            chunks = self.process_section(section)
-            all_processed[section] = chunks
-            self.save_processed_chunks(chunks, section)
+            all_processed[section] = self.update_section(section, full=full)
 
-        total_chunks = sum(len(chunks) for chunks in all_processed.values())
-        logger.info(f"Total chunks processed: {total_chunks}")
+        total_chunks = sum(stats.get('total_chunks', 0) for stats in all_processed.values())
+        logger.info(f"Total chunks processed: {total_chunks} (peak RSS {peak_rss_mb():.0f} MB)")
 
         return all_processed
 
-    def get_chunk_statistics(self, chunks: List[Dict]) -> Dict:
+    def get_chunk_statistics(self, chunks: Iterable[Dict]) -> Dict:
         """
         Get statistics about chunks.
 
         Args:
-            chunks: List of chunk dictionaries
+            chunks: Iterable of chunk dictionaries
 
         Returns:
             Statistics dictionary
         """
-        if not chunks:
+        stats = ChunkStats()
+        for chunk in chunks:
+            stats.add(chunk)
+        return stats.as_dict()
+
+
+class ChunkStats:
+    """Running chunk statistics, so they can be gathered while streaming."""
+
+    def __init__(self):
+        self.total_chunks = 0
+        self.total_length = 0
+        self.min_length = None
+        self.max_length = 0
+        self.duplicate_chunks = 0
+        self.duplicate_length = 0
+        self.sections = set()
+
+    def add(self, chunk: Dict):
+        length = len(chunk['text'])
+        self.total_chunks += 1
+        self.total_length += length
+        self.min_length = length if self.min_length is None else min(self.min_length, length)
+        self.max_length = max(self.max_length, length)
+        if chunk['metadata'].get('duplicate_of'):
+            self.duplicate_chunks += 1
+            self.duplicate_length += length
+        self.sections.add(chunk['metadata'].get('section', ''))
+
+    def as_dict(self) -> Dict:
+        if not self.total_chunks:
             return {}
 
-        chunk_lengths = [len(chunk['text']) for chunk in chunks]
-
         return {
-            'total_chunks': len(chunks),
-            'avg_chunk_length': sum(chunk_lengths) / len(chunk_lengths),
-            'min_chunk_length': min(chunk_lengths),
-            'max_chunk_length': max(chunk_lengths),
-            'sections': list(set(chunk['metadata']['section'] for chunk in chunks))
+            'total_chunks': self.total_chunks,
+            'avg_chunk_length': self.total_length / self.total_chunks,
+            'min_chunk_length': self.min_length,
+            'max_chunk_length': self.max_length,
+            # Chunks that will not be embedded, and their share of the text to embed
+            'duplicate_chunks': self.duplicate_chunks,
+            'embedding_chars_saved': round(self.duplicate_length / self.total_length, 4) if self.total_length else 0,
+            'sections': list(self.sections)
         }
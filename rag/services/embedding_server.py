@@ -0,0 +1,277 @@
+"""
+Standalone embedding server and client.
+
+One process owns the sentence-transformer and serves every Django worker on
+the node, over TCP or a Unix socket. Concurrent requests are coalesced into
+shared ``encode`` batches, and vectors travel as raw little-endian float32.
+
+Protocol:
+    POST /embed    body: {"texts": [...]}  (JSON)
+                   200:  application/octet-stream, count * dim float32 values
+                         headers X-Embedding-Count, X-Embedding-Dim
+    GET  /health   200:  {"model": ..., "dimension": ..., "batches": ..., "texts": ...}
+"""
+import http.client
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+UNIX_SCHEME = 'unix'
+
+
+# ========== Server ==========
+
+class EmbeddingBatcher:
+    """Coalesce texts from concurrent requests into shared encode calls."""
+
+    def __init__(self, embedding_service, max_batch: int = 64, max_wait_ms: float = 5.0):
+        """
+        Args:
+            embedding_service: In-process EmbeddingService that owns the model
+            max_batch: Maximum number of texts per encode call
+            max_wait_ms: How long to wait for more requests before encoding
+        """
+        self.embedding_service = embedding_service
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.texts = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for embedding; the future resolves to a (n, dim) array."""
+        future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            texts = [text for request_texts, _ in pending for text in request_texts]
+            try:
+                embeddings = self.embedding_service.embed_documents(texts, show_progress_bar=False)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+
+            offset = 0
+            for request_texts, future in pending:
+                future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+
+class EmbeddingRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler for /embed and /health."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, so clients can reuse connections
+
+    def address_string(self):
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if self.client_address else UNIX_SCHEME
+
+    def do_GET(self):
+        if self.path != '/health':
+            self.send_error(404)
+            return
+
+        batcher = self.server.batcher
+        self._send_json({
+            'model': batcher.embedding_service.model_name,
+            'dimension': batcher.embedding_service.get_embedding_dimension(),
+            'batches': batcher.batches,
+            'texts': batcher.texts,
+        })
+
+    def do_POST(self):
+        if self.path != '/embed':
+            self.send_error(404)
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            texts = json.loads(self.rfile.read(length))['texts']
+            if not isinstance(texts, list):
+                raise ValueError('texts must be a list')
+        except Exception as e:
+            self.send_error(400, str(e))
+            return
+
+        try:
+            embeddings = self.server.batcher.submit(texts).result()
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {e}")
+            self.send_error(500, str(e))
+            return
+
+        payload = np.ascontiguousarray(embeddings, dtype='<f4').tobytes()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('X-Embedding-Count', str(embeddings.shape[0]))
+        self.send_header('X-Embedding-Dim', str(embeddings.shape[1] if embeddings.ndim == 2 else 0))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, data: dict):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server bound to a Unix domain socket."""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+        os.chmod(self.server_address, 0o660)
+
+
+def create_server(embedding_service, url: str, max_batch: int = 64, max_wait_ms: float = 5.0):
+    """
+    Build an embedding server listening on ``url``.
+
+    Args:
+        embedding_service: In-process EmbeddingService that owns the model
+        url: 'http://host:port' or 'unix:///path/to/socket'
+        max_batch: Maximum texts per encode call
+        max_wait_ms: Batching window
+
+    Returns:
+        socketserver instance (call serve_forever())
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == UNIX_SCHEME:
+        server = ThreadingUnixHTTPServer(parsed.path, EmbeddingRequestHandler)
+    else:
+        server = ThreadingHTTPServer((parsed.hostname or '127.0.0.1', parsed.port or 8765),
+                                     EmbeddingRequestHandler)
+        server.daemon_threads = True
+
+    server.batcher = EmbeddingBatcher(embedding_service, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    return server
+
+
+# ========== Client ==========
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, path: str, timeout: float = None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class EmbeddingClient:
+    """Client for the embedding server with one keep-alive connection per thread."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        """
+        Args:
+            url: 'http://host:port' or 'unix:///path/to/socket'
+            timeout: Socket timeout in seconds
+        """
+        self.url = url
+        self.timeout = timeout
+        self._parsed = urlparse(url)
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self._parsed.scheme == UNIX_SCHEME:
+                conn = UnixHTTPConnection(self._parsed.path, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(
+                    self._parsed.hostname, self._parsed.port or 8765, timeout=self.timeout
+                )
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+
+        # One retry on a fresh connection: the server may have closed an idle one
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+        if response.status != 200:
+            raise RuntimeError(f"Embedding server returned {response.status}: {data[:200]!r}")
+        return response, data
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts on the server.
+
+        Returns:
+            (len(texts), dim) float32 array
+        """
+        body = json.dumps({'texts': texts}, ensure_ascii=False).encode('utf-8')
+        response, data = self._request('POST', '/embed', body)
+        count = int(response.getheader('X-Embedding-Count'))
+        dim = int(response.getheader('X-Embedding-Dim'))
+        # frombuffer is read-only; copy once so callers can normalize in place
+        return np.frombuffer(data, dtype='<f4').reshape(count, dim).astype(np.float32)
+
+    def health(self) -> dict:
+        """Model name, dimension and batching counters of the server."""
+        _, data = self._request('GET', '/health')
+        return json.loads(data)
@@ -3,31 +3,167 @@ Embedding service for generating vector representations of text.
 Uses sentence-transformers (free, local embeddings)
 """
 import logging
+import threading
+import time
+from pathlib import Path
 from typing import List
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
+from django.conf import settings
+
+from .model_registry import ModelRegistry, ModelNotAvailable, attach_mmap_weights
 
 logger = logging.getLogger(__name__)
 
 
 class EmbeddingService:
-    """Service for generating text embeddings using local models."""
+    """
+    Service for generating text embeddings using local models.
+
+    In client mode (``EMBEDDING_SERVER_URL`` set) texts are sent to the shared
+    embedding server (see embedding_server.py) and the model is only loaded
+    in-process if the server is unreachable and fallback is enabled.
+    """
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = None, normalize: bool = True, server_url: str = None):
         """
         Initialize the embedding service with sentence-transformers.
 
         Args:
-            model_name: Model to use for embeddings. Options:
+            model_name: Model to use for embeddings (default: settings.EMBEDDING_MODEL). Options:
                 - "all-MiniLM-L6-v2" (default, fast, 384 dimensions)
                 - "all-mpnet-base-v2" (better quality, 768 dimensions)
+            normalize: L2-normalize vectors (in place) before returning them
+            server_url: Embedding server to use ('http://host:port' or 'unix:///path').
+                        Default: settings.EMBEDDING_SERVER_URL; '' forces in-process.
+        """
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self.normalize = normalize
+        self.model = None
+        self.weights_mapped = False
+        self._dimension = None
+        self._model_lock = threading.Lock()
+        # time.monotonic() before which the server is not tried again (it was down)
+        self._server_retry_at = 0.0
+
+        if server_url is None:
+            server_url = settings.EMBEDDING_SERVER_URL
+
+        if server_url:
+            from .embedding_server import EmbeddingClient
+
+            self.client = EmbeddingClient(server_url)
+            logger.info(f"Embedding service using server {server_url}")
+        else:
+            self.client = None
+            self._load_model()
+
+    def _load_model(self):
+        """Load the sentence-transformer in this process (once)."""
+        with self._model_lock:
+            if self.model is not None:
+                return
+
+            model_path = self._resolve_model_path(self.model_name)
+
+            # Deferred: sentence_transformers pulls in torch (seconds of import time)
+            from sentence_transformers import SentenceTransformer
+
+            logger.info(f"Loading embedding model: {self.model_name} from {model_path}")
+            # A registry snapshot never touches the hub, whatever HF_HUB_OFFLINE
+            # was when huggingface_hub was imported
+            model = SentenceTransformer(
+                str(model_path),
+                device='cpu',
+                local_files_only=isinstance(model_path, Path)
+            )
+
+            self.weights_mapped = (
+                isinstance(model_path, Path) and attach_mmap_weights(model, model_path)
+            )
+            self.model = model
+            logger.info(
+                f"Embedding service initialized with {self.model_name}"
+                f"{' (mmap weights)' if self.weights_mapped else ''}"
+            )
+
+    def _encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Encode texts on the embedding server, or in-process.
+
+        Args:
+            texts: Texts to embed
+            show_progress_bar: Show the sentence-transformers progress bar (in-process only)
+
+        Returns:
+            (len(texts), dim) array
+        """
+        if self._use_server():
+            try:
+                return self.client.embed(texts)
+            except Exception as e:
+                self._server_failed(e)
+
+        self._load_model()
+        return self.model.encode(
+            texts,
+            convert_to_numpy=True,
+            show_progress_bar=show_progress_bar
+        )
+
+    def _use_server(self) -> bool:
+        """Whether to send this request to the embedding server."""
+        if self.client is None:
+            return False
+        # Without fallback every request goes to the server and fails loudly
+        return not settings.EMBEDDING_SERVER_FALLBACK or time.monotonic() >= self._server_retry_at
+
+    def _server_failed(self, error: Exception):
         """
-        logger.info(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
-        self.model_name = model_name
-        logger.info(f"Embedding service initialized with {model_name}")
+        Fall back to the in-process model after a failed server request.
 
-    def embed_text(self, text: str) -> List[float]:
+        The server is not tried again for EMBEDDING_SERVER_RETRY_SECONDS, so
+        later calls do not each wait for the client timeout.
+
+        Raises:
+            The error when EMBEDDING_SERVER_FALLBACK is off
+        """
+        if not settings.EMBEDDING_SERVER_FALLBACK:
+            raise error
+        self._server_retry_at = time.monotonic() + settings.EMBEDDING_SERVER_RETRY_SECONDS
+        logger.warning(
+            f"Embedding server unavailable, encoding in-process for "
+            f"{settings.EMBEDDING_SERVER_RETRY_SECONDS:.0f}s: {error}"
+        )
+
+    @staticmethod
+    def _resolve_model_path(model_name: str):
+        """
+        Find the model in the local registry.
+
+        Args:
+            model_name: Registry / hub model name
+
+        Returns:
+            Local snapshot path, or the bare hub name when MODEL_OFFLINE is off
+            and the model has not been downloaded
+
+        Raises:
+            ModelNotAvailable: With MODEL_OFFLINE on, if the model was never downloaded
+        """
+        try:
+            model_path = ModelRegistry().resolve(model_name)
+        except ModelNotAvailable:
+            if settings.MODEL_OFFLINE:
+                raise
+            logger.warning(
+                f"{model_name} is not in the model registry; loading from the hub. "
+                f"Run `python manage.py download_models` before deploying."
+            )
+            return model_name
+        return model_path
+
+    def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text.
 
@@ -35,35 +171,53 @@ class EmbeddingService:
             text: Text to embed
 
         Returns:
-            Embedding vector as list of floats
+            Embedding vector as a 1-D contiguous float32 array
         """
         try:
-            embedding = self.model.encode(text, convert_to_tensor=False)
-            return embedding.tolist()
+            return self._prepare(self._encode([text])[0])
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             raise
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def embed_documents(self, texts: List[str], show_progress_bar: bool = True) -> np.ndarray:
         """
         Generate embeddings for multiple texts in batch.
 
         Args:
             texts: List of texts to embed
+            show_progress_bar: Show the sentence-transformers progress bar
 
         Returns:
-            List of embedding vectors
+            2-D contiguous float32 array of shape (len(texts), dimension)
         """
         try:
             logger.info(f"Generating embeddings for {len(texts)} documents")
-            embeddings = self.model.encode(texts, convert_to_tensor=False, show_progress_bar=True)
-            embeddings_list = [emb.tolist() for emb in embeddings]
-            logger.info(f"Successfully generated {len(embeddings_list)} embeddings")
-            return embeddings_list
+            embeddings = self._prepare(self._encode(texts, show_progress_bar=show_progress_bar))
+            logger.info(f"Successfully generated {embeddings.shape[0]} embeddings")
+            return embeddings
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             raise
 
+    def _prepare(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Make sure vectors are C-contiguous float32 and normalize them in place.
+
+        Args:
+            embeddings: 1-D or 2-D array returned by the model
+
+        Returns:
+            The same buffer when no copy was needed
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+            np.maximum(norms, 1e-12, out=norms)
+            np.divide(embeddings, norms, out=embeddings)
+
+        return embeddings
+
     def get_embedding_dimension(self) -> int:
         """
         Get the dimension of the embedding vectors.
@@ -73,4 +227,13 @@ class EmbeddingService:
         """
         # all-MiniLM-L6-v2 has 384 dimensions
         # all-mpnet-base-v2 has 768 dimensions
-        return self.model.get_sentence_embedding_dimension()
+        if self._dimension is None:
+            if self.model is None and self._use_server():
+                try:
+                    self._dimension = self.client.health()['dimension']
+                    return self._dimension
+                except Exception as e:
+                    self._server_failed(e)
+            self._load_model()
+            self._dimension = self.model.get_sentence_embedding_dimension()
+        return self._dimension
@@ -0,0 +1,129 @@
+"""
+Import-time budget check.
+
+Runs a fresh interpreter with ``python -X importtime``, parses the report and
+checks that cold start stays under a budget and never pulls in heavy
+dependencies (numpy, torch, chromadb, LangChain, Playwright) before they are
+needed.
+"""
+import logging
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Top-level packages that must only be imported on first real use
+HEAVY_MODULES = (
+    'numpy',
+    'torch',
+    'sentence_transformers',
+    'transformers',
+    'chromadb',
+    'langchain',
+    'langchain_core',
+    'langchain_google_genai',
+    'playwright',
+)
+
+# What a web worker and the management commands load before doing any work.
+# rag_engine is imported by the first query and by most commands' handle();
+# its import chain (document_processor, chunk_store, ...) must stay light too.
+STARTUP_MODULES = (
+    'config.urls',
+    'rag.views',
+    'rag.services.rag_engine',
+    'rag.management.commands.bench_corpus',
+    'rag.management.commands.bench_index',
+    'rag.management.commands.bench_parser',
+    'rag.management.commands.bench_splitter',
+    'rag.management.commands.build_index',
+    'rag.management.commands.convert_chunks',
+    'rag.management.commands.download_models',
+    'rag.management.commands.embedding_server',
+    'rag.management.commands.generate_xml_corpus',
+    'rag.management.commands.ingest',
+    'rag.management.commands.process_docs',
+    'rag.management.commands.scrape_docs',
+    'rag.management.commands.test_query',
+    'rag.management.commands.worker_memory',
+)
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$')
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """
+    Parse the stderr output of ``python -X importtime``.
+
+    Args:
+        stderr: Raw stderr text
+
+    Returns:
+        List of {'module', 'self_us', 'cumulative_us', 'depth'} dicts
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append({
+            'module': module,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': max(len(indent) - 1, 0) // 2,
+        })
+    return entries
+
+
+def measure_startup(modules: Optional[List[str]] = None) -> Dict:
+    """
+    Import the startup modules in a clean interpreter and summarize the cost.
+
+    Args:
+        modules: Modules to import after django.setup() (default: STARTUP_MODULES)
+
+    Returns:
+        {'total_ms', 'slowest': [(module, ms), ...], 'heavy_modules': [...]}
+    """
+    modules = list(modules or STARTUP_MODULES)
+    script = (
+        "import os, django\n"
+        "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')\n"
+        "django.setup()\n"
+        + ''.join(f"import {module}\n" for module in modules)
+    )
+
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=str(settings.BASE_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ['']
+        raise RuntimeError(f"Startup import failed: {tail[0]}")
+
+    entries = parse_importtime(result.stderr)
+    top_level = [e for e in entries if e['depth'] == 0]
+    total_us = sum(e['cumulative_us'] for e in top_level)
+    slowest = sorted(top_level, key=lambda e: e['cumulative_us'], reverse=True)[:10]
+    heavy = sorted({
+        e['module'] for e in entries
+        if e['module'].split('.')[0] in HEAVY_MODULES
+    })
+
+    return {
+        'total_ms': total_us / 1000,
+        'slowest': [(e['module'], e['cumulative_us'] / 1000) for e in slowest],
+        'heavy_modules': heavy,
+    }
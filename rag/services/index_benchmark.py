@@ -0,0 +1,246 @@
+"""
+End-to-end benchmark of the processing and indexing stages.
+
+Runs ``process_docs`` and ``build_index`` on a synthetic (or sampled) corpus
+in a scratch data directory and database, against a local persistent
+ChromaDB, and reports chunks/s per stage, peak RSS and bytes written. Used by
+the ``bench_index`` management command to get a baseline and catch
+throughput regressions.
+"""
+import hashlib
+import logging
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+from asgiref.local import Local
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import override_settings
+
+from .docs_store import PatentWriter, docs_path, find_docs, iter_patents
+from .profiling import StageTimer, directory_size, peak_rss_mb, profile_threads
+from .synthetic_xml import AGENCIES, SUBJECTS, SYNTHETIC_PREFIX, boilerplate, paragraph, sentence
+
+logger = logging.getLogger(__name__)
+
+BENCH_SECTION = 'bench'
+
+_TYPES = ['invention', 'utility', 'design']
+
+
+def _paragraphs(rng: random.Random, count: int, sentences: int) -> str:
+    # Joined without separators, like TIPOXMLParser joins the <p> elements
+    return ''.join(paragraph(rng, i + 1, sentences) for i in range(count))
+
+
+def synthetic_documents(count: int, seed: int = 0) -> Iterator[Dict]:
+    """
+    Generate patent documents shaped like the parsed TIPO data.
+
+    Text lengths follow real gazettes: a short abstract, a long description
+    and a handful of claims. Descriptions start with the boilerplate of one
+    of a few agencies, as real filings do.
+
+    Args:
+        count: Number of documents
+        seed: Random seed (the same seed yields the same corpus)
+
+    Yields:
+        Patent document dictionaries
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        subject = rng.choice(SUBJECTS)
+        year = rng.randint(2005, 2024)
+        patent_type = rng.choice(_TYPES)
+        yield {
+            'patent_number': f"{SYNTHETIC_PREFIX}{'IMD'[_TYPES.index(patent_type)]}{600000 + i:06d}",
+            'title': f"{subject}及其製造方法",
+            'abstract': f"本發明提供一種{subject}。" + ''.join(sentence(rng) for _ in range(6)),
+            'description': boilerplate(rng.randrange(AGENCIES)) + _paragraphs(rng, rng.randint(8, 30), 10),
+            'claims': [
+                f"{n + 1}. 一種{subject}，包含：" + ''.join(sentence(rng) for _ in range(rng.randint(2, 6)))
+                for n in range(rng.randint(3, 15))
+            ],
+            'applicant': f"範例科技股份有限公司{rng.randint(1, 50)}",
+            'inventor': f"發明人{rng.randint(1, 500)}",
+            'application_date': f"{year - 1}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}",
+            'publication_date': f"{year}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}",
+            'ipc_classification': f"H01L {rng.randint(21, 51)}/{rng.randint(0, 99):02d}",
+            'patent_type': patent_type,
+        }
+
+
+def sample_documents(section: str, count: int) -> Iterator[Dict]:
+    """
+    The first documents of a scraped section (RAW_DATA_DIR/{section}_docs.jsonl).
+
+    Args:
+        section: Section to sample from
+        count: Number of documents
+
+    Returns:
+        Iterator over patent document dictionaries
+    """
+    # Resolved now: the corpus is consumed inside run_benchmark, where
+    # RAW_DATA_DIR points at the scratch directory
+    path = find_docs(section)
+    if path is None:
+        raise FileNotFoundError(f"Input file not found: {docs_path(section)}")
+    return islice(iter_patents(path), count)
+
+
+class HashEmbeddings:
+    """
+    Deterministic stand-in for the embedding model.
+
+    Benchmarks the pipeline around the model (chunking, batching, vector
+    store writes) without the cost of running it.
+    """
+
+    model_name = 'hash'
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def embed_documents(self, texts, show_progress_bar: bool = False) -> np.ndarray:
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha1(text.encode('utf-8')).digest()[:8], 'little')
+            embeddings[row] = np.random.default_rng(seed).standard_normal(self.dimension)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings
+
+    def embed_text(self, text: str) -> np.ndarray:
+        return self.embed_documents([text])[0]
+
+    def get_embedding_dimension(self) -> int:
+        return self.dimension
+
+
+@contextmanager
+def scratch_database(path: Path):
+    """
+    Point the default database at a fresh, migrated SQLite file.
+
+    override_settings(DATABASES=...) does not reach connections that already
+    exist, nor the pipeline threads' own connections, so the connection
+    handler itself is switched over while the block runs.
+
+    Args:
+        path: SQLite file to create (replaced if it exists)
+    """
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    databases = {DEFAULT_DB_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path)}}
+
+    connections.close_all()
+    saved_settings, saved_connections = connections.settings, connections._connections
+    connections.settings = connections.configure_settings(databases)
+    connections._connections = Local(connections.thread_critical)
+    try:
+        call_command('migrate', verbosity=0, interactive=False)
+        yield
+    finally:
+        connections.close_all()
+        connections.settings, connections._connections = saved_settings, saved_connections
+
+
+def run_benchmark(documents: Iterable[Dict], workdir: Path, embedding_service=None,
+                  writers: Optional[int] = None, process_workers: Optional[int] = None,
+                  profile_path: Optional[Path] = None, duplicate_threshold: Optional[float] = None) -> Dict:
+    """
+    Write a corpus, process it into chunks and index it, timing each stage.
+
+    Args:
+        documents: Corpus to benchmark with
+        workdir: Scratch directory for the data files, the vector store and
+            the database the patent and chunk rows are written to
+        embedding_service: Embedder to use (default: the configured model)
+        writers: Parallel vector-store writers (default: INDEX_WRITERS)
+        process_workers: Chunking processes (default: PROCESS_WORKERS)
+        profile_path: Write a cProfile dump of the process and index stages here
+        duplicate_threshold: Near-duplicate threshold (default: NEAR_DUPLICATE_THRESHOLD, 0 = off)
+
+    Returns:
+        Report with per-stage rates, peak RSS, bytes written and the
+        embeddings skipped as near-duplicates
+    """
+    import chromadb
+
+    from .document_processor import DocumentProcessor
+    from .rag_engine import RAGEngine
+
+    workdir = Path(workdir)
+    raw_dir = workdir / 'raw'
+    processed_dir = workdir / 'processed'
+    chroma_dir = workdir / 'chroma'
+    for directory in (raw_dir, processed_dir, chroma_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    report = {'stages': []}
+    started = time.perf_counter()
+
+    with scratch_database(workdir / 'db.sqlite3'), override_settings(
+        RAW_DATA_DIR=raw_dir,
+        PROCESSED_DATA_DIR=processed_dir,
+        INDEX_CHECKPOINT_DIR=workdir / 'checkpoints'
+    ):
+        with StageTimer('corpus') as corpus:
+            with PatentWriter(docs_path(BENCH_SECTION, raw_dir)) as writer:
+                for document in documents:
+                    writer.write(document)
+                    corpus.add(1)
+        report['documents'] = corpus.items
+        report['corpus_bytes'] = directory_size(raw_dir)
+
+        chroma_client = chromadb.PersistentClient(path=str(chroma_dir))
+        engine = RAGEngine(
+            chroma_client=chroma_client,
+            embedding_service=embedding_service,
+            with_llm=False
+        )
+        report['embedding_model'] = engine.embedding_service.model_name
+
+        # Built outside the timed stages: importing the splitter is not throughput
+        processor = DocumentProcessor(workers=process_workers, duplicate_threshold=duplicate_threshold)
+        report['process_workers'] = processor.workers
+
+        profiler = profile_threads(profile_path) if profile_path else nullcontext()
+        with profiler:
+            with StageTimer('process') as process:
+                stats = processor.process_all_sections(sections=[BENCH_SECTION], full=True)
+                process.add(stats[BENCH_SECTION].get('total_chunks', 0))
+            report['stages'].append(dict(
+                process.as_dict(),
+                bytes_written=directory_size(processed_dir),
+                peak_rss_mb=round(peak_rss_mb(), 1)
+            ))
+
+            with StageTimer('index') as index:
+                result = engine.index_documents(rebuild=True, writers=writers)
+                index.add(result['upserted'])
+            report['stages'].append(dict(
+                index.as_dict(),
+                bytes_written=directory_size(chroma_dir) + directory_size(workdir / 'checkpoints'),
+                peak_rss_mb=round(peak_rss_mb(), 1)
+            ))
+            # read/embed/write breakdown from the index pipeline
+            report['pipeline'] = result['stages'][BENCH_SECTION]['stages']
+            report['duplicates'] = {
+                'chunks': result['duplicates'],
+                'embedding_chars_saved': stats[BENCH_SECTION].get('embedding_chars_saved', 0),
+                'vector_bytes_saved': result['vector_bytes_saved'],
+            }
+
+    report['chunks'] = process.items
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    report['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    if profile_path:
+        report['profile'] = str(profile_path)
+    return report
@@ -0,0 +1,110 @@
+"""
+Durable progress records for index builds.
+
+Each section being indexed gets an append-only log of completed batch numbers
+under ``INDEX_CHECKPOINT_DIR``. The first line fingerprints the build (chunk
+file size and mtime, batch size, collection), so a log written for a different
+input is ignored instead of skipping the wrong batches. The log is removed once
+the section finishes.
+"""
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class IndexCheckpoint:
+    """Completed-batch log for one (collection, section) build."""
+
+    def __init__(self, collection: str, section: str, fingerprint: Dict,
+                 directory: Optional[Path] = None):
+        """
+        Args:
+            collection: Target collection name
+            section: Section being indexed
+            fingerprint: Anything that must match for the log to be reusable
+            directory: Checkpoint directory (default: settings.INDEX_CHECKPOINT_DIR)
+        """
+        self.path = Path(directory or settings.INDEX_CHECKPOINT_DIR) / f'{collection}__{section}.log'
+        self.header = dict(fingerprint, collection=collection, section=section)
+        self._file = None
+        self._lock = threading.Lock()
+        # Size of the log up to its last complete line (set by _load)
+        self._complete_size = 0
+
+    def open(self, resume: bool) -> Set[int]:
+        """
+        Start recording progress.
+
+        Args:
+            resume: Keep batches recorded by a previous, interrupted run
+
+        Returns:
+            Batch numbers already completed (empty unless resuming)
+        """
+        completed = self._load() if resume else set()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if completed:
+            # Drop a torn last line, or the next record would be glued onto it
+            os.truncate(self.path, self._complete_size)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            logger.info(f"Resuming {self.header['section']}: {len(completed)} batches already done")
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write(json.dumps(self.header) + '\n')
+            self._sync()
+        return completed
+
+    def record(self, batch_number: int):
+        """Durably mark a batch as written to the vector store."""
+        with self._lock:
+            self._file.write(f'{batch_number}\n')
+            self._sync()
+
+    def complete(self):
+        """The section finished: drop the log."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _load(self) -> Set[int]:
+        if not self.path.exists():
+            return set()
+
+        with open(self.path, 'rb') as f:
+            first = f.readline()
+            try:
+                header = json.loads(first) if first.endswith(b'\n') else None
+            except json.JSONDecodeError:
+                header = None
+
+            if header != self.header:
+                logger.warning(f"Ignoring checkpoint {self.path.name}: input or settings changed")
+                return set()
+
+            completed = set()
+            size = len(first)
+            for line in f:
+                # A torn last line from a crash is simply not counted
+                if not line.endswith(b'\n'):
+                    break
+                size += len(line)
+                if line.strip().isdigit():
+                    completed.add(int(line))
+            self._complete_size = size
+            return completed
@@ -0,0 +1,205 @@
+"""
+Staged producer/consumer pipeline for index builds.
+
+    reader ──▶ [embed queue] ──▶ embedder ──▶ [write queue] ──▶ writer × N
+
+Each stage runs in its own thread(s) and hands batches over through bounded
+queues, so encoding (CPU) overlaps with vector-store writes (network) and a
+slow stage back-pressures the stages before it instead of buffering the
+corpus in memory.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+from .profiling import StageTimer, peak_rss_mb
+
+logger = logging.getLogger(__name__)
+
+# Sentinel telling a consumer that its producer is finished
+_DONE = object()
+
+
+class IndexBatch:
+    """One batch of chunks travelling through the pipeline."""
+
+    __slots__ = ('ids', 'texts', 'metadatas', 'embeddings', 'number')
+
+    def __init__(self, ids: List[str], texts: List[str], metadatas: List[Dict], number: int = 0):
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.embeddings = None
+        self.number = number
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class IndexPipeline:
+    """Run read → embed → write concurrently with bounded queues."""
+
+    def __init__(
+        self,
+        embed: Callable,
+        write: Callable[[IndexBatch], None],
+        writers: int = 4,
+        queue_size: int = 4
+    ):
+        """
+        Args:
+            embed: Function mapping a list of texts to an embedding matrix
+            write: Function storing an embedded IndexBatch in the vector store
+            writers: Number of parallel writer threads
+            queue_size: Maximum batches waiting between two stages
+        """
+        self.embed = embed
+        self.write = write
+        self.writers = max(1, writers)
+        self.queue_size = max(1, queue_size)
+
+        self.timers = {
+            'read': StageTimer('read'),
+            'embed': StageTimer('embed'),
+            'write': StageTimer('write'),
+        }
+        self.backpressure_seconds = 0.0
+        self._errors = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self, batches: Iterable[IndexBatch]) -> Dict:
+        """
+        Push every batch through the pipeline and wait for completion.
+
+        Args:
+            batches: Iterable of IndexBatch (consumed lazily by the reader)
+
+        Returns:
+            Per-stage throughput report
+
+        Raises:
+            The first exception raised by any stage
+        """
+        embed_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+        started = time.perf_counter()
+
+        threads = [
+            threading.Thread(target=self._read, args=(batches, embed_queue), name='index-read'),
+            threading.Thread(target=self._embed, args=(embed_queue, write_queue), name='index-embed'),
+        ]
+        threads += [
+            threading.Thread(target=self._write, args=(write_queue,), name=f'index-write-{i}')
+            for i in range(self.writers)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+        elapsed = time.perf_counter() - started
+        report = {
+            'seconds': round(elapsed, 3),
+            'chunks': self.timers['write'].items,
+            'chunks_per_sec': round(self.timers['write'].items / elapsed, 1) if elapsed else 0.0,
+            'backpressure_seconds': round(self.backpressure_seconds, 3),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'stages': [timer.as_dict() for timer in self.timers.values()],
+        }
+        logger.info(
+            f"Pipeline: {report['chunks']} chunks in {elapsed:.2f}s "
+            f"({report['chunks_per_sec']}/s) | "
+            + ' | '.join(str(timer) for timer in self.timers.values())
+            + f" | backpressure {self.backpressure_seconds:.2f}s | peak RSS {report['peak_rss_mb']:.0f} MB"
+        )
+        return report
+
+    # ---------- stages ----------
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up when the pipeline is stopping."""
+        waited = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                with self._lock:
+                    self.backpressure_seconds += time.perf_counter() - waited
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that gives up when the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: Exception):
+        logger.error(f"Index pipeline stage failed: {error}")
+        with self._lock:
+            self._errors.append(error)
+        self._stop.set()
+
+    def _read(self, batches: Iterable[IndexBatch], embed_queue: queue.Queue):
+        try:
+            iterator = iter(batches)
+            while True:
+                with self.timers['read']:
+                    batch = next(iterator, None)
+                if batch is None:
+                    break
+                self.timers['read'].add(len(batch))
+                if not self._put(embed_queue, batch):
+                    return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(embed_queue, _DONE)
+
+    def _embed(self, embed_queue: queue.Queue, write_queue: queue.Queue):
+        try:
+            while True:
+                batch = self._get(embed_queue)
+                if batch is _DONE:
+                    break
+                with self.timers['embed']:
+                    batch.embeddings = self.embed(batch.texts)
+                self.timers['embed'].add(len(batch))
+                if not self._put(write_queue, batch):
+                    return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            # One sentinel per writer
+            for _ in range(self.writers):
+                self._put(write_queue, _DONE)
+
+    def _write(self, write_queue: queue.Queue):
+        timer = StageTimer('write')
+        try:
+            while True:
+                batch = self._get(write_queue)
+                if batch is _DONE:
+                    break
+                with timer:
+                    self.write(batch)
+                timer.add(len(batch))
+        except Exception as e:
+            self._fail(e)
+        finally:
+            # Writers run in parallel: sum items, report the busiest writer's time
+            with self._lock:
+                total = self.timers['write']
+                total.items += timer.items
+                total.seconds = max(total.seconds, timer.seconds)
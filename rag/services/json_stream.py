@@ -0,0 +1,139 @@
+"""
+Streaming readers and writers for large JSON array files.
+
+The legacy ``{section}_docs.json`` and ``{section}_chunks.json`` files are
+single JSON arrays that grow with the corpus. These helpers read them one element at a time and
+write them element by element, so memory stays flat regardless of file size.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterator
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+
+
+def iter_json_array(path: Path, buffer_size: int = 1 << 20) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array without loading the file.
+
+    Args:
+        path: JSON file containing one array
+        buffer_size: Characters read per refill
+
+    Yields:
+        Decoded array elements, in order
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        position = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, position, eof
+            data = f.read(buffer_size)
+            if not data:
+                eof = True
+            buffer = buffer[position:] + data
+            position = 0
+
+        def skip(chars: str):
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in chars:
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                fill()
+
+        skip(_WHITESPACE)
+        if position >= len(buffer) or buffer[position] != '[':
+            raise ValueError(f"{path} does not contain a JSON array")
+        position += 1
+
+        while True:
+            skip(_WHITESPACE)
+            if position < len(buffer) and buffer[position] == ']':
+                return
+
+            # Decode one element, reading more when it is cut off mid-buffer
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                    break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+
+            # A number may be cut off by the buffer ("12" of "12.5"): only accept
+            # it once the delimiter that follows it has been read
+            is_number = isinstance(item, (int, float)) and not isinstance(item, bool)
+            if is_number and not eof and (end == len(buffer) or buffer[end] not in _DELIMITERS):
+                fill()
+                continue
+
+            position = end
+            yield item
+
+            skip(_WHITESPACE)
+            if position < len(buffer) and buffer[position] == ',':
+                position += 1
+            elif position < len(buffer) and buffer[position] == ']':
+                return
+            elif eof:
+                raise ValueError(f"{path}: unterminated JSON array")
+
+
+class JSONArrayWriter:
+    """
+    Write a JSON array one element at a time.
+
+    Output goes to a temporary file that replaces the target on close, so a
+    crash never leaves a truncated file behind.
+    """
+
+    def __init__(self, path: Path, indent: int = None):
+        """
+        Args:
+            path: Final output file
+            indent: Passed to json.dumps for each element
+        """
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self.indent = indent
+        self.count = 0
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+        self._file.write('[')
+
+    def write(self, item: Any):
+        """Append one element."""
+        self._file.write(',\n' if self.count else '\n')
+        self._file.write(json.dumps(item, ensure_ascii=False, indent=self.indent))
+        self.count += 1
+
+    def close(self):
+        """Finish the array and atomically move it into place."""
+        self._file.write('\n]\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Discard the partial output."""
+        self._file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
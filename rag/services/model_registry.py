@@ -0,0 +1,248 @@
+"""
+Local model registry for embedding models.
+
+Models are downloaded ahead of deployment (``manage.py download_models``) into
+``MODEL_REGISTRY_DIR`` and pinned to an exact hub commit. At runtime they are
+loaded strictly offline from the registry, and safetensors weights are mapped
+straight from disk so that every worker process shares the same page-cache
+pages instead of holding a private copy.
+
+Layout::
+
+    MODEL_REGISTRY_DIR/
+        registry.json                 # name -> repo_id, revision, path
+        all-MiniLM-L6-v2/<commit sha>/  # snapshot files
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FILE = 'registry.json'
+
+# Only the files sentence-transformers needs; skip pytorch_model.bin, ONNX, etc.
+ALLOW_PATTERNS = [
+    '*.json',
+    '*.txt',
+    '*.safetensors',
+    'sentencepiece.bpe.model',
+    '1_Pooling/*',
+    '2_Normalize/*',
+]
+
+
+class ModelNotAvailable(Exception):
+    """Raised when a model is not present in the local registry."""
+
+
+class ModelRegistry:
+    """Pinned, offline-first store of embedding model snapshots."""
+
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Args:
+            root: Registry directory (default: settings.MODEL_REGISTRY_DIR)
+        """
+        self.root = Path(root or settings.MODEL_REGISTRY_DIR)
+
+    @property
+    def registry_file(self) -> Path:
+        return self.root / REGISTRY_FILE
+
+    def load(self) -> Dict[str, Dict]:
+        """Read registry.json (empty dict when the registry does not exist)."""
+        if not self.registry_file.exists():
+            return {}
+        with open(self.registry_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save(self, entries: Dict[str, Dict]):
+        """Write registry.json atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.registry_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.registry_file)
+
+    def resolve(self, name: str) -> Path:
+        """
+        Get the local snapshot directory of a registered model.
+
+        Args:
+            name: Model name (e.g. 'all-MiniLM-L6-v2')
+
+        Returns:
+            Path to the pinned snapshot
+
+        Raises:
+            ModelNotAvailable: If the model was never downloaded
+        """
+        entry = self.load().get(name)
+        if entry:
+            path = self.root / entry['path']
+            if (path / 'config.json').exists() or (path / 'modules.json').exists():
+                return path
+
+        raise ModelNotAvailable(
+            f"Model '{name}' is not in the local registry {self.root}. "
+            f"Run `python manage.py download_models {name}` first."
+        )
+
+    def download(self, name: str, repo_id: Optional[str] = None,
+                 revision: Optional[str] = None, force: bool = False) -> Dict:
+        """
+        Download a model snapshot into the registry and pin its commit.
+
+        Args:
+            name: Registry name for the model
+            repo_id: Hub repository (default: settings.EMBEDDING_MODELS[name] or
+                     'sentence-transformers/<name>')
+            revision: Branch, tag or commit to pin (default: configured revision or 'main')
+            force: Re-download even if the pinned snapshot already exists
+
+        Returns:
+            Registry entry for the model
+        """
+        from huggingface_hub import HfApi, snapshot_download
+
+        configured = settings.EMBEDDING_MODELS.get(name, {})
+        repo_id = repo_id or configured.get('repo_id') or f'sentence-transformers/{name}'
+        revision = revision or configured.get('revision') or 'main'
+
+        # Resolve the branch/tag to an immutable commit so the pin is exact
+        sha = HfApi().model_info(repo_id, revision=revision).sha
+        relative_path = Path(name) / sha
+        target = self.root / relative_path
+
+        entries = self.load()
+        existing = entries.get(name)
+        if existing and existing.get('revision') == sha and target.exists() and not force:
+            logger.info(f"{name} already pinned at {sha[:12]}")
+            return existing
+
+        logger.info(f"Downloading {repo_id}@{sha[:12]} to {target}")
+        snapshot_download(
+            repo_id=repo_id,
+            revision=sha,
+            local_dir=str(target),
+            allow_patterns=ALLOW_PATTERNS,
+        )
+
+        if not any(target.glob('*.safetensors')):
+            logger.warning(f"{repo_id}@{sha[:12]} has no safetensors weights; mmap loading disabled")
+
+        entry = {
+            'repo_id': repo_id,
+            'revision': sha,
+            'path': str(relative_path),
+            'downloaded_at': datetime.now(timezone.utc).isoformat(),
+        }
+        entries[name] = entry
+        self._save(entries)
+        return entry
+
+
+# ========== Memory-mapped safetensors ==========
+
+_SAFETENSORS_DTYPES = {
+    'F64': 'float64',
+    'F32': 'float32',
+    'F16': 'float16',
+    'BF16': 'bfloat16',
+    'I64': 'int64',
+    'I32': 'int32',
+    'I16': 'int16',
+    'I8': 'int8',
+    'U8': 'uint8',
+    'BOOL': 'bool',
+}
+
+
+def mmap_safetensors(path: Path) -> Dict:
+    """
+    Map a safetensors file and build tensors that point into the mapping.
+
+    The mapping is copy-on-write (ACCESS_COPY): pages stay backed by the file
+    and shared between processes until something writes to them, which never
+    happens for inference weights.
+
+    Args:
+        path: .safetensors file
+
+    Returns:
+        Dict of parameter name -> torch.Tensor backed by the file
+    """
+    import torch
+
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    header_size = struct.unpack('<Q', mapped[:8])[0]
+    header = json.loads(mapped[8:8 + header_size])
+    data_start = 8 + header_size
+
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = getattr(torch, _SAFETENSORS_DTYPES[info['dtype']])
+        begin, end = info['data_offsets']
+        count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+        tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + begin)
+        tensors[name] = tensor.reshape(info['shape'])
+
+    return tensors
+
+
+def attach_mmap_weights(model, model_dir: Path) -> bool:
+    """
+    Swap the transformer weights of a SentenceTransformer for mmap-backed tensors.
+
+    Args:
+        model: Loaded SentenceTransformer
+        model_dir: Snapshot directory containing model.safetensors
+
+    Returns:
+        True if the weights are now file-backed
+    """
+    weights_file = Path(model_dir) / 'model.safetensors'
+    if not weights_file.exists():
+        return False
+
+    try:
+        auto_model = model[0].auto_model
+        state = mmap_safetensors(weights_file)
+
+        # Checkpoints are sometimes saved with the base model prefix ("bert.")
+        prefix = f'{auto_model.base_model_prefix}.'
+        expected = auto_model.state_dict()
+        if not any(key in expected for key in state):
+            state = {
+                key[len(prefix):] if key.startswith(prefix) else key: tensor
+                for key, tensor in state.items()
+            }
+
+        state = {
+            key: tensor for key, tensor in state.items()
+            if key in expected
+            and expected[key].shape == tensor.shape
+            and expected[key].dtype == tensor.dtype
+        }
+        if not state:
+            return False
+
+        auto_model.load_state_dict(state, strict=False, assign=True)
+        logger.info(f"Mapped {len(state)} weight tensors from {weights_file}")
+        return True
+
+    except Exception as e:
+        logger.warning(f"Falling back to private weights for {model_dir}: {e}")
+        return False
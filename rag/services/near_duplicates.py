@@ -0,0 +1,246 @@
+"""
+Near-duplicate chunk detection (MinHash + LSH).
+
+TIPO descriptions repeat a lot of boilerplate across patents of the same
+applicant or agent: figure descriptions, reference-numeral lists, standard
+legal phrasing. Embedding every copy costs model time and index space
+without helping retrieval. The detector clusters chunks whose character
+shingles are nearly identical; the first chunk of a cluster is its
+representative and is embedded, the others are marked ``duplicate_of`` it.
+
+Signatures are computed with numpy (no per-shingle Python loop): the text is
+viewed as an array of code points, 5-gram shingles get a polynomial hash,
+and each of the num_perm hash functions is a multiply-shift over 64 bits.
+"""
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class NearDuplicateDetector:
+    """Cluster near-identical texts with MinHash signatures and LSH banding."""
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, bands: int = 8,
+                 shingle_size: int = 5, min_length: int = 50, seed: int = 1):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity of shingle sets at or above
+                       which a text is a duplicate of a representative
+            num_perm: MinHash functions per signature
+            bands: LSH bands (num_perm must be divisible by it); with 8 bands
+                   of 8 rows, pairs at 0.9 similarity are candidates ~99% of the time
+            shingle_size: Characters per shingle
+            min_length: Shorter texts are never treated as duplicates
+            seed: Seed of the hash functions (signatures are stable across runs)
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_length = min_length
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        # Odd multipliers for multiply-shift hashing
+        self._a = rng.randint(0, 2 ** 62, size=num_perm, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 2 ** 62, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._powers = np.array(
+            [pow(1000003, shingle_size - 1 - k, 2 ** 64) for k in range(shingle_size)], dtype=np.uint64
+        )
+
+        # LSH buckets: hash of (band, band values) -> representative number
+        self._buckets = {}
+        # Signatures of the representatives (upper 32 bits), grown in blocks
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self._ids = []
+        self._numbers = {}
+        # Representatives that were discarded (their chunk is gone)
+        self._discarded = set()
+
+        self.seen = 0
+        self.duplicates = 0
+        self.duplicate_chars = 0
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text's character shingles (num_perm uint32 values)."""
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        if len(codes) < self.shingle_size:
+            codes = np.pad(codes, (0, self.shingle_size - len(codes)))
+        windows = np.lib.stride_tricks.sliding_window_view(codes, self.shingle_size)
+        with np.errstate(over='ignore'):
+            shingles = (windows * self._powers).sum(axis=1, dtype=np.uint64)
+            # In place: an (a * x + b) expression would allocate a second matrix
+            hashed = np.multiply.outer(self._a, shingles)
+            hashed += self._b[:, None]
+        return (hashed.min(axis=1) >> np.uint64(32)).astype(np.uint32)
+
+    def add(self, text: str, item_id: str) -> Optional[str]:
+        """
+        Look a text up and register it as a representative if it has no match.
+
+        Args:
+            text: Chunk text
+            item_id: ID the text is known by
+
+        Returns:
+            ID of the representative the text duplicates, or None
+        """
+        self.seen += 1
+        representative = self._match(text, item_id)
+        if representative is not None:
+            self.duplicates += 1
+            self.duplicate_chars += len(text)
+        return representative
+
+    def _match(self, text: str, item_id: str) -> Optional[str]:
+        if len(text) < self.min_length:
+            return None
+
+        signature = self.signature(text)
+        keys = self._band_keys(signature)
+
+        checked = set()
+        for key in keys:
+            number = self._buckets.get(key)
+            if number is None or number in checked or number in self._discarded:
+                continue
+            checked.add(number)
+            if self._ids[number] == item_id:
+                # Already a representative (restored by load())
+                return None
+            similarity = np.count_nonzero(self._signatures[number] == signature) / self.num_perm
+            if similarity >= self.threshold:
+                return self._ids[number]
+
+        self._register(signature, item_id, keys)
+        return None
+
+    def _band_keys(self, signature: np.ndarray):
+        return [
+            hash((band, signature[band * self.rows:(band + 1) * self.rows].tobytes()))
+            for band in range(self.bands)
+        ]
+
+    def _register(self, signature: np.ndarray, item_id: str, keys=None):
+        number = len(self._ids)
+        if number == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[number] = signature
+        self._ids.append(item_id)
+        self._numbers[item_id] = number
+        for key in keys or self._band_keys(signature):
+            # First representative per bucket (discard() frees it)
+            self._buckets.setdefault(key, number)
+
+    def discard(self, item_ids: Iterable[str]):
+        """
+        Stop matching texts against these representatives (e.g. chunks that were removed).
+
+        Their buckets are freed, so the next representative registered in a
+        bucket takes it over.
+        """
+        for item_id in item_ids:
+            number = self._numbers.get(item_id)
+            if number is None or number in self._discarded:
+                continue
+            self._discarded.add(number)
+            for key in self._band_keys(self._signatures[number]):
+                if self._buckets.get(key) == number:
+                    del self._buckets[key]
+
+    def _settings(self) -> list:
+        return [self.threshold, self.num_perm, self.bands, self.shingle_size, self.min_length, self.seed]
+
+    def save(self, path: Path, token: str = '', keep: Optional[Callable[[str], bool]] = None):
+        """
+        Write the representatives (IDs and signatures) to an .npz file.
+
+        Args:
+            path: Target file (replaced atomically)
+            token: Stored with the state so a reader can tell which run wrote it
+            keep: Only save representatives whose ID passes this check
+        """
+        rows = [
+            number for number, item_id in enumerate(self._ids)
+            if number not in self._discarded and (keep is None or keep(item_id))
+        ]
+        path = Path(path)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(
+                f,
+                signatures=self._signatures[rows],
+                ids=np.frombuffer('\n'.join(self._ids[number] for number in rows).encode('utf-8'), dtype=np.uint8),
+                settings=np.array(self._settings(), dtype=np.float64),
+                token=np.frombuffer(token.encode('utf-8'), dtype=np.uint8),
+            )
+        tmp.replace(path)
+
+    def load(self, path: Path, token: str = '',
+             keep: Optional[Callable[[str], bool]] = None) -> bool:
+        """
+        Restore representatives saved by save(), so later texts are matched
+        against them without recomputing their signatures.
+
+        Args:
+            path: File written by save()
+            token: Expected token; state from another run is not loaded
+            keep: Only restore representatives whose ID passes this check
+
+        Returns:
+            Whether the state was loaded (False if missing, stale or written
+            with different settings)
+        """
+        path = Path(path)
+        if not path.exists():
+            return False
+        with np.load(path) as state:
+            if (state['token'].tobytes().decode('utf-8') != token
+                    or state['settings'].tolist() != self._settings()):
+                return False
+            signatures = state['signatures']
+            ids = state['ids'].tobytes().decode('utf-8').split('\n') if len(signatures) else []
+
+        for signature, item_id in zip(signatures, ids):
+            if keep is None or keep(item_id):
+                self._register(signature, item_id)
+        logger.info(f"Loaded {len(self._ids)} of {len(ids)} near-duplicate representatives from {path.name}")
+        return True
+
+    def mark(self, chunks: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Pass chunks through, setting metadata['duplicate_of'] on near-duplicates.
+
+        Representatives are the first chunk of each cluster in stream order,
+        so the result is deterministic for a given input order.
+
+        Args:
+            chunks: Chunk dictionaries
+
+        Yields:
+            The same chunks
+        """
+        from .document_processor import chunk_id
+
+        for chunk in chunks:
+            representative = self.add(chunk['text'], chunk_id(chunk))
+            if representative is not None:
+                chunk['metadata']['duplicate_of'] = representative
+            yield chunk
+
+    def report(self) -> Dict:
+        """{'chunks', 'duplicates', 'representatives', 'duplicate_ratio', 'duplicate_chars'}"""
+        return {
+            'chunks': self.seen,
+            'duplicates': self.duplicates,
+            'representatives': len(self._ids) - len(self._discarded),
+            'duplicate_ratio': round(self.duplicates / self.seen, 4) if self.seen else 0,
+            'duplicate_chars': self.duplicate_chars,
+        }
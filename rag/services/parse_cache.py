@@ -0,0 +1,148 @@
+"""
+Cache of parsed TIPO XML files.
+
+Re-running the scraper or ingest over a downloads directory would parse
+every XML file again, although most were parsed on an earlier run. The
+cache keeps each file's parse result in a local SQLite database, keyed by
+absolute path and checked against the file's size, mtime and the parser
+version (tipo_xml_parser.PARSER_VERSION): only new or modified files are
+parsed, the rest are read back from the cache.
+
+Records are compact: the patent dictionary as zlib-compressed JSON, one
+row per file. Files that fail to parse are not cached, so their errors are
+reported again on every run.
+
+Members of period archives are keyed by their member path
+(``{archive}!/{member}``) and checked against the archive's size and
+mtime, so replacing an archive invalidates all of its members.
+"""
+import json
+import logging
+import os
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.conf import settings
+
+from .period_archive import is_archive, member_path, source_file
+
+logger = logging.getLogger(__name__)
+
+# Rows written per transaction
+_FLUSH_EVERY = 500
+
+
+def open_parse_cache() -> Optional['ParseCache']:
+    """The cache at PARSE_CACHE_PATH (None if the setting is empty)."""
+    if not settings.PARSE_CACHE_PATH:
+        return None
+    from .tipo_xml_parser import PARSER_VERSION
+
+    return ParseCache(settings.PARSE_CACHE_PATH, PARSER_VERSION)
+
+
+class ParseCache:
+    """Parsed patents per XML file, valid while the file and parser are unchanged."""
+
+    def __init__(self, path: Path, version: int):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            version: Parser version; entries written by another version are stale
+        """
+        self.path = Path(path)
+        self.version = version
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Written by the thread that consumes the parser's generator, which
+        # is not always the one that opened the cache (e.g. ingest's reader)
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS parsed ('
+            ' path TEXT PRIMARY KEY,'
+            ' size INTEGER NOT NULL,'
+            ' mtime_ns INTEGER NOT NULL,'
+            ' version INTEGER NOT NULL,'
+            ' patent BLOB NOT NULL'
+            ')'
+        )
+        self._db.commit()
+        self._pending = []
+
+    @staticmethod
+    def fingerprint(path: str) -> Tuple[int, int]:
+        """(size, mtime in ns) of a file (of its archive for an archive member)."""
+        stat = os.stat(source_file(path))
+        return stat.st_size, stat.st_mtime_ns
+
+    def fresh(self, fingerprints: Dict[str, Tuple[int, int]]) -> Set[str]:
+        """
+        Files whose cached result is still valid.
+
+        Args:
+            fingerprints: {absolute path: (size, mtime_ns)} of the files on disk
+
+        Returns:
+            Paths with a cached result for the same size, mtime and parser version
+        """
+        valid = set()
+        rows = self._db.execute('SELECT path, size, mtime_ns, version FROM parsed')
+        for path, size, mtime_ns, version in rows:
+            if version == self.version and fingerprints.get(path) == (size, mtime_ns):
+                valid.add(path)
+        return valid
+
+    def get(self, path: str) -> Optional[Dict]:
+        """Cached patent of a file (None if there is none)."""
+        row = self._db.execute('SELECT patent FROM parsed WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, path: str, fingerprint: Tuple[int, int], patent: Dict):
+        """Queue a parse result; written in batches (see flush)."""
+        payload = json.dumps(patent, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._pending.append((path, fingerprint[0], fingerprint[1], self.version, zlib.compress(payload, 1)))
+        if len(self._pending) >= _FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        """Write queued results in one transaction."""
+        if not self._pending:
+            return
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?)', self._pending)
+        self._pending = []
+
+    def prune(self, directory: str, keep: Iterable[str]) -> int:
+        """
+        Drop entries of files under a directory that are no longer there.
+
+        Args:
+            directory: Directory (or period archive) that was parsed completely
+            keep: Absolute paths found in it
+
+        Returns:
+            Number of entries removed
+        """
+        keep = set(keep)
+        directory_path = os.path.abspath(directory)
+        if os.path.isfile(directory_path) and is_archive(directory_path):
+            prefix = member_path(directory_path, '')
+        else:
+            prefix = os.path.join(directory_path, '')
+        rows = self._db.execute(
+            "SELECT path FROM parsed WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+        )
+        stale = [(path,) for (path,) in rows if path not in keep]
+        if stale:
+            with self._db:
+                self._db.executemany('DELETE FROM parsed WHERE path = ?', stale)
+            logger.info(f"Removed {len(stale)} parse cache entries of deleted files under {directory}")
+        return len(stale)
+
+    def close(self):
+        self.flush()
+        self._db.close()
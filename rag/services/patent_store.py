@@ -0,0 +1,150 @@
+"""
+Patent and chunk text store backing the slim vector entries.
+
+Vector entries carry only the chunk ID, the patent key and the fields that
+queries filter on (see RAGEngine._index_metadata). Patent attributes are
+stored once per patent and chunk texts once per chunk in the database, and
+search results are hydrated with one bulk lookup after top-k.
+"""
+import logging
+from typing import Dict, Iterable, List
+
+from django.db import connection, transaction
+
+from rag.models import Patent, PatentChunk
+from .document_processor import patent_key
+
+logger = logging.getLogger(__name__)
+
+PATENT_FIELDS = [
+    'patent_number', 'title', 'inventor', 'applicant', 'application_date',
+    'publication_date', 'ipc_classification', 'section', 'source_url',
+]
+CHUNK_FIELDS = ['part', 'heading', 'chunk_index', 'total_chunks', 'duplicate_of']
+
+# Rows per query; stays below SQLite's bound-parameter limit
+_BATCH = 500
+
+
+def save_chunks(ids: List[str], chunks: List[Dict], section: str):
+    """
+    Store the patents and texts of a batch of chunks (insert or update).
+
+    Args:
+        ids: Chunk IDs
+        chunks: Chunk dictionaries ('text' and full 'metadata')
+        section: Chunk file the chunks come from
+    """
+    patents = {}
+    rows = []
+    for cid, chunk in zip(ids, chunks):
+        metadata = chunk['metadata']
+        key = patent_key(metadata)
+        if key not in patents:
+            patents[key] = Patent(key=key, **{field: str(metadata.get(field) or '') for field in PATENT_FIELDS})
+        rows.append(PatentChunk(
+            chunk_id=cid,
+            patent_id=key,
+            index_section=section,
+            part=metadata.get('part') or '',
+            heading=metadata.get('heading') or '',
+            chunk_index=metadata.get('chunk_index') or 0,
+            total_chunks=metadata.get('total_chunks') or 1,
+            duplicate_of=metadata.get('duplicate_of') or '',
+            text=chunk['text'],
+        ))
+
+    with transaction.atomic():
+        Patent.objects.bulk_create(
+            patents.values(),
+            update_conflicts=True,
+            unique_fields=['key'],
+            update_fields=PATENT_FIELDS,
+            batch_size=_BATCH
+        )
+        PatentChunk.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['chunk_id'],
+            update_fields=['patent', 'index_section', 'text'] + CHUNK_FIELDS,
+            batch_size=_BATCH
+        )
+
+
+def hydrate(ids: Iterable[str]) -> Dict[str, Dict]:
+    """
+    Texts and full metadata of chunks, in one bulk lookup.
+
+    Args:
+        ids: Chunk IDs (e.g. the merged top-k of a search)
+
+    Returns:
+        {chunk ID: {'text', 'metadata'}}; IDs without a stored row are absent.
+        metadata['duplicate_patents'] lists the other patents containing a
+        near-duplicate of the chunk.
+    """
+    ids = list(ids)
+    hydrated = {}
+    rows = PatentChunk.objects.filter(chunk_id__in=ids).select_related('patent')
+    for row in rows:
+        metadata = {field: getattr(row.patent, field) for field in PATENT_FIELDS}
+        metadata.update({field: getattr(row, field) for field in CHUNK_FIELDS})
+        metadata['duplicate_patents'] = []
+        hydrated[row.chunk_id] = {'text': row.text, 'metadata': metadata}
+
+    duplicates = PatentChunk.objects.filter(duplicate_of__in=ids).values_list('duplicate_of', 'patent_id')
+    for representative, key in duplicates:
+        if representative in hydrated:
+            patents = hydrated[representative]['metadata']['duplicate_patents']
+            if key not in patents:
+                patents.append(key)
+    return hydrated
+
+
+def duplicate_ids(section: str) -> set:
+    """IDs of a section's stored near-duplicate chunks (which have no vector)."""
+    return set(
+        PatentChunk.objects.filter(index_section=section).exclude(duplicate_of='')
+        .values_list('chunk_id', flat=True).iterator(chunk_size=10000)
+    )
+
+
+def delete_chunks(ids: List[str]):
+    """Delete chunk rows, and patents left without chunks."""
+    keys = set()
+    for i in range(0, len(ids), _BATCH):
+        batch = ids[i:i + _BATCH]
+        keys.update(
+            PatentChunk.objects.filter(chunk_id__in=batch).values_list('patent_id', flat=True)
+        )
+        PatentChunk.objects.filter(chunk_id__in=batch).delete()
+
+    keys = list(keys)
+    for i in range(0, len(keys), _BATCH):
+        Patent.objects.filter(key__in=keys[i:i + _BATCH], chunks__isnull=True).delete()
+
+
+def prune_section(section: str, keep_ids: set) -> int:
+    """
+    Delete a section's chunk rows that are not in keep_ids.
+
+    Run after a rebuild has been swapped in: chunks that only the replaced
+    version had are no longer reachable.
+
+    Returns:
+        Number of rows deleted
+    """
+    stale = [
+        cid for cid in PatentChunk.objects.filter(index_section=section)
+        .values_list('chunk_id', flat=True).iterator(chunk_size=10000)
+        if cid not in keep_ids
+    ]
+    delete_chunks(stale)
+    if stale:
+        logger.info(f"Pruned {len(stale)} chunk rows of {section}")
+    return len(stale)
+
+
+def release_connection():
+    """Close this thread's database connection (pipeline threads are short-lived)."""
+    connection.close()
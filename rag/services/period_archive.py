@@ -0,0 +1,287 @@
+"""
+Patent XML inside TIPO period archives.
+
+A TIPO period is a multi-GB download; instead of unpacking it to disk,
+the parser reads its patent XML members straight out of the zip or tar
+archive, streaming each member into the XML parser.
+
+A member is addressed as ``{archive}!/{member name}`` (see member_path),
+so it can stand wherever a plain XML file path is used: in the parser's
+file lists, as the parse cache key and in a patent's ``url``.
+
+Only patent XML members are read. Images and other assets are skipped by
+name: a zip member is never opened, and a tar reader seeks past its data
+(a compressed tar still has to be decompressed past it, but nothing is
+buffered or parsed). When the archive has an ``index.xml``, its
+``<FileName>`` entries select the members to parse.
+
+A compressed tar can only be read from the start, so listing its members
+and then parsing them would decompress it twice. The listing pass can copy
+the patent XML members into a spool (an uncompressed tar in a temporary
+file) that the parsing pass reads instead.
+"""
+import logging
+import os
+import tarfile
+import xml.etree.ElementTree as ET
+import zipfile
+from contextlib import contextmanager
+from itertools import groupby
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+MEMBER_SEPARATOR = '!/'
+
+# XML files in a period that are not patents
+_NOT_PATENTS = ('index.xml', 'patent.dtd')
+
+
+def is_archive(path: str) -> bool:
+    """Whether a file name has a supported archive suffix."""
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def is_patent_xml(name: str) -> bool:
+    """Whether a file or member name is a patent XML (not index.xml or the DTD)."""
+    base = os.path.basename(name)
+    return base.endswith('.xml') and base.lower() not in _NOT_PATENTS
+
+
+def member_path(archive: str, name: str) -> str:
+    """Path of an archive member: {archive}!/{name}."""
+    return f'{archive}{MEMBER_SEPARATOR}{name}'
+
+
+def split_member_path(path: str) -> Optional[Tuple[str, str]]:
+    """(archive, member name) of a member path, None for a plain file path."""
+    archive, sep, name = str(path).partition(MEMBER_SEPARATOR)
+    if not sep or not is_archive(archive):
+        return None
+    return archive, name
+
+
+def read_index(f: IO[bytes]) -> List[str]:
+    """<FileName> entries of an index.xml (see TIPOXMLParser.parse_index_xml)."""
+    root = ET.parse(f).getroot()
+    return [
+        elem.text.strip()
+        for patent in root.iterfind('.//Patent')
+        for elem in patent.iterfind('.//FileName')
+        if elem.text and elem.text.strip()
+    ]
+
+
+def _index_keys(file_names: Iterable[str]) -> set:
+    """Lower-case base names listed in an index (.xml added where it is missing)."""
+    keys = set()
+    for file_name in file_names:
+        base = os.path.basename(file_name.replace('\\', '/')).lower()
+        keys.add(base if base.endswith('.xml') else base + '.xml')
+    return keys
+
+
+class PeriodArchive:
+    """A zip or tar period archive, read member by member."""
+
+    def __init__(self, path: str, spool: Optional[IO[bytes]] = None):
+        """
+        Args:
+            path: Archive file
+            spool: Spool written by members(spool=...) for this tar; read
+                   instead of the archive, and closed with it
+        """
+        self.path = str(path)
+        # By suffix: zipfile.is_zipfile also accepts a tar that ends in a zip member
+        self._zip = zipfile.ZipFile(self.path) if self.path.lower().endswith('.zip') else None
+        # A tar has no member directory: each pass reads it from the start
+        self._tar = None
+        self._spool = spool
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    @property
+    def compressed(self) -> bool:
+        """Whether this is a compressed tar (every pass decompresses it from the start)."""
+        return self._zip is None and not self.path.lower().endswith('.tar')
+
+    def members(self, spool: Optional[IO[bytes]] = None) -> List[str]:
+        """
+        Patent XML members in archive order.
+
+        With an index.xml, only the members it lists; without one (or when
+        it matches no member), every .xml member except index.xml and the DTD.
+
+        Args:
+            spool: For a tar, a writable file to copy the patent XML members
+                   into, as an uncompressed tar, in the same pass
+        """
+        if self._zip is not None:
+            names = [info.filename for info in self._zip.infolist() if not info.is_dir()]
+            index = next((name for name in names if os.path.basename(name).lower() == 'index.xml'), None)
+            listed = None
+            if index is not None:
+                with self._zip.open(index) as f:
+                    listed = self._read_index(f, index)
+        else:
+            # One pass over the headers; index.xml is read when it comes by
+            names = []
+            listed = None
+            writer = tarfile.open(fileobj=spool, mode='w') if spool is not None else None
+            try:
+                for info in self._iter_tar():
+                    if not info.isfile():
+                        continue
+                    names.append(info.name)
+                    if listed is None and os.path.basename(info.name).lower() == 'index.xml':
+                        listed = self._read_index(self._tar.extractfile(info), info.name)
+                    elif writer is not None and is_patent_xml(info.name):
+                        # Members not selected by a later index.xml are copied too
+                        writer.addfile(info, self._tar.extractfile(info))
+                        writer.members = []
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        xml_names = [name for name in names if is_patent_xml(name)]
+        if listed:
+            selected = [name for name in xml_names if os.path.basename(name).lower() in listed]
+            if selected:
+                if len(selected) < len(listed):
+                    logger.warning(
+                        f"{self.path}: index.xml lists {len(listed)} files, {len(selected)} found in the archive"
+                    )
+                return selected
+            logger.warning(f"{self.path}: no index.xml entry matches a member; parsing every XML member")
+        return xml_names
+
+    def _read_index(self, f: IO[bytes], name: str) -> Optional[set]:
+        try:
+            return _index_keys(read_index(f))
+        except ET.ParseError as e:
+            logger.warning(f"{self.path}: unreadable {name} ({e}); parsing every XML member")
+            return None
+
+    def _iter_tar(self) -> Iterator[tarfile.TarInfo]:
+        """Tar members from the start of the archive, one header at a time."""
+        if self._tar is not None:
+            self._tar.close()
+        # Random-access mode: reading members in order only seeks forward, and
+        # in an uncompressed tar the data of skipped members is never read
+        if self._spool is not None:
+            self._spool.seek(0)
+            self._tar = tarfile.open(fileobj=self._spool, mode='r:')
+        else:
+            self._tar = tarfile.open(self.path, 'r:*')
+        while True:
+            info = self._tar.next()
+            if info is None:
+                return
+            # Members are read once, in order; don't keep a TarInfo per member
+            self._tar.members = []
+            yield info
+
+    def iter_members(self, names: Iterable[str]) -> Iterator[Tuple[str, Optional[IO[bytes]]]]:
+        """
+        Open members one at a time, each before the next is read.
+
+        Args:
+            names: Member names; for a tar, in archive order (as from members())
+
+        Yields:
+            (name, readable file) for every name, in the given order; the
+            file is None for a name not in the archive
+        """
+        if self._zip is not None:
+            for name in names:
+                try:
+                    f = self._zip.open(name)
+                except KeyError:
+                    yield name, None
+                    continue
+                with f:
+                    yield name, f
+            return
+
+        pending = iter(names)
+        wanted = next(pending, None)
+        if wanted is None:
+            return
+        for info in self._iter_tar():
+            if info.name != wanted:
+                continue
+            f = self._tar.extractfile(info) if info.isfile() else None
+            yield wanted, f
+            wanted = next(pending, None)
+            if wanted is None:
+                return
+        # Names not found before the end of the archive (or out of order)
+        yield wanted, None
+        for name in pending:
+            yield name, None
+
+    def sizes(self, names: Iterable[str]) -> Dict[str, int]:
+        """Uncompressed sizes in bytes of members ({name: size}, missing names left out)."""
+        names = set(names)
+        if self._zip is not None:
+            return {info.filename: info.file_size for info in self._zip.infolist() if info.filename in names}
+        return {info.name: info.size for info in self._iter_tar() if info.name in names}
+
+
+def list_archive(archive: str) -> List[str]:
+    """Member paths of the patent XML in an archive (see PeriodArchive.members)."""
+    with PeriodArchive(archive) as period:
+        return [member_path(archive, name) for name in period.members()]
+
+
+@contextmanager
+def open_source(path: str) -> Iterator[IO[bytes]]:
+    """Open a plain XML file or an archive member path for reading bytes."""
+    member = split_member_path(path)
+    if member is None:
+        with open(path, 'rb') as f:
+            yield f
+        return
+    archive, name = member
+    with PeriodArchive(archive) as period:
+        for _, f in period.iter_members([name]):
+            if f is None:
+                raise FileNotFoundError(f'{name} not in {archive}')
+            yield f
+
+
+def total_size(paths: Iterable[str]) -> int:
+    """
+    Total size in bytes of plain XML files and archive members.
+
+    Each archive is opened once for its run of members.
+    """
+    total = 0
+    for archive, group in groupby(paths, key=lambda path: (split_member_path(path) or (None,))[0]):
+        if archive is None:
+            total += sum(os.path.getsize(path) for path in group)
+            continue
+        with PeriodArchive(archive) as period:
+            total += sum(period.sizes(split_member_path(path)[1] for path in group).values())
+    return total
+
+
+def source_file(path: str) -> str:
+    """File on disk holding a plain XML file or archive member (for stat)."""
+    member = split_member_path(path)
+    return path if member is None else member[0]
@@ -0,0 +1,201 @@
+"""
+Incremental document processing: per-patent manifest and change log.
+
+``{section}_manifest.json``
+    One entry per processed document, keyed by patent number (URL or title
+    for legacy documents): a hash of the document's source fields and the
+    processing config, and the rows its chunks occupy in the chunk store.
+    A document whose hash is unchanged is not chunked again; its chunks are
+    copied from the previous chunk store. The manifest records the chunk
+    store it describes (size and mtime), so a chunk file written by anything
+    else makes the next run process everything.
+
+``{section}_minhash.npz``
+    Near-duplicate representatives of the chunk store (see near_duplicates),
+    so chunks of new documents are compared with the existing ones without
+    hashing those again.
+
+``{section}_changes.log``
+    JSON lines telling the indexer what changed since it last indexed the
+    section: the patent keys of added, changed and removed (tombstoned)
+    documents, one line per processing run. ``build_index`` only looks at
+    those patents and resets the log afterwards. Each line records the chunk
+    store before and after its run; if the chain is broken (a run without
+    the log, a restored file) the indexer falls back to a full diff.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIX = '_manifest.json'
+CHANGES_SUFFIX = '_changes.log'
+DUPLICATES_SUFFIX = '_minhash.npz'
+
+# Bump when process_document output changes for the same input and config
+PROCESSING_VERSION = 1
+
+
+def duplicates_path(section: str, directory: Optional[Path] = None) -> Path:
+    """Near-duplicate representatives saved by the last processing run."""
+    return Path(directory or settings.PROCESSED_DATA_DIR) / f'{section}{DUPLICATES_SUFFIX}'
+
+
+def document_key(document: Dict) -> str:
+    """Manifest key of a scraped document: patent number, else URL, else title."""
+    return document.get('patent_number') or document.get('url') or document.get('title', '')
+
+
+def document_hash(document: Dict, config_digest: str) -> str:
+    """Hash of a document's source fields and the processing config."""
+    payload = json.dumps(document, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1((config_digest + payload).encode('utf-8')).hexdigest()[:16]
+
+
+def config_digest(config: Dict) -> str:
+    return hashlib.sha1(json.dumps(dict(config, version=PROCESSING_VERSION), sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _write_json(path: Path, value):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(value, ensure_ascii=False, separators=(',', ':')) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ProcessingManifest:
+    """What was processed into a section's chunk store, per document."""
+
+    def __init__(self, section: str, config: Dict, directory: Optional[Path] = None):
+        """
+        Args:
+            section: Section name
+            config: Processing settings that change the chunks (chunk size, ...)
+            directory: Processed data directory (default: settings.PROCESSED_DATA_DIR)
+        """
+        self.path = Path(directory or settings.PROCESSED_DATA_DIR) / f'{section}{MANIFEST_SUFFIX}'
+        self.digest = config_digest(config)
+
+    def load(self, store: Optional[Dict]) -> Optional[Dict]:
+        """
+        Previous manifest, if it is usable.
+
+        Args:
+            store: Fingerprint of the current chunk store (None if there is none)
+
+        Returns:
+            {'documents': {key: [hash, first row, row count]}, 'token': str},
+            or None if missing, written with another config or for another
+            chunk store
+        """
+        if store is None or not self.path.exists():
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path.name}: {e}")
+            return None
+
+        if manifest.get('config') != self.digest:
+            logger.info(f"{self.path.name}: processing config changed, reprocessing everything")
+            return None
+        if manifest.get('store') != store:
+            logger.info(f"{self.path.name}: chunk store was replaced, reprocessing everything")
+            return None
+        return manifest
+
+    def save(self, documents: Dict[str, list], store: Dict, token: str):
+        """Atomically write the manifest of a finished run."""
+        _write_json(self.path, {
+            'config': self.digest,
+            'store': store,
+            'token': token,
+            'documents': documents,
+        })
+
+
+class ChangeLog:
+    """Patents changed since the last index build, for incremental indexing."""
+
+    def __init__(self, section: str, directory: Optional[Path] = None):
+        self.path = Path(directory or settings.PROCESSED_DATA_DIR) / f'{section}{CHANGES_SUFFIX}'
+
+    def record(self, before: Optional[Dict], after: Dict, changed: Iterable[str] = (),
+               removed: Iterable[str] = (), full: bool = False):
+        """
+        Append one processing run.
+
+        Args:
+            before: Chunk store fingerprint before the run (None if there was none)
+            after: Chunk store fingerprint after the run
+            changed: Patent keys of added or changed documents
+            removed: Patent keys of documents that are gone (tombstones)
+            full: Everything was reprocessed; the indexer must diff everything
+        """
+        line = {'before': before, 'after': after}
+        if full:
+            line['full'] = True
+        else:
+            line['changed'] = sorted(changed)
+            line['removed'] = sorted(removed)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(line, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def pending(self, store: Dict) -> Optional[Set[str]]:
+        """
+        Patent keys to re-index.
+
+        Args:
+            store: Fingerprint of the chunk store about to be indexed
+
+        Returns:
+            Keys of changed and removed patents, or None if the log cannot
+            be trusted and the whole section must be diffed
+        """
+        if not self.path.exists():
+            return None
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            try:
+                lines = [json.loads(line) for line in f if line.endswith('\n')]
+            except json.JSONDecodeError:
+                return None
+
+        # The first line is written by mark_indexed()
+        if not lines or not lines[0].get('indexed'):
+            return None
+
+        keys = set()
+        for previous, line in zip(lines, lines[1:]):
+            if line.get('full') or line.get('before') != previous.get('after'):
+                return None
+            keys.update(line['changed'])
+            keys.update(line['removed'])
+        if lines[-1].get('after') != store:
+            return None
+        return keys
+
+    def invalidate(self):
+        """
+        Make the next index build diff the whole section.
+
+        For index writes that bypass the chunk store (``ingest``): the log
+        no longer describes what the index holds.
+        """
+        if self.path.exists():
+            self.record(None, None, full=True)
+
+    def mark_indexed(self, store: Dict):
+        """Reset the log: the index is up to date with this chunk store."""
+        _write_json(self.path, {'indexed': True, 'after': store})
@@ -0,0 +1,191 @@
+"""
+Lightweight throughput and memory measurement helpers for the indexing pipeline.
+"""
+import cProfile
+import logging
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of the current process in MB.
+
+    Returns:
+        Peak RSS (ru_maxrss is KB on Linux, bytes on macOS)
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak RSS of the current process to its current RSS (Linux only).
+
+    Lets one process measure the peak memory of several steps in turn.
+
+    Returns:
+        Whether the peak was reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def rss_mb() -> Dict[str, float]:
+    """
+    Current and peak RSS of the current process in MB (Linux only).
+
+    Returns:
+        {'rss', 'peak'}; peak is since start or the last reset_peak_rss()
+    """
+    fields = {}
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            if line.startswith(('VmRSS:', 'VmHWM:')):
+                fields[line.split(':')[0]] = int(line.split()[1]) / 1024
+    return {'rss': fields.get('VmRSS', 0), 'peak': fields.get('VmHWM', 0)}
+
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """
+    Resident, proportional and unique memory of a process in MB (Linux only).
+
+    PSS splits shared pages between the processes mapping them, so for forked
+    workers sharing a preloaded model it is the honest per-worker number.
+
+    Args:
+        pid: Process id
+
+    Returns:
+        {'rss', 'pss', 'uss', 'shared'} in MB
+    """
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1]) / 1024
+
+    uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': uss,
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+    }
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of a process (Linux only)."""
+    children = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children', 'r') as f:
+            children.extend(int(child) for child in f.read().split())
+    return sorted(set(children))
+
+
+class StageTimer:
+    """Accumulate item counts and wall time for one pipeline stage."""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Stage name used in reports
+        """
+        self.name = name
+        self.items = 0
+        self.seconds = 0.0
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._started
+        self._started = None
+        return False
+
+    def add(self, items: int):
+        """Record items processed by this stage."""
+        self.items += items
+
+    @property
+    def rate(self) -> float:
+        """Items per second (0 when nothing was timed)."""
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'stage': self.name,
+            'items': self.items,
+            'seconds': round(self.seconds, 3),
+            'items_per_sec': round(self.rate, 1),
+        }
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.items} items in {self.seconds:.2f}s ({self.rate:.1f}/s)"
+
+
+def directory_size(path: Path) -> int:
+    """Total size in bytes of the files under a directory (0 if missing)."""
+    path = Path(path)
+    if not path.exists():
+        return 0
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+@contextmanager
+def profile_threads(path: Path):
+    """
+    cProfile the calling thread and every thread started inside the block.
+
+    cProfile only sees the thread that enabled it, while the index pipeline
+    embeds and writes on worker threads, so each new thread gets its own
+    profiler. The results are merged into one pstats file (view it with
+    snakeviz, or turn it into a flame graph with flameprof/gprof2dot).
+
+    Args:
+        path: Output .prof file
+    """
+    profiles = []
+    lock = threading.Lock()
+
+    def start_thread_profile(*_):
+        profile = cProfile.Profile()
+        with lock:
+            profiles.append(profile)
+        # Replaces this hook as the thread's profile function
+        profile.enable()
+
+    main = cProfile.Profile()
+    threading.setprofile(start_thread_profile)
+    main.enable()
+    try:
+        yield
+    finally:
+        main.disable()
+        threading.setprofile(None)
+
+        stats = pstats.Stats(main)
+        with lock:
+            for profile in profiles:
+                stats.add(profile)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(str(path))
+        logger.info(f"Profile written to {path}")
@@ -2,16 +2,27 @@
 Taiwan Patent RAG Engine - Core retrieval-augmented generation logic for patent search.
 Uses Google Gemini for free LLM access.
 """
-import json
+import heapq
 import logging
+import threading
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterable, Optional, Set, TYPE_CHECKING
 
-import chromadb
 from django.conf import settings
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-from .embedding_service import EmbeddingService
+from .collection_alias import CollectionAlias
+from .chunk_store import available_sections, has_chunks, iter_chunks, source_fingerprint
+from . import patent_store
+from .document_processor import chunk_id, patent_key
+from .index_checkpoint import IndexCheckpoint
+from .index_pipeline import IndexBatch, IndexPipeline
+from .processing_manifest import ChangeLog
+from .profiling import peak_rss_mb
+from .shard_catalog import ShardCatalog, publication_year
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -44,19 +55,61 @@ class RAGEngine:
 
 回答（只包含真正相關的專利資訊）："""
 
-    def __init__(self):
-        """Initialize the RAG engine."""
-        # Initialize embedding service (local, free)
-        self.embedding_service = EmbeddingService()
+    def __init__(self, chroma_client=None, embedding_service=None, with_llm: bool = True):
+        """
+        Initialize the RAG engine.
+
+        Args:
+            chroma_client: ChromaDB client to use (default: HTTP client for
+                           CHROMA_HOST/CHROMA_PORT)
+            embedding_service: Embedder to use (default: EmbeddingService)
+            with_llm: Create the Gemini client; indexing-only callers
+                      (benchmarks) can skip it and run without an API key
+        """
+        if embedding_service is None:
+            # Heavy client libraries are imported here rather than at module load so
+            # that management commands, migrations and URL resolution stay fast.
+            from .embedding_service import EmbeddingService
+
+            # Initialize embedding service (local, free)
+            embedding_service = EmbeddingService()
+        self.embedding_service = embedding_service
 
-        # Initialize ChromaDB client
-        chroma_url = f"http://{settings.CHROMA_HOST}:{settings.CHROMA_PORT}"
-        logger.info(f"Connecting to ChromaDB at {chroma_url}")
+        self.with_llm = with_llm
+        self.connect(chroma_client)
 
-        self.chroma_client = chromadb.HttpClient(
-            host=settings.CHROMA_HOST,
-            port=int(settings.CHROMA_PORT)
-        )
+        logger.info("RAG Engine initialized successfully with Gemini")
+
+    def connect(self, chroma_client=None):
+        """
+        Create the ChromaDB and Gemini clients.
+
+        Args:
+            chroma_client: Client to use instead of a new HTTP client
+        """
+        if chroma_client is None:
+            import chromadb
+
+            # Initialize ChromaDB client
+            chroma_url = f"http://{settings.CHROMA_HOST}:{settings.CHROMA_PORT}"
+            logger.info(f"Connecting to ChromaDB at {chroma_url}")
+
+            chroma_client = chromadb.HttpClient(
+                host=settings.CHROMA_HOST,
+                port=int(settings.CHROMA_PORT)
+            )
+        self.chroma_client = chroma_client
+        self.alias = CollectionAlias(self.chroma_client, self.COLLECTION_NAME)
+        self._serving = None
+        self._pool = None
+        # Concurrent first queries must not each create a pool
+        self._pool_lock = threading.Lock()
+
+        if not self.with_llm:
+            self.llm = None
+            return
+
+        from langchain_google_genai import ChatGoogleGenerativeAI
 
         # Initialize Gemini LLM (free)
         if not settings.GOOGLE_API_KEY:
@@ -69,135 +122,727 @@ class RAGEngine:
             convert_system_message_to_human=True
         )
 
-        logger.info("RAG Engine initialized successfully with Gemini")
-
-    def create_collection(self, reset: bool = False):
+    def create_collection(self, name: Optional[str] = None, reset: bool = False):
         """
-        Create or get the vector collection.
+        Create or get the vector collection (an index version and its shards).
 
         Args:
+            name: Collection to open (default: the one the alias points to)
             reset: If True, delete existing collection and create new one
         """
+        name = name or self.alias.read()['target']
         try:
             if reset:
                 try:
-                    self.chroma_client.delete_collection(name=self.COLLECTION_NAME)
-                    logger.info(f"Deleted existing collection: {self.COLLECTION_NAME}")
+                    ShardCatalog(self.chroma_client, self.chroma_client.get_collection(name=name)).delete()
+                    logger.info(f"Deleted existing collection: {name}")
                 except Exception:
                     pass
 
-            self.collection = self.chroma_client.get_or_create_collection(
-                name=self.COLLECTION_NAME,
-                metadata={"description": "Taiwan Patent Office documents"}
-            )
-            logger.info(f"Collection ready: {self.COLLECTION_NAME}")
+            # get_or_create_collection(metadata=...) would overwrite the catalog
+            try:
+                self.collection = self.chroma_client.get_collection(name=name)
+            except Exception:
+                self.collection = self.chroma_client.get_or_create_collection(
+                    name=name,
+                    metadata={"description": "Taiwan Patent Office documents"}
+                )
+            self.catalog = ShardCatalog(self.chroma_client, self.collection)
+            self.catalog.initialize(settings.INDEX_SHARD_BY)
+            logger.info(f"Collection ready: {name} (sharded by {self.catalog.shard_by})")
 
         except Exception as e:
             logger.error(f"Error creating collection: {e}")
             raise
 
-    def index_documents(self, sections: Optional[List[str]] = None):
+    def _serving_catalog(self) -> ShardCatalog:
+        """
+        Shard catalog queries should use, resolved through the alias.
+
+        The resolution is cached for ALIAS_CACHE_SECONDS so queries do not pay
+        extra round trips; after a swap, workers pick up the new version
+        within that window.
+        """
+        now = time.monotonic()
+        serving = self._serving
+        if serving is not None and serving[1] > now:
+            return serving[0]
+
+        name = self.alias.read()['target']
+        catalog = ShardCatalog(self.chroma_client, self.chroma_client.get_collection(name=name))
+        self._serving = (catalog, now + settings.ALIAS_CACHE_SECONDS)
+        return catalog
+
+    def _fan_out(self, fn, names: List[str]) -> Dict:
+        """
+        Run fn(shard) for every shard concurrently.
+
+        Returns:
+            {shard: result or the exception it raised}
+        """
+        if len(names) <= 1:
+            # Unsharded or fully pruned: no need for a thread hop
+            results = {}
+            for name in names:
+                try:
+                    results[name] = fn(name)
+                except Exception as e:
+                    results[name] = e
+            return results
+
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=settings.SHARD_QUERY_WORKERS,
+                    thread_name_prefix='shard-query'
+                )
+        futures = {name: self._pool.submit(fn, name) for name in names}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = e
+        return results
+
+    def index_documents(
+        self,
+        sections: Optional[List[str]] = None,
+        rebuild: bool = False,
+        writers: Optional[int] = None,
+        resume: bool = False
+    ) -> Dict:
         """
         Index processed documents into the vector database.
 
+        Chunk files are streamed, so memory is bounded by the pipeline queues
+        plus the set of chunk IDs, not by the size of the corpus.
+
+        Indexing is incremental: chunk IDs are derived from the patent number,
+        part, chunk index and a hash of the chunk text, so only new or changed
+        chunks are embedded and upserted, chunks that no longer exist in a
+        section (removed or superseded patents) are deleted, and unchanged
+        chunks are skipped.
+
+        Completed batches are checkpointed; with resume=True an interrupted
+        build (including an interrupted rebuild) continues where it stopped.
+
+        A rebuild is blue/green: everything is indexed into a new versioned
+        collection while queries keep hitting the current one, the new version
+        is validated (counts and sample self-queries), the alias is swapped
+        and versions retired longer than INDEX_GC_GRACE_SECONDS are deleted.
+
         Args:
             sections: List of sections to index (default: all available)
+            rebuild: Re-embed everything into a new collection version
+            writers: Parallel vector-store writers (default: settings.INDEX_WRITERS)
+            resume: Skip batches recorded by an interrupted run
+
+        Returns:
+            Counts of upserted, deleted, unchanged and resumed chunks, plus
+            per-section pipeline stage reports under 'stages'
         """
-        # Create/reset collection
-        self.create_collection(reset=True)
+        if rebuild and sections is not None and set(sections) != set(available_sections()):
+            raise ValueError("A rebuild creates a complete new index version; omit --sections")
+
+        if rebuild:
+            # Resume the interrupted version, or start a new one
+            building = self.alias.read()['building'] if resume else ''
+            target = building or self.alias.new_version_name()
+            self.alias.mark_building(target)
+            self.create_collection(name=target)
+        else:
+            self.create_collection()
 
         # Find available section files if not specified
         if sections is None:
-            sections = []
-            for file in settings.PROCESSED_DATA_DIR.glob('*_chunks.json'):
-                section = file.stem.replace('_chunks', '')
-                sections.append(section)
+            sections = available_sections()
 
-        logger.info(f"Indexing sections: {sections}")
+        logger.info(f"Indexing sections into {self.collection.name}: {sections}")
 
-        total_indexed = 0
+        totals = {'total': 0, 'upserted': 0, 'deleted': 0, 'unchanged': 0, 'resumed': 0, 'duplicates': 0}
+        reports = {}
+        indexed = {}
+        started = time.perf_counter()
 
         for section in sections:
-            chunk_file = settings.PROCESSED_DATA_DIR / f'{section}_chunks.json'
+            if not has_chunks(section):
+                logger.warning(f"No processed chunks for section: {section}")
+                continue
+
+            store = source_fingerprint(section)
+            counts, reports[section] = self._index_section(
+                section,
+                store,
+                rebuild=rebuild,
+                resume=resume,
+                writers=writers or settings.INDEX_WRITERS
+            )
+            for key in totals:
+                totals[key] += counts[key]
+            indexed[section] = store
+            if not rebuild:
+                ChangeLog(section).mark_indexed(store)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Indexing complete! Upserted {totals['upserted']}, deleted {totals['deleted']}, "
+            f"unchanged {totals['unchanged']}, resumed {totals['resumed']}"
+        )
+        logger.info(
+            f"Throughput: {totals['upserted'] / elapsed if elapsed else 0:.1f} chunks/s | "
+            f"peak RSS {peak_rss_mb():.0f} MB"
+        )
+        totals['vector_bytes_saved'] = self._vector_bytes(totals['duplicates'])
+        if totals['duplicates']:
+            logger.info(
+                f"Near-duplicates: {totals['duplicates']} chunks not embedded "
+                f"({totals['vector_bytes_saved'] / 1e6:.1f} MB of vectors)"
+            )
+        totals['stages'] = reports
+
+        if rebuild:
+            self._validate_collection(self.catalog, expected_count=totals['total'])
+            self.alias.swap(self.collection.name)
+            self._serving = None
+            self.alias.garbage_collect(settings.INDEX_GC_GRACE_SECONDS)
+            # Chunk rows only the replaced version pointed at
+            for section, store in indexed.items():
+                totals['deleted'] += patent_store.prune_section(
+                    section, {chunk_id(chunk) for chunk in iter_chunks(section)}
+                )
+                ChangeLog(section).mark_indexed(store)
+
+        return totals
+
+    def _validate_collection(self, catalog: ShardCatalog, expected_count: int, samples: int = 5):
+        """
+        Check a freshly built index version before it is put into service.
+
+        Args:
+            catalog: Shard catalog of the version to validate
+            expected_count: Number of unique chunks that were indexed
+            samples: Stored chunks (per shard) to query back by their own embedding
 
-            if not chunk_file.exists():
-                logger.warning(f"Chunk file not found: {chunk_file}")
+        Raises:
+            ValueError: If the count is off or sample queries do not find
+                        their own chunk (the alias is then left untouched)
+        """
+        shards = catalog.select()
+        count = sum(catalog.collection(name).count() for name in shards)
+        if count != expected_count or count == 0:
+            raise ValueError(
+                f"Validation failed for {catalog.version}: {count} vectors, expected {expected_count}"
+            )
+
+        checked = 0
+        for name in shards:
+            collection = catalog.collection(name)
+            sample = collection.get(limit=samples, include=['documents'])
+            if not sample['ids']:
                 continue
+            stored = patent_store.hydrate(sample['ids'])
+            texts = [
+                stored[cid]['text'] if cid in stored else text
+                for cid, text in zip(sample['ids'], sample['documents'] or [None] * len(sample['ids']))
+            ]
+            if not all(texts):
+                raise ValueError(f"Validation failed for {name}: sample chunks have no stored text")
+            embeddings = self.embedding_service.embed_documents(texts, show_progress_bar=False)
+            results = collection.query(
+                query_embeddings=self._to_chroma(embeddings),
+                n_results=1,
+                include=['distances']
+            )
+            for chunk_id_, distances in zip(sample['ids'], results['distances']):
+                if not distances or distances[0] > 1e-3:
+                    raise ValueError(
+                        f"Validation failed for {name}: sample {chunk_id_} "
+                        f"is not its own nearest neighbour"
+                    )
+            checked += len(sample['ids'])
+
+        logger.info(
+            f"Validated {catalog.version}: {count} vectors in {len(shards)} shards, "
+            f"{checked} sample queries"
+        )
+
+    def _index_section(self, section: str, store: Dict, rebuild: bool, resume: bool, writers: int):
+        """
+        Index one section's chunks (see index_documents).
+
+        Batches are numbered over the section's unique chunks in file order, so
+        the numbering is stable between runs and can be checkpointed. When
+        resuming, checkpointed batches are skipped without being read into the
+        pipeline, and the remaining ones are reconciled against the vector
+        store by ID so that a batch written just before a crash is not
+        embedded again.
 
-            # Load chunks
-            with open(chunk_file, 'r', encoding='utf-8') as f:
-                chunks = json.load(f)
+        When process_docs left a change log for this chunk file, only the
+        patents it lists (added, changed, removed) are diffed against the
+        vector store; chunks of all other patents count as unchanged.
 
-            logger.info(f"Indexing {len(chunks)} chunks from {section}")
+        Args:
+            store: Fingerprint of the chunk file (see source_fingerprint)
 
-            # Process in batches
-            batch_size = 100
-            for i in range(0, len(chunks), batch_size):
-                batch = chunks[i:i + batch_size]
+        Returns:
+            (counts, pipeline report)
+        """
+        batch_size = settings.INDEX_BATCH_SIZE
+        checkpoint = IndexCheckpoint(
+            self.collection.name,
+            section,
+            dict(store, batch_size=batch_size)
+        )
+        completed = checkpoint.open(resume=resume)
+
+        # Patents changed since the last build; None = diff the whole section
+        touched = None if (rebuild or resume) else ChangeLog(section).pending(store)
+        if touched is not None:
+            logger.info(f"{section}: {len(touched)} patents changed since the last build")
+
+        # Without resume, diff against everything indexed for the section up
+        # front; when resuming, reconcile batch by batch instead.
+        existing_ids = {} if (rebuild or resume) else self._existing_ids(section, touched)
+        # Near-duplicates are stored without a vector (see near_duplicates)
+        stored_duplicates = set() if rebuild else patent_store.duplicate_ids(section)
+        seen_ids = set()
+        duplicate_ids = set()
+        counts = {'total': 0, 'upserted': 0, 'deleted': 0, 'unchanged': 0, 'resumed': 0, 'duplicates': 0}
+
+        def to_batch(number: int, pending: List) -> Optional[IndexBatch]:
+            """Drop chunks that are already indexed; None if nothing is left."""
+            if number in completed:
+                counts['resumed'] += len(pending)
+                return None
+
+            present = self._present_ids([cid for cid, _ in pending]) if resume else existing_ids
+
+            batch = IndexBatch([], [], [], number=number)
+            staged = []
+            # Rows without a new vector: new duplicates, and unchanged chunks of
+            # changed patents (their patent fields may have changed)
+            rows = []
+            for cid, chunk in pending:
+                changed = touched is None or patent_key(chunk['metadata']) in touched
+                if cid in duplicate_ids:
+                    if cid not in stored_duplicates or (touched is not None and changed):
+                        rows.append((cid, chunk))
+                    continue
+                if cid in present or not changed:
+                    counts['unchanged'] += 1
+                    if touched is not None and changed:
+                        rows.append((cid, chunk))
+                    continue
+                batch.ids.append(cid)
+                batch.texts.append(chunk['text'])
+                batch.metadatas.append(self._index_metadata(chunk, section))
+                staged.append(chunk)
+
+            if rows:
+                patent_store.save_chunks([cid for cid, _ in rows], [chunk for _, chunk in rows], section)
+            if not batch.ids:
+                checkpoint.record(number)
+                return None
+            # Texts and patent rows go in before the vectors that point at them
+            patent_store.save_chunks(batch.ids, staged, section)
+            return batch
+
+        def batches():
+            """Stream the chunk file, yielding batches of new or changed chunks."""
+            number = 0
+            pending = []
+            try:
+                for chunk in iter_chunks(section):
+                    cid = chunk_id(chunk)
+                    # Stable IDs; a patent listed twice in a file yields the same IDs
+                    if cid in seen_ids or cid in duplicate_ids:
+                        continue
+                    if chunk['metadata'].get('duplicate_of'):
+                        duplicate_ids.add(cid)
+                        counts['duplicates'] += 1
+                    else:
+                        seen_ids.add(cid)
+                        counts['total'] += 1
+                    pending.append((cid, chunk))
+
+                    if len(pending) >= batch_size:
+                        batch = to_batch(number, pending)
+                        if batch is not None:
+                            yield batch
+                        number += 1
+                        pending = []
+
+                if pending:
+                    batch = to_batch(number, pending)
+                    if batch is not None:
+                        yield batch
+            finally:
+                # Runs on the pipeline's reader thread
+                patent_store.release_connection()
+
+        def write(batch: IndexBatch):
+            self._upsert_batch(batch)
+            checkpoint.record(batch.number)
+
+        # Read, embed and write concurrently
+        pipeline = IndexPipeline(
+            embed=lambda texts: self.embedding_service.embed_documents(
+                texts, show_progress_bar=False
+            ),
+            write=write,
+            writers=writers,
+            queue_size=settings.INDEX_QUEUE_SIZE
+        )
+        try:
+            report = pipeline.run(batches())
+        finally:
+            checkpoint.close()
+        counts['upserted'] = report['chunks']
+
+        # Anything indexed before but absent from the file now is stale
+        if resume:
+            existing_ids = self._existing_ids(section)
+        stale = {}
+        for cid in sorted(existing_ids.keys() - seen_ids):
+            stale.setdefault(existing_ids[cid], []).append(cid)
+        for shard, stale_ids in stale.items():
+            for i in range(0, len(stale_ids), batch_size):
+                self.catalog.collection(shard).delete(ids=stale_ids[i:i + batch_size])
+            # A chunk that became a duplicate keeps its row, only loses its vector
+            patent_store.delete_chunks([cid for cid in stale_ids if cid not in duplicate_ids])
+        counts['deleted'] = sum(len(stale_ids) for stale_ids in stale.values())
+        patent_store.delete_chunks(sorted(stored_duplicates - duplicate_ids - seen_ids))
+
+        checkpoint.complete()
+
+        logger.info(
+            f"{section}: {counts['total']} chunks, {counts['upserted']} upserted, "
+            f"{counts['deleted']} deleted, {counts['unchanged']} unchanged, "
+            f"{counts['resumed']} skipped from checkpoint"
+        )
+        return counts, report
 
-                # Prepare data for ChromaDB
-                texts = [chunk['text'] for chunk in batch]
-                metadatas = [chunk['metadata'] for chunk in batch]
-                ids = [f"{section}_{j}" for j in range(i, i + len(batch))]
+    def ingest_chunks(self, chunks: Iterable[Dict], section: str, writers: int = None) -> Dict:
+        """
+        Embed and upsert a stream of chunks into the serving index.
 
-                # Generate embeddings
-                embeddings = self.embedding_service.embed_documents(texts)
+        Used by the ``ingest`` command to go from parsed XML to searchable
+        vectors without intermediate files. Unlike build_index, the stream
+        is not the whole section: only older chunks of the patents it
+        contains are deleted, and there is no checkpoint (chunk IDs are
+        content hashes, so re-running an ingest skips what is already
+        indexed).
 
-                # Add to collection
-                self.collection.add(
-                    embeddings=embeddings,
-                    documents=texts,
-                    metadatas=metadatas,
-                    ids=ids
-                )
+        Args:
+            chunks: Iterable of chunk dictionaries (consumed lazily)
+            section: Section the chunks are indexed under
+            writers: Parallel vector-store writers (default: INDEX_WRITERS)
+
+        Returns:
+            Counts (total, upserted, deleted, unchanged, duplicates) and the
+            pipeline report
+        """
+        self.create_collection()
+        # The index stops matching the chunk file: a later build_index must
+        # diff the whole section and delete what only the ingest wrote
+        ChangeLog(section).invalidate()
+        batch_size = settings.INDEX_BATCH_SIZE
+        existing_ids = self._existing_ids(section)
+        stored_duplicates = patent_store.duplicate_ids(section)
+        seen_ids = set()
+        duplicate_ids = set()
+        patents = set()
+        counts = {'total': 0, 'upserted': 0, 'deleted': 0, 'unchanged': 0, 'duplicates': 0}
+
+        def save_duplicates(duplicates: List):
+            if duplicates:
+                patent_store.save_chunks([cid for cid, _ in duplicates], [chunk for _, chunk in duplicates], section)
+                duplicates.clear()
+
+        def batches():
+            batch = IndexBatch([], [], [])
+            staged = []
+            duplicates = []
+            try:
+                for chunk in chunks:
+                    cid = chunk_id(chunk)
+                    if cid in seen_ids or cid in duplicate_ids:
+                        continue
+                    patents.add(patent_key(chunk['metadata']))
+                    if chunk['metadata'].get('duplicate_of'):
+                        # Stored without a vector (see near_duplicates)
+                        duplicate_ids.add(cid)
+                        counts['duplicates'] += 1
+                        if cid not in stored_duplicates:
+                            duplicates.append((cid, chunk))
+                            if len(duplicates) >= batch_size:
+                                save_duplicates(duplicates)
+                        continue
+                    seen_ids.add(cid)
+                    counts['total'] += 1
+                    if cid in existing_ids:
+                        counts['unchanged'] += 1
+                        continue
+
+                    batch.ids.append(cid)
+                    batch.texts.append(chunk['text'])
+                    batch.metadatas.append(self._index_metadata(chunk, section))
+                    staged.append(chunk)
+                    if len(batch.ids) >= batch_size:
+                        patent_store.save_chunks(batch.ids, staged, section)
+                        yield batch
+                        batch = IndexBatch([], [], [], number=batch.number + 1)
+                        staged = []
+                save_duplicates(duplicates)
+                if batch.ids:
+                    patent_store.save_chunks(batch.ids, staged, section)
+                    yield batch
+            finally:
+                patent_store.release_connection()
+
+        pipeline = IndexPipeline(
+            embed=lambda texts: self.embedding_service.embed_documents(
+                texts, show_progress_bar=False
+            ),
+            write=self._upsert_batch,
+            writers=writers or settings.INDEX_WRITERS,
+            queue_size=settings.INDEX_QUEUE_SIZE
+        )
+        report = pipeline.run(batches())
+        counts['upserted'] = report['chunks']
+
+        # Chunks of re-ingested patents that are no longer produced
+        # IDs are '<patent key>:<part>:<index>:<hash>'
+        def is_stale(cid: str) -> bool:
+            return cid not in seen_ids and cid not in duplicate_ids and cid.rsplit(':', 3)[0] in patents
+
+        stale = {}
+        for cid, shard in existing_ids.items():
+            if cid not in seen_ids and cid.rsplit(':', 3)[0] in patents:
+                stale.setdefault(shard, []).append(cid)
+        for shard, stale_ids in stale.items():
+            for i in range(0, len(stale_ids), batch_size):
+                self.catalog.collection(shard).delete(ids=stale_ids[i:i + batch_size])
+            patent_store.delete_chunks([cid for cid in stale_ids if is_stale(cid)])
+        counts['deleted'] = sum(len(stale_ids) for stale_ids in stale.values())
+        patent_store.delete_chunks(sorted(cid for cid in stored_duplicates if is_stale(cid)))
+
+        counts['vector_bytes_saved'] = self._vector_bytes(counts['duplicates'])
+        logger.info(
+            f"Ingested {section}: {counts['total']} chunks from {len(patents)} patents, "
+            f"{counts['upserted']} upserted, {counts['deleted']} deleted, "
+            f"{counts['unchanged']} unchanged, {counts['duplicates']} near-duplicates "
+            f"({report['chunks_per_sec']:.1f} chunks/s)"
+        )
+        return dict(counts, report=report)
+
+    def _vector_bytes(self, count: int) -> int:
+        """Size of count float32 embeddings, e.g. the index space saved by not storing them."""
+        return count * self.embedding_service.get_embedding_dimension() * 4
+
+    @staticmethod
+    def _index_metadata(chunk: Dict, section: str) -> Dict:
+        """
+        Metadata stored with a chunk's vector: the patent key and the fields
+        queries filter or shard on. Everything else lives in patent_store.
+        """
+        metadata = chunk['metadata']
+        slim = {
+            'patent_key': patent_key(metadata),
+            'section': metadata.get('section') or '',
+            'part': metadata.get('part') or metadata.get('heading') or 'content',
+            'index_section': section,
+        }
+        year = publication_year(metadata)
+        if year:
+            slim['year'] = year
+        return slim
+
+    def _upsert_batch(self, batch: IndexBatch):
+        """Write one embedded batch to its shards (pipeline writer stage)."""
+        rows_by_shard = {}
+        for row, metadata in enumerate(batch.metadatas):
+            rows_by_shard.setdefault(self.catalog.shard_for(metadata), []).append(row)
+
+        for shard, rows in rows_by_shard.items():
+            self.catalog.collection(shard).upsert(
+                embeddings=self._to_chroma(batch.embeddings[rows]),
+                metadatas=[batch.metadatas[row] for row in rows],
+                ids=[batch.ids[row] for row in rows]
+            )
+
+    def _present_ids(self, ids: List[str]) -> set:
+        """Which of the given IDs are already in the collection (any shard)."""
+        results = self._fan_out(
+            lambda shard: self.catalog.collection(shard).get(ids=ids, include=[])['ids'],
+            self.catalog.select()
+        )
+        present = set()
+        for found in results.values():
+            if isinstance(found, Exception):
+                raise found
+            present.update(found)
+        return present
+
+    def _existing_ids(self, section: str, patents: Optional[Set[str]] = None,
+                      page_size: int = 10000) -> Dict[str, str]:
+        """
+        IDs already indexed from a section's chunk file.
+
+        Args:
+            section: Section name (the chunk file the vectors came from)
+            patents: Only chunks of these patent keys (default: all)
+            page_size: IDs fetched per request
+
+        Returns:
+            {chunk ID: shard it is stored in}
+        """
+        if patents is None:
+            filters = [{'index_section': section}]
+        else:
+            keys = sorted(patents)
+            filters = [
+                {'$and': [{'index_section': section}, {'patent_key': {'$in': keys[i:i + 500]}}]}
+                for i in range(0, len(keys), 500)
+            ]
+
+        ids = {}
+        # Shards are split by patent type, not by chunk file: look in all of them
+        for shard in self.catalog.select():
+            collection = self.catalog.collection(shard)
+            for where in filters:
+                offset = 0
+                while True:
+                    page = collection.get(
+                        where=where,
+                        include=[],
+                        limit=page_size,
+                        offset=offset
+                    )
+                    ids.update(dict.fromkeys(page['ids'], shard))
+                    if len(page['ids']) < page_size:
+                        break
+                    offset += page_size
+        return ids
+
+    @staticmethod
+    def _to_chroma(embeddings: 'np.ndarray') -> List[List[float]]:
+        """
+        Convert an embedding matrix at the Chroma client boundary.
+
+        chromadb 0.4.x validates embeddings as nested lists, so this is the
+        only place vectors leave numpy. ndarray.tolist() does the conversion
+        in one C-level pass instead of one Python call per vector.
 
-                total_indexed += len(batch)
-                logger.info(f"Indexed {total_indexed} chunks so far...")
+        Args:
+            embeddings: 2-D float32 array
 
-        logger.info(f"Indexing complete! Total chunks indexed: {total_indexed}")
+        Returns:
+            Nested list of floats
+        """
+        return embeddings.tolist()
 
-    def retrieve_relevant_docs(self, question: str, top_k: int = None) -> List[Dict]:
+    def retrieve_relevant_docs(self, question: str, top_k: int = None,
+                               filters: Optional[Dict] = None) -> List[Dict]:
         """
         Retrieve relevant documents for a question.
 
+        Only the shards that can match the filters are searched, concurrently,
+        and their results are merged into one top-k list. Texts and patent
+        metadata of the top-k are then looked up in one bulk query.
+
         Args:
             question: User question
             top_k: Number of documents to retrieve
+            filters: Optional {'sections': [...], 'year_from': int, 'year_to': int}
 
         Returns:
             List of relevant document dictionaries
         """
         top_k = top_k or settings.TOP_K_RESULTS
+        filters = filters or {}
 
-        # Get collection
+        # Get shard catalog (through the alias)
         try:
-            self.collection = self.chroma_client.get_collection(name=self.COLLECTION_NAME)
+            catalog = self._serving_catalog()
         except Exception as e:
             logger.error(f"Collection not found: {e}")
             raise ValueError("Vector database not initialized. Please run build_index first.")
 
-        # Generate query embedding
-        query_embedding = self.embedding_service.embed_text(question)
+        shards = catalog.select(
+            sections=filters.get('sections'),
+            year_from=filters.get('year_from'),
+            year_to=filters.get('year_to')
+        )
+        if not shards:
+            return []
 
-        # Search
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k
+        # Generate query embedding
+        query_embedding = self._to_chroma(
+            self.embedding_service.embed_text(question).reshape(1, -1)
         )
+        where = self._where(filters)
+
+        def search(shard: str) -> Dict:
+            return catalog.collection(shard).query(
+                query_embeddings=query_embedding,
+                n_results=top_k,
+                where=where
+            )
 
-        # Format results
+        # Search shards concurrently and merge
         documents = []
-        if results['documents'] and results['documents'][0]:
-            for i, doc_text in enumerate(results['documents'][0]):
+        failed = []
+        for shard, results in self._fan_out(search, shards).items():
+            if isinstance(results, Exception):
+                logger.warning(f"Search failed on shard {shard}: {results}")
+                failed.append(results)
+                continue
+            for i, cid in enumerate(results['ids'][0] if results['ids'] else []):
                 documents.append({
-                    'text': doc_text,
+                    'id': cid,
+                    # Only indexes built before the patent table have documents
+                    'text': results['documents'][0][i] if results.get('documents') else None,
                     'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
                     'distance': results['distances'][0][i] if results['distances'] else None
                 })
+        if failed and len(failed) == len(shards):
+            raise failed[0]
+
+        documents = heapq.nsmallest(
+            top_k, documents,
+            key=lambda doc: doc['distance'] if doc['distance'] is not None else float('inf')
+        )
+
+        stored = patent_store.hydrate(doc['id'] for doc in documents)
+        for doc in documents:
+            row = stored.get(doc['id'])
+            if row:
+                doc['text'] = row['text']
+                doc['metadata'] = {**doc['metadata'], **row['metadata']}
+        documents = [doc for doc in documents if doc['text'] is not None]
 
-        logger.info(f"Retrieved {len(documents)} relevant documents")
+        logger.info(f"Retrieved {len(documents)} relevant documents from {len(shards)} shards")
         return documents
 
+    @staticmethod
+    def _where(filters: Dict) -> Optional[Dict]:
+        """Per-chunk metadata filter for the shards that survive pruning."""
+        conditions = []
+        if filters.get('sections'):
+            conditions.append({'section': {'$in': list(filters['sections'])}})
+        if filters.get('year_from'):
+            conditions.append({'year': {'$gte': int(filters['year_from'])}})
+        if filters.get('year_to'):
+            conditions.append({'year': {'$lte': int(filters['year_to'])}})
+
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {'$and': conditions}
+
     def generate_answer(self, question: str, context_docs: List[Dict]) -> str:
         """
         Generate an answer using Gemini based on retrieved patent context.
@@ -241,12 +886,13 @@ class RAGEngine:
             logger.error(f"Error generating answer: {e}")
             raise
 
-    def query(self, question: str) -> Dict:
+    def query(self, question: str, filters: Optional[Dict] = None) -> Dict:
         """
         Main query method - retrieve and generate answer.
 
         Args:
             question: User question
+            filters: Optional section/year filters (see retrieve_relevant_docs)
 
         Returns:
             Dictionary with answer and metadata
@@ -256,7 +902,7 @@ class RAGEngine:
         logger.info(f"Processing query: {question}")
 
         # Retrieve relevant documents
-        relevant_docs = self.retrieve_relevant_docs(question)
+        relevant_docs = self.retrieve_relevant_docs(question, filters=filters)
 
         if not relevant_docs:
             return {
@@ -341,15 +987,67 @@ class RAGEngine:
             Statistics dictionary
         """
         try:
-            self.collection = self.chroma_client.get_collection(name=self.COLLECTION_NAME)
-            count = self.collection.count()
+            catalog = self._serving_catalog()
+            counts = self._fan_out(lambda shard: catalog.collection(shard).count(), catalog.select())
+            shards = []
+            for shard, count in counts.items():
+                if isinstance(count, Exception):
+                    raise count
+                shards.append(dict(catalog.shards[shard], name=shard, count=count))
 
             return {
-                'total_documents': count,
-                'collection_name': self.COLLECTION_NAME,
+                'total_documents': sum(shard['count'] for shard in shards),
+                'collection_name': catalog.version,
+                'alias': self.COLLECTION_NAME,
+                'shard_by': catalog.shard_by,
+                'shards': shards,
                 'embedding_dimension': self.embedding_service.get_embedding_dimension(),
                 'embedding_model': self.embedding_service.model_name
             }
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
             return {'error': str(e)}
+
+
+_engine = None
+_engine_lock = threading.Lock()
+# Model loaded ahead of the engine by a preloading gunicorn master
+_embedding_service = None
+
+
+def get_rag_engine() -> RAGEngine:
+    """
+    Return the process-wide RAG engine, creating it on first use.
+
+    Loading the embedding model and connecting to ChromaDB is expensive, so
+    request handlers share one engine per process instead of building a new
+    one for every request.
+
+    Returns:
+        Shared RAGEngine instance
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RAGEngine(embedding_service=_embedding_service)
+    return _engine
+
+
+def preload_embedding_model():
+    """
+    Load the embedding model that get_rag_engine() will use, without the engine.
+
+    Called by a preloading gunicorn master (see config/gunicorn.conf.py): the
+    model is inherited by the forked workers copy-on-write, while the engine
+    and its clients are created in each worker. chromadb imports onnxruntime,
+    whose native state does not survive fork; workers inheriting it crash
+    when they exit.
+    """
+    global _embedding_service
+    from .embedding_service import EmbeddingService
+
+    with _engine_lock:
+        if _embedding_service is None:
+            _embedding_service = EmbeddingService()
+    return _embedding_service
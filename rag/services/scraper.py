@@ -6,12 +6,14 @@ import json
 import logging
 import time
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 
 from django.conf import settings
 
 from .tipo_web_scraper import TIPOWebScraper, scrape_patent_links
 from .tipo_ftps_downloader import TIPOFTPSDownloader, download_patent_data_from_links
+from .parse_cache import open_parse_cache
+from .docs_store import docs_path
 from .tipo_xml_parser import TIPOXMLParser, parse_patent_directory
 
 logger = logging.getLogger(__name__)
@@ -42,7 +44,11 @@ class TaiwanPatentScraper:
         self.max_periods = max_pages or getattr(settings, 'MAX_PAGES_TO_SCRAPE', 5)
         self.web_scraper = TIPOWebScraper(headless=True)
         self.ftps_downloader = TIPOFTPSDownloader()
-        self.xml_parser = TIPOXMLParser()
+        self.xml_parser = TIPOXMLParser(
+            workers=settings.PARSE_WORKERS,
+            batch_size=settings.PARSE_BATCH_SIZE,
+            cache=open_parse_cache()  # 重新執行時只解析新增或修改過的 XML
+        )
 
     def scrape_section(
         self,
@@ -50,7 +56,7 @@ class TaiwanPatentScraper:
         latest_only: bool = True,
         xml_only: bool = True,
         max_files_per_period: int = 100
-    ) -> List[Dict]:
+    ) -> Dict:
         """
         完整的專利爬取流程:
         1. 爬取下載連結
@@ -64,7 +70,8 @@ class TaiwanPatentScraper:
             max_files_per_period: 每期最多下載幾個檔案 (控制資料量)
 
         Returns:
-            List of scraped patent documents (格式見 tipo_xml_parser.py)
+            {'patents': 專利數, 'output_file': {section}_docs.jsonl 路徑, 'sample': 第一個專利}
+            (專利格式見 tipo_xml_parser.py)
         """
         if section not in self.SECTIONS:
             raise ValueError(f"Invalid section: {section}. Choose from {list(self.SECTIONS.keys())}")
@@ -89,7 +96,7 @@ class TaiwanPatentScraper:
 
         if not links_data:
             logger.error("無法取得下載連結")
-            return []
+            return {'patents': 0, 'output_file': None, 'sample': None}
 
         total_periods = sum(len(periods) for periods in links_data.values())
         logger.info(f"✓ 取得 {total_periods} 個期別的下載連結")
@@ -112,15 +119,13 @@ class TaiwanPatentScraper:
         # Step 3: 解析 XML
         logger.info("\n[Step 3/3] 解析 XML 檔案...")
 
-        patents = self.xml_parser.parse_directory(
+        # 邊解析邊寫入 JSONL,不在記憶體中累積全部專利
+        result = self.xml_parser.write_directory(
             directory=str(download_dir),
+            output_file=str(docs_path(section)),
             max_files=None  # 解析所有已下載的檔案
         )
 
-        # 儲存解析結果
-        output_json = settings.RAW_DATA_DIR / f'{section}_docs.json'
-        self.xml_parser.save_patents_json(patents, str(output_json))
-
-        logger.info(f"\n========== 完成! 共取得 {len(patents)} 個專利文件 ==========")
+        logger.info(f"\n========== 完成! 共取得 {result['patents']} 個專利文件 ==========")
 
-        return patents
+        return result
@@ -0,0 +1,196 @@
+"""
+Shard catalog for the patent vector index.
+
+An index version (the collection the alias points to) is partitioned into
+shard collections by section (the patent type in chunk metadata) and, with
+INDEX_SHARD_BY='year', by publication year, e.g.
+``taiwan_patents__v20250101120000__invention__2023``.
+The version collection itself holds no vectors; its metadata is the catalog,
+so queries can prune shards by type and year before fanning out.
+
+Indexes built before sharding have no catalog and are read as a single shard
+holding everything.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SHARD_MODES = ('year', 'section')
+
+# Shard "year" when sharding by section only, or when the date is missing
+ALL_YEARS = 'all'
+UNKNOWN_YEAR = 'unknown'
+
+_WESTERN_YEAR = re.compile(r'\s*(\d{4})')
+# ROC calendar dates such as 112/03/15
+_ROC_YEAR = re.compile(r'\s*(\d{2,3})[/.\-]')
+_NAME_UNSAFE = re.compile(r'[^A-Za-z0-9_-]')
+
+
+def publication_year(metadata: Dict) -> Optional[int]:
+    """
+    Year a patent was published (or filed, if the publication date is missing).
+
+    Args:
+        metadata: Chunk metadata
+
+    Returns:
+        Western calendar year, or None if no date can be read
+    """
+    for key in ('publication_date', 'application_date'):
+        value = str(metadata.get(key) or '')
+        match = _WESTERN_YEAR.match(value)
+        if match and 1900 <= int(match.group(1)) <= 2100:
+            return int(match.group(1))
+        match = _ROC_YEAR.match(value)
+        if match:
+            return int(match.group(1)) + 1911
+    return None
+
+
+def _name_part(value: str) -> str:
+    """Section as it can appear in a collection name ([A-Za-z0-9_-] only)."""
+    clean = _NAME_UNSAFE.sub('', value)
+    if clean == value:
+        return value
+    # Keep distinct values (e.g. untranslated Chinese types) in distinct shards
+    return f"{clean or 'type'}-{hashlib.sha1(value.encode('utf-8')).hexdigest()[:8]}"
+
+
+class ShardCatalog:
+    """Shards of one index version, and routing of chunks to them."""
+
+    def __init__(self, chroma_client, root):
+        """
+        Args:
+            chroma_client: ChromaDB client
+            root: The version collection (holds the catalog metadata)
+        """
+        self.chroma_client = chroma_client
+        self.root = root
+        self.version = root.name
+        self._lock = threading.Lock()
+        self._collections = {}
+
+        metadata = root.metadata or {}
+        if 'shard_by' in metadata:
+            self.shard_by = metadata['shard_by']
+            self.shards = json.loads(metadata.get('shards') or '{}')
+        elif root.count() > 0:
+            # Unsharded index from before the catalog existed
+            self.shard_by = 'none'
+            self.shards = {self.version: {'section': None, 'year': None}}
+        else:
+            self.shard_by = None
+            self.shards = {}
+
+    def initialize(self, shard_by: str):
+        """
+        Choose the sharding of a new, empty version.
+
+        An existing catalog keeps its own layout; changing INDEX_SHARD_BY takes
+        effect on the next rebuild.
+        """
+        if self.shard_by is not None:
+            return
+        if shard_by not in SHARD_MODES:
+            raise ValueError(f"INDEX_SHARD_BY must be one of {SHARD_MODES}, got {shard_by!r}")
+        self.shard_by = shard_by
+        self._save()
+
+    def _save(self):
+        self.root.modify(metadata={
+            'description': 'Taiwan Patent Office documents (shard catalog)',
+            'shard_by': self.shard_by,
+            'shards': json.dumps(self.shards, sort_keys=True),
+        })
+
+    def shard_for(self, metadata: Dict) -> str:
+        """
+        Shard a chunk belongs to, registering the shard if it is new.
+
+        Args:
+            metadata: Chunk metadata (with year set when known)
+
+        Returns:
+            Shard collection name
+        """
+        if self.shard_by == 'none':
+            return self.version
+
+        section = str(metadata.get('section') or 'unknown')
+        if self.shard_by == 'year':
+            year = metadata.get('year') or UNKNOWN_YEAR
+        else:
+            year = ALL_YEARS
+        name = f'{self.version}__{_name_part(section)}__{year}'
+
+        if name not in self.shards:
+            with self._lock:
+                if name not in self.shards:
+                    # Saved right away so a resumed build finds shards created
+                    # by batches it skips
+                    self.shards[name] = {'section': section, 'year': year}
+                    self._save()
+                    logger.info(f"New shard: {name}")
+        return name
+
+    def collection(self, name: str):
+        """Collection of a shard (cached)."""
+        collection = self._collections.get(name)
+        if collection is None:
+            # Parallel writers reaching a new shard at once would otherwise
+            # race to create it, and all but one fail
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    if name == self.version:
+                        collection = self.root
+                    else:
+                        collection = self.chroma_client.get_or_create_collection(name=name)
+                    self._collections[name] = collection
+        return collection
+
+    def select(self, sections: Optional[List[str]] = None,
+               year_from: Optional[int] = None, year_to: Optional[int] = None) -> List[str]:
+        """
+        Shards that can hold chunks matching the filters.
+
+        Shards without a known year (or a legacy unsharded index) are always
+        kept; the per-chunk ``where`` filter narrows them further.
+
+        Args:
+            sections: Sections (patent types) to search; None for all
+            year_from: First publication year, inclusive
+            year_to: Last publication year, inclusive
+
+        Returns:
+            Shard collection names
+        """
+        names = []
+        for name, shard in sorted(self.shards.items()):
+            section, year = shard['section'], shard['year']
+            if sections and section is not None and section not in sections:
+                continue
+            if isinstance(year, int):
+                if year_from and year < year_from:
+                    continue
+                if year_to and year > year_to:
+                    continue
+            names.append(name)
+        return names
+
+    def delete(self):
+        """Delete the version with all its shards."""
+        for name in self.shards:
+            if name != self.version:
+                try:
+                    self.chroma_client.delete_collection(name=name)
+                except Exception as e:
+                    logger.warning(f"Could not delete shard {name}: {e}")
+        self.chroma_client.delete_collection(name=self.version)
@@ -0,0 +1,312 @@
+"""
+Synthetic TIPO patent XML corpus.
+
+Writes ``<tw-patent-grant>`` files shaped like the single-patent XML of
+the TIPO gazettes, so the parser, processor and indexer can be
+benchmarked without downloading gigabytes from TIPO. Files are laid out
+like a download, one directory per period (``{year}/vol{vv}_iss{ii}``),
+or packed as one zip period archive per period with an index.xml and
+figure images.
+
+The Traditional Chinese filler text is shared with the index benchmark's
+synthetic documents (see index_benchmark.synthetic_documents); the same
+seed always yields the same corpus.
+"""
+import logging
+import random
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+logger = logging.getLogger(__name__)
+
+SUBJECTS = ['半導體元件', '散熱模組', '電池管理系統', '影像感測器', '無線通訊裝置', '顯示面板',
+            '馬達控制電路', '資料處理方法', '自行車變速器', '醫療檢測裝置', '光學鏡頭', '電源轉換器']
+PARTS = ['基板', '殼體', '控制單元', '感測層', '導熱件', '天線結構', '處理器', '連接器',
+         '驅動電路', '記憶體', '透鏡組', '固定座']
+VERBS = ['設置於', '電性連接', '耦接至', '環繞', '相對於', '貼附於', '延伸穿過', '間隔排列於']
+EFFECTS = ['提升散熱效率', '降低製造成本', '減少訊號干擾', '延長使用壽命', '提高量測精度',
+           '縮小整體體積', '改善使用者體驗', '降低功率消耗']
+SUBJECTS_EN = {
+    '半導體元件': 'SEMICONDUCTOR DEVICE', '散熱模組': 'HEAT DISSIPATION MODULE',
+    '電池管理系統': 'BATTERY MANAGEMENT SYSTEM', '影像感測器': 'IMAGE SENSOR',
+    '無線通訊裝置': 'WIRELESS COMMUNICATION DEVICE', '顯示面板': 'DISPLAY PANEL',
+    '馬達控制電路': 'MOTOR CONTROL CIRCUIT', '資料處理方法': 'DATA PROCESSING METHOD',
+    '自行車變速器': 'BICYCLE DERAILLEUR', '醫療檢測裝置': 'MEDICAL TESTING DEVICE',
+    '光學鏡頭': 'OPTICAL LENS', '電源轉換器': 'POWER CONVERTER',
+}
+# Patent agencies; each reuses the same boilerplate across its filings
+AGENCIES = 20
+# Prefix of synthetic patent numbers: real TIPO numbers are a letter and digits,
+# so synthetic rows can never overwrite a real patent in the database
+SYNTHETIC_PREFIX = 'SYN-'
+
+_SURNAMES = '陳林黃張李王吳劉蔡楊許鄭謝郭洪曾邱廖賴徐周葉蘇莊呂江何蕭羅高'
+_GIVEN = '志明俊傑淑芬家豪雅婷建宏美玲冠宇怡君承翰欣怡宗翰佳穎'
+_COMPANY_WORDS = ['台灣', '鴻海', '聯華', '光電', '精密', '科技', '半導體', '電子', '材料', '生醫', '能源', '通訊']
+_IPC_SECTIONS = 'ABCDEFGH'
+_KIND_CODES = {'invention': ('I', 'B'), 'utility': ('M', 'U'), 'design': ('D', 'S')}
+_DESCRIPTION_PARTS = ['technical-field', 'background-art', 'disclosure', 'mode-for-invention']
+
+
+def sentence(rng: random.Random) -> str:
+    """One claim-style filler sentence."""
+    first, second = rng.sample(PARTS, 2)
+    return (f"該{first}{rng.choice(VERBS)}該{second}，"
+            f"藉此{rng.choice(EFFECTS)}；{rng.choice(PARTS)}之數量為{rng.randint(2, 64)}個。")
+
+
+def paragraph(rng: random.Random, number: int, sentences: int) -> str:
+    """A numbered description paragraph of sentences // 2 to sentences sentences."""
+    return f"【{number:04d}】" + ''.join(sentence(rng) for _ in range(rng.randint(sentences // 2, sentences)))
+
+
+def boilerplate(agency: int) -> str:
+    """An agency's standard figure and legal paragraphs, the same in all its filings."""
+    rng = random.Random(f'agency-{agency}')
+    figures = ''.join(
+        f"圖{n}為本發明{rng.choice(SUBJECTS)}之{rng.choice(['立體示意圖', '剖面示意圖', '方塊圖', '流程圖', '局部放大圖'])}。"
+        for n in range(1, 31)
+    )
+    numerals = '、'.join(f"{rng.choice(PARTS)}{n * 10}" for n in range(1, 61))
+    return (
+        f"【圖式簡單說明】{figures}"
+        f"【主要元件符號說明】{numerals}。"
+        "【實施方式】以下配合圖式及元件符號對本發明之實施方式做更詳細的說明，"
+        "俾使熟習該項技藝者在研讀本說明書後能據以實施。"
+        "惟以上所述者僅為本發明之較佳實施例，不能以此限定本發明實施之範圍，"
+        "凡依本發明申請專利範圍及說明書內容所作之簡單的等效變化與修飾，皆仍屬本發明專利涵蓋之範圍內。"
+    )
+
+
+def _person(rng: random.Random) -> Tuple[str, str]:
+    """(Chinese, romanized) name of an inventor."""
+    surname = rng.choice(_SURNAMES)
+    given = ''.join(rng.sample(_GIVEN, 2))
+    return f"{surname}{given}", f"INVENTOR {rng.randrange(100000):05d}"
+
+
+def _company(rng: random.Random) -> Tuple[str, str]:
+    """(Chinese, English) name of an applicant company."""
+    words = ''.join(rng.sample(_COMPANY_WORDS, 2))
+    return f"{words}股份有限公司", f"APPLICANT {rng.randrange(100000):05d} CO., LTD."
+
+
+def ipc_codes(count: int, seed: int = 0) -> List[str]:
+    """A pool of distinct IPC main-group codes (e.g. H01L21/02), fixed per seed."""
+    rng = random.Random(f'ipc-{seed}')
+    codes = set()
+    while len(codes) < count:
+        codes.add(
+            f"{rng.choice(_IPC_SECTIONS)}{rng.randint(1, 99):02d}{chr(rng.randint(65, 90))}"
+            f"{rng.randint(1, 99)}/{rng.choice(['00', '02', '04', '06', '08', '10', '12', '14', '16', '20'])}"
+        )
+    return sorted(codes)
+
+
+def _addressbooks(tag: str, names: List[Tuple[str, str]], country: str) -> str:
+    return ''.join(
+        f'        <{tag} sequence="{n}" app-type="applicant">\n'
+        f'          <addressbook>\n'
+        f'            <chinese-name name-type=""><last-name>{escape(chinese)}</last-name><first-name></first-name></chinese-name>\n'
+        f'            <english-name name-type=""><last-name>{escape(english)}</last-name><middle-name/><first-name/></english-name>\n'
+        f'            <address></address>\n'
+        f'            <english-country>{country}</english-country>\n'
+        f'          </addressbook>\n'
+        f'        </{tag}>\n'
+        for n, (chinese, english) in enumerate(names, 1)
+    )
+
+
+def _document_id(number: str, date: str) -> str:
+    return f'<document-id><doc-number>{number}</doc-number><kind/><date>{date}</date></document-id>'
+
+
+def patent_xml(
+    rng: random.Random,
+    serial: int,
+    year: int,
+    volume: int,
+    issue: int,
+    ipc_pool: List[str],
+    description_paragraphs: Tuple[int, int] = (8, 30),
+    claims: Tuple[int, int] = (3, 15),
+    applicants: Tuple[int, int] = (1, 2),
+    inventors: Tuple[int, int] = (1, 4),
+    ipc_per_patent: Tuple[int, int] = (1, 4),
+    patent_type: str = 'invention'
+) -> Tuple[str, str, List[str]]:
+    """
+    One synthetic patent grant.
+
+    Args:
+        rng: Random source (advanced by the call)
+        serial: Running number of the patent in the corpus
+        year: ROC year of publication (e.g. 113)
+        volume, issue: Gazette volume and issue
+        ipc_pool: IPC codes to draw from
+        description_paragraphs, claims, applicants, inventors, ipc_per_patent:
+            (min, max) counts, drawn uniformly per patent
+        patent_type: 'invention', 'utility' or 'design'
+
+    Returns:
+        (application number, XML text, figure image file names)
+    """
+    prefix, kind = _KIND_CODES[patent_type]
+    subject = rng.choice(SUBJECTS)
+    application_year = year - rng.randint(1, 4)
+    application_number = f"{application_year}{100000 + serial % 900000:06d}"
+    certificate_number = f"{SYNTHETIC_PREFIX}{prefix}{700000 + serial:06d}"
+    application_date = f"{application_year}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+    publication_date = f"{year}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+
+    codes = rng.sample(ipc_pool, min(len(ipc_pool), rng.randint(*ipc_per_patent)))
+    further = ''.join(f'      <further-classification edition="202301">{code}</further-classification>\n'
+                      for code in codes[1:])
+    companies = [_company(rng) for _ in range(rng.randint(*applicants))]
+    people = [_person(rng) for _ in range(rng.randint(*inventors))]
+
+    figures = [f"{application_number}-{n:04d}.jpg" for n in range(1, rng.randint(2, 8))]
+    figure_xml = ''.join(
+        f'    <figure><img file={quoteattr(name)} alt={quoteattr("圖式" + name)} img-content="tif" '
+        f'img-format="tif" orientation="portrait" inline="yes"></img></figure>\n'
+        for name in figures
+    )
+
+    abstract = f"本發明提供一種{subject}。" + ''.join(sentence(rng) for _ in range(rng.randint(3, 8)))
+
+    count = rng.randint(*description_paragraphs)
+    numbers = iter(range(2, count + 2))
+    sizes = [count // len(_DESCRIPTION_PARTS)] * len(_DESCRIPTION_PARTS)
+    sizes[-1] += count - sum(sizes)
+    description = f'    <p num="0001">{escape(boilerplate(rng.randrange(AGENCIES)))}</p>\n'
+    for part, size in zip(_DESCRIPTION_PARTS, sizes):
+        body = ''.join(
+            f'      <p num="{number:04d}">{escape(paragraph(rng, number, 10))}</p>\n'
+            for number in (next(numbers) for _ in range(size))
+        )
+        description += f'    <{part}>\n{body}    </{part}>\n'
+
+    claim_xml = ''
+    for n in range(1, rng.randint(*claims) + 1):
+        if n == 1:
+            text = f"一種{subject}，包含：" + ''.join(sentence(rng) for _ in range(rng.randint(2, 6)))
+        else:
+            text = f"如請求項{rng.randint(1, n - 1)}所述之{subject}，其中" + sentence(rng)
+        claim_xml += f'    <claim id="clm{n}" num="{n}">\n      <p type="claim">{escape(text)}</p>\n    </claim>\n'
+
+    xml = (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        f'<!DOCTYPE tw-patent-grant SYSTEM "{patent_type}.dtd">\n'
+        '<tw-patent-grant dtd-version="A103.1.0">\n'
+        '  <tw-bibliographic-data-grant>\n'
+        f'    <volno>{volume}</volno>\n'
+        f'    <isuno>{issue}</isuno>\n'
+        f'    <kindcode>{kind}</kindcode>\n'
+        f'    <publication-reference>{_document_id(certificate_number, publication_date)}</publication-reference>\n'
+        f'    <certificate-number>{_document_id(certificate_number, "")}</certificate-number>\n'
+        f'    <application-reference appl-type="{patent_type}">'
+        f'{_document_id(application_number, application_date)}</application-reference>\n'
+        '    <classification-ipc>\n'
+        f'      <main-classification edition="202301">{codes[0]}</main-classification>\n'
+        f'{further}'
+        '    </classification-ipc>\n'
+        '    <parties>\n'
+        f'      <applicants>\n{_addressbooks("applicant", companies, "TW")}      </applicants>\n'
+        f'      <inventors>\n{_addressbooks("inventor", people, "TW")}      </inventors>\n'
+        '    </parties>\n'
+        '    <invention-title>\n'
+        f'      <chinese-title>{subject}及其製造方法</chinese-title>\n'
+        f'      <english-title>{SUBJECTS_EN[subject]} AND MANUFACTURING METHOD THEREOF</english-title>\n'
+        '    </invention-title>\n'
+        '  </tw-bibliographic-data-grant>\n'
+        f'  <abstract>\n    <p num="0001">{escape(abstract)}</p>\n  </abstract>\n'
+        f'  <description>\n{description}  </description>\n'
+        f'  <drawings num="圖{len(figures)}">\n{figure_xml}  </drawings>\n'
+        f'  <claims>\n{claim_xml}  </claims>\n'
+        '</tw-patent-grant>\n'
+    )
+    return application_number, xml, figures
+
+
+def _index_xml(entries: List[Tuple[str, str]]) -> str:
+    """index.xml of a period: (application number, file name) per patent."""
+    patents = ''.join(
+        f'  <Patent><ApplicationNum>{number}</ApplicationNum><FileName>{file_name}</FileName></Patent>\n'
+        for number, file_name in entries
+    )
+    return f'<?xml version="1.0" encoding="utf-8"?>\n<Index>\n{patents}</Index>\n'
+
+
+def generate_corpus(
+    directory: Path,
+    files: int,
+    seed: int = 0,
+    period_size: int = 500,
+    archive: bool = False,
+    ipc_pool_size: int = 200,
+    types: Tuple[str, ...] = ('invention',),
+    **counts
+) -> Dict:
+    """
+    Write a synthetic TIPO XML corpus.
+
+    Args:
+        directory: Output directory (created if missing)
+        files: Number of patent XML files
+        seed: Random seed (the same seed yields the same corpus)
+        period_size: Patents per period (directory or archive)
+        archive: Pack each period as {year}/vol{vv}_iss{ii}.zip, with an
+                 index.xml and a small image per figure, instead of a directory
+        ipc_pool_size: Distinct IPC codes in the corpus
+        types: Patent types to draw from ('invention', 'utility', 'design')
+        **counts: (min, max) ranges passed to patent_xml: description_paragraphs,
+                  claims, applicants, inventors, ipc_per_patent
+
+    Returns:
+        {'files', 'periods', 'bytes' (XML only), 'directory'}
+    """
+    directory = Path(directory)
+    rng = random.Random(seed)
+    ipc_pool = ipc_codes(ipc_pool_size, seed)
+    total_bytes = 0
+    periods = 0
+
+    for start in range(0, files, period_size):
+        # Like the gazettes: 36 issues a year, ROC years counting back from 113
+        year, issue = 113 - periods // 36, periods % 36 + 1
+        volume = year - 62
+        period = f"vol{volume:02d}_iss{issue:02d}"
+        period_dir = directory / str(year)
+        period_dir.mkdir(parents=True, exist_ok=True)
+        periods += 1
+
+        patents = (
+            patent_xml(rng, serial, year, volume, issue, ipc_pool, patent_type=rng.choice(types), **counts)
+            for serial in range(start, min(start + period_size, files))
+        )
+        if not archive:
+            (period_dir / period).mkdir(exist_ok=True)
+            for number, xml, _ in patents:
+                data = xml.encode('utf-8')
+                (period_dir / period / f"{number}.xml").write_bytes(data)
+                total_bytes += len(data)
+            continue
+
+        entries = []
+        with zipfile.ZipFile(period_dir / f"{period}.zip", 'w', zipfile.ZIP_DEFLATED) as zf:
+            for number, xml, figures in patents:
+                data = xml.encode('utf-8')
+                zf.writestr(f"{period}/{number}.xml", data)
+                for name in figures:
+                    # Stand-in for a scanned figure: incompressible, stored as is.
+                    # Own random source, so both layouts hold the same patents
+                    image = random.Random(f'{seed}-{name}').randbytes(4096)
+                    zf.writestr(f"{period}/images/{name}", image, zipfile.ZIP_STORED)
+                entries.append((number, f"{number}.xml"))
+                total_bytes += len(data)
+            zf.writestr(f"{period}/index.xml", _index_xml(entries))
+
+    logger.info(f"Wrote {files} synthetic patents ({total_bytes / 1e6:.1f} MB) in {periods} periods to {directory}")
+    return {'files': files, 'periods': periods, 'bytes': total_bytes, 'directory': str(directory)}
@@ -0,0 +1,137 @@
+"""
+Chinese-aware text splitter for patent text.
+
+RecursiveCharacterTextSplitter with English separators (". ", " ") finds no
+split points in Chinese descriptions, which have no spaces, and falls through
+to character-level splitting: slow, and chunks end mid-sentence. This
+splitter walks the text once, chunk by chunk, and cuts each chunk at the
+strongest boundary (paragraph, line, sentence, clause, phrase) in the tail of
+its window, using precompiled patterns.
+"""
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Boundary patterns, strongest first. A boundary is the end of the match, so
+# punctuation stays with the sentence it ends; 【0001】 paragraph numbers are
+# matched by a lookahead and split before the mark.
+_LEVELS = [
+    re.compile(r'\n[ \t\u3000]*\n|(?=【\d{4}】)'),      # paragraph
+    re.compile(r'\n'),                                   # line
+    re.compile(r'[。！？!?]+[」』）)]*|\.(?=\s)'),         # sentence
+    re.compile(r'[；;：:]'),                              # clause
+    re.compile(r'[，,、]'),                               # phrase
+    re.compile(r'[ \t\u3000]+'),                          # space
+]
+# Any boundary, for placing the start of the overlap
+_ANY = re.compile('|'.join(pattern.pattern for pattern in _LEVELS))
+
+
+class PatentTextSplitter:
+    """Split text into chunks of at most chunk_size characters at natural boundaries."""
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100, min_fill: float = 0.5):
+        """
+        Args:
+            chunk_size: Maximum chunk length in characters
+            chunk_overlap: Maximum characters shared by consecutive chunks
+            min_fill: A chunk is cut at the strongest boundary past this
+                      fraction of chunk_size, so weak boundaries near the end
+                      do not win over a paragraph end slightly earlier
+        """
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.min_fill = min_fill
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text into chunks.
+
+        Each chunk ends at the strongest boundary within chunk_size (a hard
+        cut only if there is none). The next chunk starts at the first
+        boundary inside the last chunk_overlap characters, so the overlap
+        never exceeds chunk_overlap and begins after a sentence or clause
+        where possible; without a boundary it is exactly chunk_overlap
+        characters. Only the tail of each window is searched, so the text is
+        scanned about once whatever the chunk size.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            List of chunks (stripped, non-empty)
+        """
+        length = len(text)
+        if length <= self.chunk_size:
+            stripped = text.strip()
+            return [stripped] if stripped else []
+
+        fill = int(self.chunk_size * self.min_fill)
+        chunks = []
+        start = 0
+        while True:
+            limit = start + self.chunk_size
+            if limit >= length:
+                chunk = text[start:].strip()
+                if chunk:
+                    chunks.append(chunk)
+                return chunks
+
+            end = self._cut(text, start + fill, limit) or limit
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+
+            next_start = end
+            if self.chunk_overlap:
+                floor = max(end - self.chunk_overlap, start + 1)
+                match = _ANY.search(text, floor, end)
+                next_start = match.end() if match and match.end() < end else floor
+            start = next_start
+
+    @staticmethod
+    def _cut(text: str, low: int, high: int) -> Optional[int]:
+        """Last boundary in (low, high] of the strongest kind present (None if none)."""
+        for pattern in _LEVELS:
+            end = None
+            for match in pattern.finditer(text, low, high):
+                end = match.end()
+            if end is not None and end > low:
+                return end
+        return None
+
+
+def compare_splitters(texts: Iterable[str], splitters: Dict[str, Callable[[str], List[str]]]) -> Dict[str, Dict]:
+    """
+    Time splitters on the same texts and summarize their chunks.
+
+    Args:
+        texts: Texts to split (materialized once)
+        splitters: {name: split function}
+
+    Returns:
+        {name: {'seconds', 'chars_per_sec', 'chunks', 'avg_length',
+                'max_length', 'sentence_end_ratio'}}, where sentence_end_ratio
+        is the share of chunks ending in sentence or clause punctuation
+    """
+    texts = list(texts)
+    total_chars = sum(len(text) for text in texts)
+    report = {}
+    for name, split in splitters.items():
+        started = time.perf_counter()
+        chunks = [chunk for text in texts for chunk in split(text)]
+        seconds = time.perf_counter() - started
+        lengths = [len(chunk) for chunk in chunks]
+        report[name] = {
+            'seconds': round(seconds, 3),
+            'chars_per_sec': round(total_chars / seconds) if seconds else 0,
+            'chunks': len(chunks),
+            'avg_length': round(sum(lengths) / len(lengths), 1) if lengths else 0,
+            'max_length': max(lengths, default=0),
+            'sentence_end_ratio': round(
+                sum(1 for chunk in chunks if chunk[-1] in '。！？；;.!?」）') / len(chunks), 3
+            ) if chunks else 0,
+        }
+    return report
@@ -406,7 +406,9 @@ def download_patent_data_from_links(
     # 檔案過濾器
     file_filter = None
     if xml_only:
-        file_filter = lambda f: f.lower().endswith('.xml')
+        # 期別封存檔 (zip / tar) 不必解壓縮,解析器直接讀取其中的 XML
+        from .period_archive import is_archive
+        file_filter = lambda f: f.lower().endswith('.xml') or is_archive(f)
 
     # 年份過濾器
     year_filter = None
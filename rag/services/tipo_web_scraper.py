@@ -6,7 +6,6 @@ import json
 import logging
 import re
 from typing import List, Dict, Optional
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
@@ -81,6 +80,9 @@ class TIPOWebScraper:
         url = f"{self.BASE_URL}/{self.DATASET_URLS[dataset_key]}"
         logger.info(f"爬取資料集: {dataset_key} from {url}")
 
+        # Playwright 載入很慢,只在真正要爬取時才匯入
+        from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+
         with sync_playwright() as p:
             # 啟動瀏覽器
             browser = p.chromium.launch(headless=self.headless)
@@ -2,25 +2,225 @@
 TIPO XML Parser - 解析台灣專利局的 XML 檔案
 將 XML 轉換成 RAG 系統可用的專利文件格式
 """
+import io
 import os
 import json
+import hashlib
 import logging
+import multiprocessing
+import tempfile
+import time
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional
+from collections import deque
+from contextlib import nullcontext
+from itertools import groupby, islice
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
 
+from lxml import etree
+
+from .period_archive import (
+    PeriodArchive, is_archive, is_patent_xml, member_path, open_source, split_member_path, total_size
+)
+
 logger = logging.getLogger(__name__)
 
+# 串流解析的欄位路徑,與 parse_patent_xml_tree 的 find() 路徑相同:
+# 標籤 -> [(上層標籤 (由近到遠), 欄位)]
+_TEXT_PATHS = {
+    'doc-number': [
+        (('document-id', 'certificate-number'), 'certificate_number'),
+        (('document-id', 'publication-reference'), 'publication_number'),
+        (('document-id', 'application-reference'), 'application_number'),
+    ],
+    'date': [
+        (('document-id', 'application-reference'), 'application_date'),
+        (('document-id', 'publication-reference'), 'publication_date'),
+    ],
+    'main-classification': [(('classification-ipc',), 'ipc_classification')],
+    'chinese-title': [(('invention-title',), 'chinese_title')],
+    'english-title': [(('invention-title',), 'english_title')],
+}
+
+# 以 itertext() 取全文的元素;在其內部的元素要等它結束才能清除
+_TEXT_BLOCKS = ('abstract', 'description', 'claim')
+# 內容可能很大的區塊: 解析途中就取出已完成段落的文字並移除,不保留子樹
+_STREAMED_BLOCKS = ('abstract', 'description')
+
+# 每次餵給 XMLPullParser 的位元組數
+_READ_SIZE = 64 * 1024
+
+# 解析結果的版本: parse_patent_xml 對同一檔案的輸出改變時遞增,使解析快取失效
+PARSER_VERSION = 1
+
+# 解析目錄時回報進度的間隔 (秒)
+_PROGRESS_INTERVAL = 5.0
+
+
+def _has_parents(elem, tags: Sequence[str]) -> bool:
+    """elem 的上層依序為 tags,且最外層不是根元素 (同 find('.//a/b/elem'))"""
+    for tag in tags:
+        elem = elem.getparent()
+        if elem is None or elem.tag != tag:
+            return False
+    return elem.getparent() is not None
+
+
+def _in_text_block(elem) -> bool:
+    return any(ancestor.tag in _TEXT_BLOCKS for ancestor in elem.iterancestors())
+
+
+def _all_text(elem) -> str:
+    """同 ''.join(elem.itertext()),由 libxml2 直接串接"""
+    return etree.tostring(elem, method='text', encoding='unicode', with_tail=False)
+
+
+def _element_text(elem) -> str:
+    """同 TIPOXMLParser._get_text: 元素本身的文字 (不含子元素)"""
+    if elem is not None and elem.text:
+        return elem.text.strip()
+    return ''
+
+
+class _PatentFields:
+    """
+    由 XMLPullParser 的事件單次掃描取出專利欄位
+
+    解析器只回報 _DISPATCH 中的標籤;結束標籤交給對應的處理函數,處理完
+    的元素連同前面的兄弟元素一起清除。摘要與說明書在每次餵入資料後就
+    取出已完成段落的文字並移除,記憶體用量與讀取區塊相當,而不是整份
+    說明書的元素樹。
+    """
+
+    def __init__(self):
+        self.fields = {'applicants': [], 'inventors': [], 'claims': []}
+        # 串流中的區塊 -> 已取出的文字片段
+        self._streams = {}
+
+    def handle(self, events):
+        """處理一批事件,再取出串流區塊中已完成的段落"""
+        for event, elem in events:
+            if event == 'start':
+                if elem.tag in _STREAMED_BLOCKS and not _in_text_block(elem):
+                    self._streams[elem] = []
+                continue
+
+            if _DISPATCH[elem.tag](self, elem) and not _in_text_block(elem):
+                # 釋放已處理的子樹,以及前面已經處理過的兄弟元素
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+        for block, parts in self._streams.items():
+            # 最後一個子元素可能尚未結束,它的 tail 也可能還不完整
+            self._take(block, parts, len(block) - 1)
+
+    def _take(self, block, parts: List[str], count: int):
+        """取出區塊前 count 個子元素 (含 tail) 的文字並移除,順序同 itertext()"""
+        if count <= 0:
+            return
+        if not parts:
+            parts.append(block.text or '')
+        holder = etree.Element('holder')
+        holder.extend(block[:count])
+        parts.append(etree.tostring(holder, method='text', encoding='unicode'))
+
+    def _on_text(self, elem) -> bool:
+        for parents, field in _TEXT_PATHS[elem.tag]:
+            # find() 取第一個符合的元素,即使它沒有文字
+            if field not in self.fields and _has_parents(elem, parents):
+                self.fields[field] = _element_text(elem)
+        return False
+
+    def _on_person(self, elem) -> bool:
+        group = elem.tag + 's'
+        if not _has_parents(elem, (group,)):
+            return False
+        name = _element_text(elem.find('.//chinese-name/last-name'))
+        if not name:
+            name = _element_text(elem.find('.//english-name/last-name'))
+        if name:
+            self.fields[group].append(name)
+        return True
+
+    def _on_text_block(self, elem) -> bool:
+        parts = self._streams.pop(elem, None)
+        if parts:
+            self._take(elem, parts, len(elem))
+            text = ''.join(parts)
+        else:
+            text = _all_text(elem)
+        if elem.tag not in self.fields and elem.getparent() is not None:
+            self.fields[elem.tag] = text.strip()
+        return True
+
+    def _on_claim(self, elem) -> bool:
+        if not _has_parents(elem, ('claims',)):
+            return False
+        text = _all_text(elem).strip()
+        if text:
+            claim_num = elem.get('num', '')
+            self.fields['claims'].append(f"請求項{claim_num}: {text}" if claim_num else text)
+        return True
+
+
+# 結束標籤 -> 處理函數;回傳 True 表示該元素已處理完,可以清除
+_DISPATCH = {
+    'doc-number': _PatentFields._on_text,
+    'date': _PatentFields._on_text,
+    'main-classification': _PatentFields._on_text,
+    'chinese-title': _PatentFields._on_text,
+    'english-title': _PatentFields._on_text,
+    'applicant': _PatentFields._on_person,
+    'inventor': _PatentFields._on_person,
+    'abstract': _PatentFields._on_text_block,
+    'description': _PatentFields._on_text_block,
+    'claim': _PatentFields._on_claim,
+}
+
+
+def _parse_batch(items: List[Union[str, Tuple[str, bytes]]]) -> List[Optional[Dict]]:
+    """
+    在 worker 行程中解析一批檔案,結果順序與輸入相同 (失敗為 None)
+
+    項目為 XML 檔案路徑,或 (封存檔成員路徑, 成員內容) (見 TIPOXMLParser.iter_parsed)
+    """
+    parser = TIPOXMLParser()
+    return [
+        parser.parse_patent_xml(item) if isinstance(item, str) else parser.parse_patent_xml(item[0], io.BytesIO(item[1]))
+        for item in items
+    ]
+
 
 class TIPOXMLParser:
     """台灣專利局 XML 解析器"""
 
-    def parse_patent_xml(self, xml_file: str) -> Optional[Dict]:
+    def __init__(self, workers: int = 1, batch_size: int = 16, cache=None):
+        """
+        Args:
+            workers: 解析目錄時使用的行程數 (0 = 每個 CPU 一個; 1 = 在本行程逐一解析)
+            batch_size: 每次交給 worker 的檔案數
+            cache: 解析快取 (parse_cache.ParseCache);解析目錄時只解析新增或修改過的檔案
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.cache = cache
+        # 壓縮 tar 在列出成員時寫入的專利 XML 暫存檔 {封存檔: 檔案},見 _list_archive
+        self._spools = {}
+
+    def parse_patent_xml(self, xml_file: str, f: Optional[IO[bytes]] = None) -> Optional[Dict]:
         """
         解析單一專利 XML 檔案 (TIPO 格式: <tw-patent-grant>)
 
+        以 lxml XMLPullParser 分段餵入串流解析: 只對 _DISPATCH 中的標籤
+        產生事件,一次掃描就取出所有欄位,處理完的元素 (申請人、摘要、
+        說明書、請求項) 立即清除,不會保留整棵樹。輸出與
+        parse_patent_xml_tree 相同。
+
         Args:
-            xml_file: XML 檔案路徑
+            xml_file: XML 檔案路徑,或封存檔成員路徑 ({封存檔}!/{成員},見 period_archive)
+            f: 已開啟的檔案內容 (例如正在讀取的封存檔成員);None 時開啟 xml_file
 
         Returns:
             專利文件字典,格式如下:
@@ -41,7 +241,64 @@ class TIPOXMLParser:
             }
         """
         try:
-            tree = ET.parse(xml_file)
+            patent = _PatentFields()
+            parser = etree.XMLPullParser(
+                events=('start', 'end'),
+                tag=list(_DISPATCH),
+                remove_comments=True,
+                remove_pis=True,
+                huge_tree=True  # 說明書可能超過 libxml2 預設的單一文字節點上限
+            )
+            with nullcontext(f) if f is not None else open_source(xml_file) as f:
+                for data in iter(lambda: f.read(_READ_SIZE), b''):
+                    parser.feed(data)
+                    patent.handle(parser.read_events())
+            parser.close()
+            patent.handle(parser.read_events())
+            fields = patent.fields
+
+            return {
+                'patent_number': fields.get('certificate_number') or fields.get('publication_number', ''),
+                'application_number': fields.get('application_number', ''),
+                'title': fields.get('chinese_title') or fields.get('english_title', ''),
+                'abstract': fields.get('abstract', ''),
+                'description': fields.get('description', ''),
+                'claims': fields['claims'],
+                'inventor': '; '.join(fields['inventors']),
+                'applicant': '; '.join(fields['applicants']),
+                'application_date': fields.get('application_date', ''),
+                'publication_date': fields.get('publication_date', ''),
+                'ipc_classification': fields.get('ipc_classification', ''),
+                'patent_type': 'invention',  # 從資料集類型判斷
+                'url': f"file://{os.path.abspath(xml_file)}"
+            }
+
+        except etree.ParseError as e:
+            logger.error(f"XML 解析錯誤 {xml_file}: {e}")
+            return None
+
+        except Exception as e:
+            logger.error(f"處理檔案失敗 {xml_file}: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def parse_patent_xml_tree(self, xml_file: str) -> Optional[Dict]:
+        """
+        解析單一專利 XML 檔案 (ElementTree 整棵樹版本)
+
+        先建立整棵樹再以 find() 逐欄搜尋。保留作為 parse_patent_xml 的
+        對照實作,供 bench_parser 比對輸出與效能。
+
+        Args:
+            xml_file: XML 檔案路徑或封存檔成員路徑
+
+        Returns:
+            專利文件字典 (格式同 parse_patent_xml)
+        """
+        try:
+            with open_source(xml_file) as f:
+                tree = ET.parse(f)
             root = tree.getroot()
 
             # TIPO XML 格式使用 <tw-patent-grant> 根元素
@@ -273,7 +530,8 @@ class TIPOXMLParser:
     def parse_directory(
         self,
         directory: str,
-        max_files: Optional[int] = None
+        max_files: Optional[int] = None,
+        progress: Optional[Callable[[Dict], None]] = None
     ) -> List[Dict]:
         """
         解析整個目錄中的所有專利 XML
@@ -281,18 +539,43 @@ class TIPOXMLParser:
         Args:
             directory: 目錄路徑
             max_files: 最多解析幾個檔案 (None = 全部)
+            progress: 進度回呼 (見 iter_directory)
 
         Returns:
             專利文件列表
         """
-        patents = []
+        patents = list(self.iter_directory(directory, max_files, progress))
+        logger.info(f"成功解析 {len(patents)} 個專利文件")
+        return patents
+
+    def find_xml_files(self, directory: str, max_files: Optional[int] = None) -> List[str]:
+        """
+        找出目錄中的專利 XML 檔案 (排除 index.xml 和 dtd)
+
+        期別封存檔 (zip / tar,見 period_archive) 不必先解壓縮: 其中的專利
+        XML 以成員路徑 ({封存檔}!/{成員}) 列出,有 index.xml 時只列出其中
+        登錄的檔案。directory 也可以直接是一個封存檔。
+
+        Args:
+            directory: 目錄或期別封存檔路徑
+            max_files: 最多幾個檔案 (None = 全部)
+
+        Returns:
+            XML 檔案路徑 (或封存檔成員路徑) 列表
+        """
         xml_files = []
 
-        # 遞迴尋找所有 XML 檔案 (排除 index.xml 和 dtd)
+        if os.path.isfile(directory) and is_archive(directory):
+            xml_files.extend(self._list_archive(directory))
+
+        # 遞迴尋找所有 XML 檔案 (依路徑排序,每次解析順序相同)
         for root, dirs, files in os.walk(directory):
-            for file in files:
-                if file.endswith('.xml') and file.lower() not in ['index.xml', 'patent.dtd']:
+            dirs.sort()
+            for file in sorted(files):
+                if is_patent_xml(file):
                     xml_files.append(os.path.join(root, file))
+                elif is_archive(file):
+                    xml_files.extend(self._list_archive(os.path.join(root, file)))
 
         logger.info(f"找到 {len(xml_files)} 個 XML 檔案在 {directory}")
 
@@ -301,21 +584,201 @@ class TIPOXMLParser:
             xml_files = xml_files[:max_files]
             logger.info(f"限制解析數量: {max_files}")
 
-        # 解析每個檔案
-        for i, xml_file in enumerate(xml_files, 1):
-            if i % 100 == 0:
-                logger.info(f"已解析 {i}/{len(xml_files)} 個檔案...")
+        return xml_files
 
-            patent = self.parse_patent_xml(xml_file)
-            if patent:
-                patents.append(patent)
+    def _list_archive(self, archive: str) -> List[str]:
+        """
+        封存檔中的專利 XML 成員路徑 (無法讀取的封存檔記錄錯誤並略過)
 
-        logger.info(f"成功解析 {len(patents)}/{len(xml_files)} 個專利文件")
-        return patents
+        壓縮的 tar 只能從頭循序解壓: 列出成員的同一趟把專利 XML 成員寫入
+        暫存檔 (未壓縮的 tar),解析時改讀暫存檔,每個封存檔只解壓一次。
+        """
+        spool = None
+        try:
+            with PeriodArchive(archive) as period:
+                if period.compressed:
+                    spool = tempfile.TemporaryFile()
+                names = period.members(spool)
+        except Exception as e:
+            if spool is not None:
+                spool.close()
+            logger.error(f"無法讀取封存檔 {archive}: {e}")
+            return []
+
+        if spool is not None:
+            self._close_spool(archive)
+            self._spools[archive] = spool
+        return [member_path(archive, name) for name in names]
+
+    def _close_spool(self, archive: str):
+        spool = self._spools.pop(archive, None)
+        if spool is not None:
+            spool.close()
+
+    def iter_directory(
+        self,
+        directory: str,
+        max_files: Optional[int] = None,
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> Iterator[Dict]:
+        """
+        逐一解析目錄中的專利 XML (串流,不會一次載入全部)
+
+        workers > 1 時分批交給行程池平行解析,輸出順序仍與檔案順序相同。
+        有解析快取時,大小、修改時間與解析器版本都未變的檔案直接讀取快取。
+
+        Args:
+            directory: 目錄或期別封存檔路徑 (見 find_xml_files)
+            max_files: 最多解析幾個檔案 (None = 全部)
+            progress: 每隔數秒及結束時以 {'done', 'total', 'cached', 'failed',
+                      'seconds', 'files_per_sec', 'eta_seconds'} 呼叫
+
+        Yields:
+            專利文件字典 (解析失敗的檔案略過)
+        """
+        xml_files = self.find_xml_files(directory, max_files)
+        total = len(xml_files)
+        started = reported = time.perf_counter()
+        cached = 0
+        failed = 0
+
+        try:
+            for done, (patent, from_cache) in enumerate(self._iter_with_cache(xml_files), 1):
+                cached += from_cache
+                if patent:
+                    yield patent
+                else:
+                    failed += 1
+
+                now = time.perf_counter()
+                if now - reported >= _PROGRESS_INTERVAL or done == total:
+                    reported = now
+                    seconds = now - started
+                    rate = done / seconds if seconds else 0.0
+                    status = {
+                        'done': done,
+                        'total': total,
+                        'cached': cached,
+                        'failed': failed,
+                        'seconds': round(seconds, 1),
+                        'files_per_sec': round(rate, 1),
+                        'eta_seconds': round((total - done) / rate, 1) if rate else None,
+                    }
+                    logger.info(
+                        f"已解析 {done}/{total} 個檔案 ({rate:.0f} 檔/秒, 快取 {cached}, 失敗 {failed}, "
+                        f"預估剩餘 {status['eta_seconds'] or 0:.0f} 秒)"
+                    )
+                    if progress:
+                        progress(status)
+        finally:
+            # 全部來自快取時暫存檔沒有被讀取
+            for archive in list(self._spools):
+                self._close_spool(archive)
+
+        if self.cache is not None and max_files is None:
+            self.cache.prune(directory, (os.path.abspath(xml_file) for xml_file in xml_files))
+
+    def _iter_with_cache(self, xml_files: List[str]) -> Iterator[Tuple[Optional[Dict], bool]]:
+        """依序產生 (專利文件, 是否來自快取);只解析新增或修改過的檔案,結果寫入快取"""
+        if self.cache is None:
+            for patent in self.iter_parsed(xml_files):
+                yield patent, False
+            return
+
+        paths = [os.path.abspath(xml_file) for xml_file in xml_files]
+        fingerprints = {path: self.cache.fingerprint(path) for path in paths}
+        fresh = self.cache.fresh(fingerprints)
+        parsed = self.iter_parsed(xml_file for xml_file, path in zip(xml_files, paths) if path not in fresh)
+        try:
+            for xml_file, path in zip(xml_files, paths):
+                if path in fresh:
+                    patent = self.cache.get(path)
+                    if patent is not None:
+                        yield patent, True
+                        continue
+                    # 快取列在檢查後被刪除
+                    patent = self.parse_patent_xml(xml_file)
+                else:
+                    patent = next(parsed)
+                if patent:
+                    self.cache.put(path, fingerprints[path], patent)
+                yield patent, False
+        finally:
+            parsed.close()
+            self.cache.flush()
+
+    def iter_parsed(self, xml_files: Iterable[str]) -> Iterator[Optional[Dict]]:
+        """
+        依序解析檔案;workers > 1 時在行程池上平行解析
+
+        檔案分批送給 worker,同時最多 workers * 2 批在處理中,記憶體不會
+        隨檔案數增加。解析錯誤仍由 parse_patent_xml 逐檔記錄。
+
+        同一封存檔的連續成員只開啟封存檔一次,依序串流讀取: 單行程時直接
+        餵給解析器,平行解析時讀出成員內容交給 worker。
+
+        Args:
+            xml_files: XML 檔案路徑或封存檔成員路徑
+
+        Yields:
+            每個檔案的專利文件字典 (失敗為 None),順序與輸入相同
+        """
+        opened = self._open_sources(xml_files)
+        if self.workers == 1:
+            for xml_file, f in opened:
+                yield self.parse_patent_xml(xml_file, f)
+            return
+
+        max_in_flight = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            in_flight = deque()
+            while True:
+                while len(in_flight) < max_in_flight:
+                    # 成員內容要在讀取下一個成員前取出
+                    batch = [
+                        xml_file if f is None else (xml_file, f.read())
+                        for xml_file, f in islice(opened, self.batch_size)
+                    ]
+                    if not batch:
+                        break
+                    in_flight.append(pool.submit(_parse_batch, batch))
+                if not in_flight:
+                    return
+                # 最早送出的批次先取,輸出順序與輸入相同
+                yield from in_flight.popleft().result()
+
+    def _open_sources(self, xml_files: Iterable[str]) -> Iterator[Tuple[str, Optional[IO[bytes]]]]:
+        """
+        依序產生 (路徑, 已開啟的成員);一般檔案及找不到的成員為 None,由
+        parse_patent_xml 自行開啟 (並記錄錯誤)
+        """
+        def archive_of(xml_file):
+            member = split_member_path(xml_file)
+            return member[0] if member else None
+
+        for archive, group in groupby(xml_files, key=archive_of):
+            if archive is None:
+                for xml_file in group:
+                    yield xml_file, None
+                continue
+
+            group = list(group)
+            try:
+                # 之後同一封存檔的成員 (例如順序被打亂時) 再直接讀取封存檔
+                period = PeriodArchive(archive, spool=self._spools.pop(archive, None))
+            except Exception as e:
+                logger.error(f"無法讀取封存檔 {archive}: {e}")
+                for xml_file in group:
+                    yield xml_file, None
+                continue
+            with period:
+                names = [split_member_path(xml_file)[1] for xml_file in group]
+                for xml_file, (_, f) in zip(group, period.iter_members(names)):
+                    yield xml_file, f
 
     def save_patents_json(self, patents: List[Dict], output_file: str):
         """
-        儲存專利資料為 JSON
+        儲存專利資料為 JSON 陣列 (整份列表在記憶體中;大量資料請用 write_directory)
 
         Args:
             patents: 專利列表
@@ -326,6 +789,40 @@ class TIPOXMLParser:
 
         logger.info(f"✓ 已儲存 {len(patents)} 個專利至: {output_file}")
 
+    def write_directory(
+        self,
+        directory: str,
+        output_file: str,
+        max_files: Optional[int] = None,
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        解析目錄並逐筆寫入 JSONL 檔 (見 docs_store),記憶體不隨專利數增加
+
+        輸出先寫到暫存檔,全部完成後才取代原檔;中途失敗時原檔不變。
+        檔名以 .zst 結尾時以 zstd 壓縮。
+
+        Args:
+            directory: 目錄路徑
+            output_file: 輸出檔案路徑 ({section}_docs.jsonl 或 .jsonl.zst)
+            max_files: 最多解析幾個檔案 (None = 全部)
+            progress: 進度回呼 (見 iter_directory)
+
+        Returns:
+            {'patents': 寫入筆數, 'output_file': 輸出路徑, 'sample': 第一個專利 (無則 None)}
+        """
+        from .docs_store import PatentWriter
+
+        sample = None
+        with PatentWriter(output_file) as writer:
+            for patent in self.iter_directory(directory, max_files, progress):
+                if sample is None:
+                    sample = patent
+                writer.write(patent)
+
+        logger.info(f"✓ 已儲存 {writer.count} 個專利至: {output_file}")
+        return {'patents': writer.count, 'output_file': str(output_file), 'sample': sample}
+
 
 # 便利函數
 
@@ -354,6 +851,76 @@ def parse_patent_directory(
     return patents
 
 
+def _measure_parser(method: str, xml_files: List[str]) -> Dict:
+    """在子行程中以指定方法逐一解析檔案,記錄時間、每檔峰值記憶體與輸出摘要"""
+    from .profiling import reset_peak_rss, rss_mb
+
+    parse = getattr(TIPOXMLParser(), method)
+    seconds = 0.0
+    peaks = []
+    digests = []
+    for xml_file in xml_files:
+        measured = reset_peak_rss()
+        before = rss_mb()['rss'] if measured else 0
+        started = time.perf_counter()
+        patent = parse(xml_file)
+        seconds += time.perf_counter() - started
+        if measured:
+            peaks.append(rss_mb()['peak'] - before)
+        digests.append(hashlib.sha1(json.dumps(patent, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest())
+        del patent
+    return {'seconds': seconds, 'peaks': peaks, 'digests': digests}
+
+
+def compare_parsers(
+    xml_files: List[str],
+    methods: Sequence[str] = ('parse_patent_xml_tree', 'parse_patent_xml')
+) -> Dict[str, Dict]:
+    """
+    比較解析方法的速度、每檔峰值記憶體,並確認輸出相同
+
+    每個方法在獨立的新行程中執行,彼此的記憶體互不影響。每檔峰值為解析
+    該檔時 RSS 高於解析前的量 (僅 Linux);配置器會重用先前釋放的記憶體,
+    所以 max_peak_mb 比平均值更有代表性。
+
+    Args:
+        xml_files: XML 檔案路徑
+        methods: TIPOXMLParser 的解析方法名稱,第一個作為比對基準
+
+    Returns:
+        {方法: {'files', 'mb', 'seconds', 'files_per_sec', 'mb_per_sec',
+                'ms_per_file', 'avg_peak_mb', 'max_peak_mb', 'mismatches'}},
+        mismatches 為輸出與基準不同的檔案
+    """
+    xml_files = [str(xml_file) for xml_file in xml_files]
+    mb = total_size(xml_files) / 1e6
+    report = {}
+    baseline = None
+    for method in methods:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            result = pool.submit(_measure_parser, method, xml_files).result()
+
+        if baseline is None:
+            baseline = result['digests']
+        seconds = result['seconds']
+        peaks = result['peaks']
+        report[method] = {
+            'files': len(xml_files),
+            'mb': round(mb, 2),
+            'seconds': round(seconds, 3),
+            'files_per_sec': round(len(xml_files) / seconds, 1) if seconds else 0,
+            'mb_per_sec': round(mb / seconds, 2) if seconds else 0,
+            'ms_per_file': round(seconds * 1000 / len(xml_files), 2) if xml_files else 0,
+            'avg_peak_mb': round(sum(peaks) / len(peaks), 2) if peaks else None,
+            'max_peak_mb': round(max(peaks), 2) if peaks else None,
+            'mismatches': [
+                xml_file for xml_file, digest, expected in zip(xml_files, result['digests'], baseline)
+                if digest != expected
+            ],
+        }
+    return report
+
+
 if __name__ == '__main__':
     # 測試解析
     import sys
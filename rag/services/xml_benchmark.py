@@ -0,0 +1,126 @@
+"""
+End-to-end benchmark from TIPO XML: parse, process and index.
+
+Parses a directory of patent XML (usually a synthetic corpus written by
+synthetic_xml.generate_corpus) in a fresh process, then runs the process
+and index stages of index_benchmark.run_benchmark on the parsed patents.
+Every stage reports patent files/s and MB/s of XML, so the stages can be
+compared directly, and its peak RSS. Used by the ``bench_corpus``
+management command.
+"""
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from .docs_store import PatentWriter, iter_patents
+from .period_archive import total_size
+from .profiling import peak_rss_mb
+from .tipo_xml_parser import TIPOXMLParser
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_stage(xml_dir: str, output: str, workers: int, batch_size: int) -> Dict:
+    """Parse a directory into a docs file in this (fresh) process, timing it."""
+    parser = TIPOXMLParser(workers=workers, batch_size=batch_size)
+    xml_files = parser.find_xml_files(xml_dir)
+    xml_bytes = total_size(xml_files)
+
+    started = time.perf_counter()
+    with PatentWriter(output) as writer:
+        writer.write_all(parser.iter_parsed(xml_files))
+    seconds = time.perf_counter() - started
+
+    return {
+        'files': len(xml_files),
+        'patents': writer.count,
+        'xml_bytes': xml_bytes,
+        'seconds': seconds,
+        'workers': parser.workers,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def _rates(stage: Dict, files: int, xml_mb: float) -> Dict:
+    """Add files/s and MB/s of XML to a stage report."""
+    seconds = stage['seconds']
+    return dict(
+        stage,
+        files_per_sec=round(files / seconds, 1) if seconds else 0,
+        mb_per_sec=round(xml_mb / seconds, 2) if seconds else 0,
+    )
+
+
+def run_xml_benchmark(xml_dir: Path, workdir: Path, parse_workers: int = 1, parse_batch_size: int = 16,
+                      embedding_service=None, writers: Optional[int] = None,
+                      process_workers: Optional[int] = None) -> Dict:
+    """
+    Parse, process and index a directory of patent XML, timing each stage.
+
+    The parse stage runs in a new process, so its peak RSS is its own and
+    the process and index stages (in this process) are not charged for it.
+    Peaks are of the stage's main process; pool workers are not included.
+
+    Args:
+        xml_dir: Directory of patent XML files or period archives
+        workdir: Scratch directory for the parsed patents, chunks and vector store
+        parse_workers: XML parsing processes (0 = one per CPU, 1 = serial)
+        parse_batch_size: Files sent to a parsing worker per task
+        embedding_service: Embedder to use (default: the configured model)
+        writers: Parallel vector-store writers (default: INDEX_WRITERS)
+        process_workers: Chunking processes (default: PROCESS_WORKERS)
+
+    Returns:
+        Report with 'files', 'patents', 'xml_mb', 'chunks', per-stage
+        'stages' (items, seconds, files/s, MB/s, peak RSS), the index
+        pipeline breakdown, near-duplicate savings and total seconds
+    """
+    # Not at module level: the parse process only needs the parser
+    from .index_benchmark import run_benchmark
+
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    parsed_path = workdir / 'parsed_docs.jsonl'
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        parse = pool.submit(_parse_stage, str(xml_dir), str(parsed_path), parse_workers, parse_batch_size).result()
+    files = parse['files']
+    xml_mb = parse['xml_bytes'] / 1e6
+    logger.info(f"Parsed {parse['patents']} patents from {files} XML files ({xml_mb:.1f} MB) "
+                f"in {parse['seconds']:.2f}s")
+
+    report = run_benchmark(
+        iter_patents(parsed_path),
+        workdir / 'index',
+        embedding_service=embedding_service,
+        writers=writers,
+        process_workers=process_workers
+    )
+
+    stages = [_rates({
+        'stage': 'parse',
+        'items': parse['patents'],
+        'seconds': round(parse['seconds'], 3),
+        'items_per_sec': round(parse['patents'] / parse['seconds'], 1) if parse['seconds'] else 0,
+        'peak_rss_mb': round(parse['peak_rss_mb'], 1),
+    }, files, xml_mb)]
+    stages += [_rates(stage, files, xml_mb) for stage in report['stages']]
+
+    return {
+        'files': files,
+        'patents': parse['patents'],
+        'failed': files - parse['patents'],
+        'xml_mb': round(xml_mb, 2),
+        'parse_workers': parse['workers'],
+        'process_workers': report['process_workers'],
+        'embedding_model': report['embedding_model'],
+        'chunks': report['chunks'],
+        'stages': stages,
+        'pipeline': report['pipeline'],
+        'duplicates': report['duplicates'],
+        'seconds': round(time.perf_counter() - started, 3),
+    }
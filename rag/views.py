@@ -8,12 +8,46 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .services.rag_engine import RAGEngine
-from .serializers import QuerySerializer, QueryResponseSerializer, HealthSerializer
+from .serializers import QueryFilterSerializer, QuerySerializer, QueryResponseSerializer, HealthSerializer
 
 logger = logging.getLogger(__name__)
 
 
+def _get_rag_engine():
+    """
+    Import and return the shared RAG engine on first use.
+
+    Kept out of module scope so URL resolution does not pull in the engine.
+    """
+    from .services.rag_engine import get_rag_engine
+    return get_rag_engine()
+
+
+def _form_filters(post) -> dict:
+    """
+    Section / year filters posted by the query form (blank fields are ignored).
+
+    Raises:
+        ValueError: If a filter is invalid
+    """
+    data = {}
+    sections = [section for section in post.getlist('sections') if section]
+    if sections:
+        data['sections'] = sections
+    for key in ('year_from', 'year_to'):
+        value = post.get(key, '').strip()
+        if value:
+            data[key] = value
+
+    serializer = QueryFilterSerializer(data=data)
+    if not serializer.is_valid():
+        raise ValueError('篩選條件無效: ' + '; '.join(
+            f"{key}: {' '.join(str(error) for error in errors)}"
+            for key, errors in serializer.errors.items()
+        ))
+    return serializer.filters()
+
+
 # ========== Template Views ==========
 
 def index_view(request):
@@ -29,21 +63,30 @@ def query_page_view(request):
     """
     if request.method == 'POST':
         question = request.POST.get('question', '').strip()
+        form = {
+            'sections': request.POST.getlist('sections'),
+            'year_from': request.POST.get('year_from', ''),
+            'year_to': request.POST.get('year_to', ''),
+        }
 
         if not question:
             return render(request, 'rag/index.html', {
-                'error': '請輸入問題'
+                'error': '請輸入問題',
+                'form': form
             })
 
         try:
-            # Initialize RAG engine
-            rag_engine = RAGEngine()
+            filters = _form_filters(request.POST)
+
+            # Get shared RAG engine
+            rag_engine = _get_rag_engine()
 
             # Process query
-            result = rag_engine.query(question)
+            result = rag_engine.query(question, filters=filters)
 
             return render(request, 'rag/index.html', {
                 'question': question,
+                'form': form,
                 'answer': result['answer'],
                 'sources': result['sources'],
                 'response_time_ms': result['response_time_ms']
@@ -53,6 +96,7 @@ def query_page_view(request):
             logger.error(f"ValueError in query: {e}")
             return render(request, 'rag/index.html', {
                 'question': question,
+                'form': form,
                 'error': str(e)
             })
 
@@ -60,6 +104,7 @@ def query_page_view(request):
             logger.error(f"Error processing query: {e}", exc_info=True)
             return render(request, 'rag/index.html', {
                 'question': question,
+                'form': form,
                 'error': '處理問題時發生錯誤，請稍後再試。'
             })
 
@@ -71,7 +116,7 @@ def health_page_view(request):
     Health check page.
     """
     try:
-        rag_engine = RAGEngine()
+        rag_engine = _get_rag_engine()
         stats = rag_engine.get_stats()
 
         return render(request, 'rag/health.html', {
@@ -97,6 +142,7 @@ def query_view(request):
 
     POST /api/query/
     Body: {"question": "請找出與AI相關的專利"}
+          optional filters: "sections": ["invention"], "year_from": 2020, "year_to": 2024
 
     Returns: {
         "answer": "...",
@@ -113,13 +159,14 @@ def query_view(request):
         )
 
     question = serializer.validated_data['question']
+    filters = serializer.filters()
 
     try:
-        # Initialize RAG engine
-        rag_engine = RAGEngine()
+        # Get shared RAG engine
+        rag_engine = _get_rag_engine()
 
         # Process query
-        result = rag_engine.query(question)
+        result = rag_engine.query(question, filters=filters)
 
         # Serialize response
         response_serializer = QueryResponseSerializer(data=result)
@@ -159,7 +206,7 @@ def health_view(request):
     }
     """
     try:
-        rag_engine = RAGEngine()
+        rag_engine = _get_rag_engine()
         stats = rag_engine.get_stats()
 
         health_data = {
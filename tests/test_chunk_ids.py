@@ -0,0 +1,71 @@
+"""
+Content-addressed chunk IDs (document_processor.chunk_id).
+"""
+from rag.services.document_processor import DocumentProcessor, chunk_id
+
+
+def make_patent(number, claims='一種裝置，包含一殼體。', **fields):
+    patent = {
+        'patent_number': number,
+        'title': f'專利 {number}',
+        'patent_type': 'invention',
+        'abstract': '本發明提供一種散熱裝置。' * 20,
+        'description': '【技術領域】本發明係關於一種散熱裝置。' * 60,
+        'claims': claims,
+        'url': f'https://example.test/{number}',
+    }
+    patent.update(fields)
+    return patent
+
+
+def ids(processor, patent):
+    return [chunk_id(chunk) for chunk in processor.process_document(patent)]
+
+
+def test_chunk_id_format():
+    chunk = {
+        'text': '一種裝置',
+        'metadata': {'patent_number': 'I123456', 'part': 'claims', 'chunk_index': 3},
+    }
+
+    key, part, index, digest = chunk_id(chunk).split(':')
+
+    assert (key, part, index) == ('I123456', 'claims', '3')
+    assert len(digest) == 16
+
+
+def test_chunk_ids_stable_across_runs():
+    first = ids(DocumentProcessor(chunk_size=200, chunk_overlap=20, workers=1), make_patent('I100001'))
+    second = ids(DocumentProcessor(chunk_size=200, chunk_overlap=20, workers=1), make_patent('I100001'))
+
+    assert first == second
+    assert len(set(first)) == len(first)
+
+
+def test_chunk_ids_do_not_depend_on_document_order():
+    processor = DocumentProcessor(chunk_size=200, chunk_overlap=20, workers=1, duplicate_threshold=0)
+    patents = [make_patent('I100001'), make_patent('I100002')]
+
+    forward = {chunk_id(chunk) for chunk in processor.iter_document_chunks(patents)}
+    backward = {chunk_id(chunk) for chunk in processor.iter_document_chunks(reversed(patents))}
+
+    assert forward == backward
+
+
+def test_edit_changes_only_the_edited_chunks():
+    processor = DocumentProcessor(chunk_size=200, chunk_overlap=20, workers=1)
+    before = ids(processor, make_patent('I100001'))
+    after = ids(processor, make_patent('I100001', claims='一種裝置，包含一殼體及一風扇。'))
+
+    changed = set(after) - set(before)
+
+    assert changed
+    assert all(':claims:' in item_id for item_id in changed)
+    assert set(before) - set(after) == {item_id for item_id in before if ':claims:' in item_id}
+
+
+def test_same_text_in_other_patent_gets_other_id():
+    chunk = {'text': '一種裝置', 'metadata': {'patent_number': 'I100001', 'part': 'claims', 'chunk_index': 0}}
+    other = {'text': '一種裝置', 'metadata': {'patent_number': 'I100002', 'part': 'claims', 'chunk_index': 0}}
+
+    assert chunk_id(chunk) != chunk_id(other)
@@ -0,0 +1,82 @@
+"""
+Chunk store reader and writer (rag.services.chunk_store).
+"""
+import pytest
+
+from rag.services.chunk_store import ChunkStoreReader, ChunkStoreWriter
+
+
+def make_chunks():
+    chunks = []
+    for number in ('I100001', 'I100002'):
+        for part, total in (('abstract', 2), ('claims', 3)):
+            for index in range(total):
+                chunks.append({
+                    'text': f'{number} {part} {index}',
+                    'metadata': {
+                        'patent_number': number,
+                        'part': part,
+                        'chunk_index': index,
+                        'total_chunks': total,
+                    },
+                })
+    chunks[3]['metadata']['duplicate_of'] = 'I100001:claims:0:0123456789abcdef'
+    return chunks
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / 'invention_chunks.jsonl'
+    with ChunkStoreWriter(path) as writer:
+        for chunk in make_chunks():
+            writer.write(chunk)
+    return path
+
+
+def test_round_trip(store):
+    reader = ChunkStoreReader(store)
+
+    assert list(reader) == make_chunks()
+    assert len(reader) == len(make_chunks())
+
+
+def test_random_access(store):
+    chunks = make_chunks()
+    reader = ChunkStoreReader(store)
+
+    assert reader[7] == chunks[7]
+    assert reader[0] == chunks[0]
+    assert reader[-1] == chunks[-1]
+    with pytest.raises(IndexError):
+        reader[len(chunks)]
+    reader.close()
+
+
+@pytest.mark.parametrize('first,count', [(0, 10), (0, 2), (1, 4), (3, 1), (4, 5), (9, 1), (5, 0)])
+def test_rows_across_groups(store, first, count):
+    reader = ChunkStoreReader(store)
+
+    assert reader.rows(first, count) == make_chunks()[first:first + count]
+    # Random access still works after a sequential range
+    assert reader[2] == make_chunks()[2]
+    reader.close()
+
+
+def test_rows_out_of_range(store):
+    reader = ChunkStoreReader(store)
+
+    with pytest.raises(IndexError):
+        reader.rows(8, 3)
+    reader.close()
+
+
+def test_reads_after_close(store):
+    chunks = make_chunks()
+    reader = ChunkStoreReader(store)
+    assert reader.rows(2, 3) == chunks[2:5]
+    reader.close()
+
+    # The group at row 2 is cached: the file must be reopened all the same
+    assert reader.rows(2, 3) == chunks[2:5]
+    assert reader[3] == chunks[3]
+    reader.close()
@@ -0,0 +1,148 @@
+"""
+Blue/green alias swaps (rag.services.collection_alias).
+"""
+import json
+
+import pytest
+
+from rag.services.collection_alias import CollectionAlias
+
+
+class FakeCollection:
+    def __init__(self, name, metadata=None):
+        self.name = name
+        self.metadata = metadata
+
+    def count(self):
+        return 0
+
+    def modify(self, metadata=None):
+        self.metadata = dict(metadata)
+
+
+class FakeChroma:
+    """The part of the ChromaDB client API the alias uses, in memory."""
+
+    def __init__(self, *names):
+        self.collections = {name: FakeCollection(name) for name in names}
+
+    def get_collection(self, name):
+        if name not in self.collections:
+            raise ValueError(f'Collection {name} does not exist.')
+        return self.collections[name]
+
+    def get_or_create_collection(self, name, metadata=None):
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(name, metadata)
+        return self.collections[name]
+
+    def list_collections(self):
+        return list(self.collections.values())
+
+    def delete_collection(self, name):
+        del self.collections[name]
+
+
+def shard_catalog(version, *shards):
+    return {
+        'shard_by': 'section',
+        'shards': json.dumps({f'{version}__{section}__all': {'section': section, 'year': 'all'}
+                              for section in shards}),
+    }
+
+
+@pytest.fixture
+def chroma():
+    chroma = FakeChroma('taiwan_patents', 'taiwan_patents__v1', 'taiwan_patents__v2',
+                        'taiwan_patents__v1__invention__all', 'taiwan_patents__v1__utility__all')
+    chroma.collections['taiwan_patents__v1'].metadata = shard_catalog(
+        'taiwan_patents__v1', 'invention', 'utility')
+    return chroma
+
+
+@pytest.fixture
+def alias(chroma):
+    return CollectionAlias(chroma, 'taiwan_patents')
+
+
+def test_legacy_index_is_the_default_target(alias):
+    assert alias.read() == {'target': 'taiwan_patents', 'building': '', 'retired': {}}
+
+
+def test_swap_points_at_new_version_and_retires_previous(alias):
+    alias.mark_building('taiwan_patents__v1')
+    assert alias.read()['building'] == 'taiwan_patents__v1'
+
+    assert alias.swap('taiwan_patents__v1') == 'taiwan_patents'
+
+    state = alias.read()
+    assert state['target'] == 'taiwan_patents__v1'
+    assert state['building'] == ''
+    assert list(state['retired']) == ['taiwan_patents']
+
+
+def test_pointer_is_shared_between_instances(chroma, alias):
+    alias.swap('taiwan_patents__v1')
+
+    assert CollectionAlias(chroma, 'taiwan_patents').read()['target'] == 'taiwan_patents__v1'
+
+
+def test_rollback_to_retired_version(alias):
+    alias.swap('taiwan_patents__v1')
+    alias.swap('taiwan_patents__v2')
+
+    assert alias.swap('taiwan_patents__v1') == 'taiwan_patents__v2'
+
+    state = alias.read()
+    assert state['target'] == 'taiwan_patents__v1'
+    assert set(state['retired']) == {'taiwan_patents', 'taiwan_patents__v2'}
+
+
+def test_garbage_collect_waits_for_grace_period(chroma, alias):
+    alias.swap('taiwan_patents__v1')
+    alias.swap('taiwan_patents__v2')
+
+    assert alias.garbage_collect(grace_seconds=3600) == []
+    assert 'taiwan_patents__v1' in chroma.collections
+
+
+def test_garbage_collect_deletes_version_and_its_shards(chroma, alias):
+    alias.swap('taiwan_patents__v1')
+    alias.swap('taiwan_patents__v2')
+
+    deleted = alias.garbage_collect(grace_seconds=0)
+
+    assert set(deleted) == {'taiwan_patents', 'taiwan_patents__v1'}
+    assert set(chroma.collections) == {'taiwan_patents__v2', 'taiwan_patents__alias'}
+    assert alias.read()['retired'] == {}
+
+
+def test_garbage_collect_keeps_rolled_back_target(chroma, alias):
+    alias.swap('taiwan_patents__v1')
+    alias.swap('taiwan_patents__v2')
+    alias.swap('taiwan_patents__v1')
+
+    alias.garbage_collect(grace_seconds=0)
+
+    assert 'taiwan_patents__v1' in chroma.collections
+    assert 'taiwan_patents__v2' not in chroma.collections
+    assert alias.read()['target'] == 'taiwan_patents__v1'
+
+
+def test_garbage_collect_deletes_shards_of_sharded_legacy_root():
+    # Legacy root built incrementally with a year-sharded catalog
+    chroma = FakeChroma('taiwan_patents', 'taiwan_patents__invention__2023',
+                        'taiwan_patents__utility__unknown', 'taiwan_patents__v1')
+    chroma.collections['taiwan_patents'].metadata = {
+        'shard_by': 'year',
+        'shards': json.dumps({
+            'taiwan_patents__invention__2023': {'section': 'invention', 'year': 2023},
+            'taiwan_patents__utility__unknown': {'section': 'utility', 'year': 'unknown'},
+        }),
+    }
+    alias = CollectionAlias(chroma, 'taiwan_patents')
+    alias.swap('taiwan_patents__v1')
+
+    assert alias.garbage_collect(grace_seconds=0) == ['taiwan_patents']
+
+    assert set(chroma.collections) == {'taiwan_patents__v1', 'taiwan_patents__alias'}
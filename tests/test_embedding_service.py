@@ -0,0 +1,77 @@
+"""
+EmbeddingService in client mode: falling back to the in-process model.
+"""
+import numpy as np
+import pytest
+
+from rag.services.embedding_service import EmbeddingService
+
+
+class DownClient:
+    """Embedding server client whose every request fails."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        raise ConnectionRefusedError('server down')
+
+    def health(self):
+        self.calls += 1
+        raise ConnectionRefusedError('server down')
+
+
+class FakeModel:
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False):
+        return np.ones((len(texts), 8), dtype=np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+
+@pytest.fixture
+def service(monkeypatch):
+    def load_model(self):
+        self.model = FakeModel()
+
+    monkeypatch.setattr(EmbeddingService, '_load_model', load_model)
+    service = EmbeddingService(model_name='test-model', server_url='http://127.0.0.1:9')
+    service.client = DownClient()
+    return service
+
+
+def test_dimension_falls_back_to_local_model(service, settings):
+    settings.EMBEDDING_SERVER_FALLBACK = True
+
+    assert service.get_embedding_dimension() == 8
+
+
+def test_server_not_retried_while_down(service, settings):
+    settings.EMBEDDING_SERVER_FALLBACK = True
+    settings.EMBEDDING_SERVER_RETRY_SECONDS = 60
+
+    service.embed_documents(['a', 'b'], show_progress_bar=False)
+    service.embed_text('c')
+
+    assert service.client.calls == 1
+
+
+def test_server_retried_after_retry_interval(service, settings):
+    settings.EMBEDDING_SERVER_FALLBACK = True
+    settings.EMBEDDING_SERVER_RETRY_SECONDS = 0
+
+    service.embed_text('a')
+    service.embed_text('b')
+
+    assert service.client.calls == 2
+
+
+def test_no_fallback_raises(service, settings):
+    settings.EMBEDDING_SERVER_FALLBACK = False
+
+    with pytest.raises(ConnectionRefusedError):
+        service.get_embedding_dimension()
+    with pytest.raises(ConnectionRefusedError):
+        service.embed_text('a')
+    assert service.model is None
@@ -0,0 +1,41 @@
+"""
+Cold-start import budget (see rag.services.import_budget).
+"""
+from django.conf import settings
+
+from rag.services.import_budget import HEAVY_MODULES, measure_startup, parse_importtime
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     _json\n"
+        "import time:       800 |        920 |   json\n"
+        "import time:        50 |        970 | rag.views\n"
+        "some other line\n"
+    )
+
+    entries = parse_importtime(stderr)
+
+    assert [(e['module'], e['depth']) for e in entries] == [('_json', 2), ('json', 1), ('rag.views', 0)]
+    assert entries[2]['self_us'] == 50
+    assert entries[2]['cumulative_us'] == 970
+
+
+def test_startup_imports_no_heavy_modules():
+    report = measure_startup()
+
+    assert report['heavy_modules'] == []
+
+
+def test_startup_within_budget():
+    report = measure_startup()
+
+    assert report['total_ms'] <= settings.IMPORT_TIME_BUDGET_MS, report['slowest']
+
+
+def test_heavy_module_is_reported():
+    report = measure_startup(['numpy'])
+
+    assert 'numpy' in HEAVY_MODULES
+    assert 'numpy' in report['heavy_modules']
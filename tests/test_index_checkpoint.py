@@ -0,0 +1,80 @@
+"""
+Index build checkpoints (rag.services.index_checkpoint).
+"""
+from rag.services.index_checkpoint import IndexCheckpoint
+
+FINGERPRINT = {'file': 'invention_chunks.jsonl', 'size': 1234, 'mtime_ns': 1, 'batch_size': 100}
+
+
+def checkpoint(tmp_path, **fingerprint):
+    return IndexCheckpoint('taiwan_patents', 'invention', dict(FINGERPRINT, **fingerprint), tmp_path)
+
+
+def test_resume_completed_batches(tmp_path):
+    first = checkpoint(tmp_path)
+    assert first.open(resume=True) == set()
+    for batch in (0, 1, 3):
+        first.record(batch)
+    first.close()
+
+    assert checkpoint(tmp_path).open(resume=True) == {0, 1, 3}
+
+
+def test_no_resume_starts_over(tmp_path):
+    first = checkpoint(tmp_path)
+    first.open(resume=True)
+    first.record(0)
+    first.close()
+
+    assert checkpoint(tmp_path).open(resume=False) == set()
+    assert checkpoint(tmp_path).open(resume=True) == set()
+
+
+def test_changed_input_is_ignored(tmp_path):
+    first = checkpoint(tmp_path)
+    first.open(resume=True)
+    first.record(0)
+    first.close()
+
+    assert checkpoint(tmp_path, size=4321).open(resume=True) == set()
+
+
+def test_resume_after_torn_write(tmp_path):
+    first = checkpoint(tmp_path)
+    first.open(resume=True)
+    first.record(11)
+    first.close()
+    # Crash in the middle of writing "12\n"
+    with open(first.path, 'a', encoding='utf-8') as f:
+        f.write('12')
+
+    second = checkpoint(tmp_path)
+    assert second.open(resume=True) == {11}
+    second.record(13)
+    second.close()
+
+    assert checkpoint(tmp_path).open(resume=True) == {11, 13}
+    assert first.path.read_text(encoding='utf-8').splitlines()[1:] == ['11', '13']
+
+
+def test_torn_header_is_ignored(tmp_path):
+    first = checkpoint(tmp_path)
+    first.open(resume=True)
+    first.close()
+    first.path.write_text(first.path.read_text(encoding='utf-8').rstrip('\n'), encoding='utf-8')
+
+    second = checkpoint(tmp_path)
+    assert second.open(resume=True) == set()
+    second.record(0)
+    second.close()
+
+    assert checkpoint(tmp_path).open(resume=True) == {0}
+
+
+def test_complete_removes_log(tmp_path):
+    first = checkpoint(tmp_path)
+    first.open(resume=True)
+    first.record(0)
+    first.complete()
+
+    assert not first.path.exists()
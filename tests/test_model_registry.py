@@ -0,0 +1,100 @@
+"""
+Pinned model registry (rag.services.model_registry) and offline model loading.
+"""
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from rag.services.embedding_service import EmbeddingService
+from rag.services.model_registry import REGISTRY_FILE, ModelNotAvailable, ModelRegistry
+
+SHA = '0123456789abcdef0123456789abcdef01234567'
+
+
+@pytest.fixture
+def registry(settings, tmp_path):
+    settings.MODEL_REGISTRY_DIR = tmp_path / 'models'
+    snapshot = settings.MODEL_REGISTRY_DIR / 'all-MiniLM-L6-v2' / SHA
+    snapshot.mkdir(parents=True)
+    (snapshot / 'modules.json').write_text('[]', encoding='utf-8')
+    (settings.MODEL_REGISTRY_DIR / REGISTRY_FILE).write_text(json.dumps({
+        'all-MiniLM-L6-v2': {
+            'repo_id': 'sentence-transformers/all-MiniLM-L6-v2',
+            'revision': SHA,
+            'path': f'all-MiniLM-L6-v2/{SHA}',
+        },
+    }), encoding='utf-8')
+    return ModelRegistry()
+
+
+def test_resolve_returns_pinned_snapshot(registry):
+    assert registry.resolve('all-MiniLM-L6-v2') == registry.root / 'all-MiniLM-L6-v2' / SHA
+
+
+def test_resolve_unknown_model(registry):
+    with pytest.raises(ModelNotAvailable, match='download_models all-mpnet-base-v2'):
+        registry.resolve('all-mpnet-base-v2')
+
+
+def test_resolve_registered_but_missing_snapshot(registry):
+    (registry.root / 'all-MiniLM-L6-v2' / SHA / 'modules.json').unlink()
+
+    with pytest.raises(ModelNotAvailable):
+        registry.resolve('all-MiniLM-L6-v2')
+
+
+def test_resolve_without_registry(settings, tmp_path):
+    settings.MODEL_REGISTRY_DIR = tmp_path / 'empty'
+
+    with pytest.raises(ModelNotAvailable, match='not in the local registry'):
+        ModelRegistry().resolve('all-MiniLM-L6-v2')
+
+
+def test_offline_missing_model_is_an_error(registry, settings):
+    settings.MODEL_OFFLINE = True
+
+    with pytest.raises(ModelNotAvailable, match='download_models all-mpnet-base-v2'):
+        EmbeddingService._resolve_model_path('all-mpnet-base-v2')
+
+
+def test_online_missing_model_falls_back_to_hub_name(registry, settings):
+    settings.MODEL_OFFLINE = False
+
+    assert EmbeddingService._resolve_model_path('all-mpnet-base-v2') == 'all-mpnet-base-v2'
+
+
+@pytest.fixture
+def loaded(monkeypatch):
+    """Arguments SentenceTransformer is constructed with."""
+    calls = []
+
+    class SentenceTransformer:
+        def __init__(self, *args, **kwargs):
+            calls.append((args, kwargs))
+
+    module = types.ModuleType('sentence_transformers')
+    module.SentenceTransformer = SentenceTransformer
+    monkeypatch.setitem(sys.modules, 'sentence_transformers', module)
+    monkeypatch.setattr('rag.services.embedding_service.attach_mmap_weights', lambda model, path: False)
+    return calls
+
+
+def test_registry_model_is_loaded_from_local_files_only(registry, loaded):
+    EmbeddingService(model_name='all-MiniLM-L6-v2', server_url='')
+
+    (args, kwargs), = loaded
+    assert Path(args[0]) == registry.root / 'all-MiniLM-L6-v2' / SHA
+    assert kwargs['local_files_only'] is True
+
+
+def test_hub_model_may_be_downloaded(registry, settings, loaded):
+    settings.MODEL_OFFLINE = False
+
+    EmbeddingService(model_name='all-mpnet-base-v2', server_url='')
+
+    (args, kwargs), = loaded
+    assert args[0] == 'all-mpnet-base-v2'
+    assert kwargs['local_files_only'] is False
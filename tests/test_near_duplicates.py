@@ -0,0 +1,76 @@
+"""
+Near-duplicate detection (rag.services.near_duplicates).
+"""
+from rag.services.near_duplicates import NearDuplicateDetector
+
+OTHER = '一種具有溫度感測器之電池模組，包含電池芯、導熱片與控制電路，' * 3
+BOILERPLATE = (
+    '第1圖係本發明一實施例之散熱裝置的立體示意圖。第2圖係第1圖之散熱裝置的分解示意圖。'
+    '第3圖係第1圖之散熱裝置沿剖面線的剖面示意圖。【主要元件符號說明】10散熱裝置 11殼體 12風扇'
+)
+
+
+def variant(suffix):
+    return BOILERPLATE + suffix
+
+
+def test_near_identical_text_is_a_duplicate():
+    detector = NearDuplicateDetector()
+
+    assert detector.add(variant('。'), 'a') is None
+    assert detector.add(variant('；'), 'b') == 'a'
+    assert detector.report()['duplicates'] == 1
+
+
+def test_different_and_short_texts_are_not_duplicates():
+    detector = NearDuplicateDetector()
+
+    assert detector.add(BOILERPLATE, 'a') is None
+    assert detector.add(OTHER, 'b') is None
+    assert detector.add('短文字', 'c') is None
+    assert detector.add('短文字', 'd') is None
+
+
+def test_discarded_representative_is_not_matched():
+    detector = NearDuplicateDetector()
+    detector.add(variant('。'), 'a')
+
+    detector.discard(['a'])
+
+    assert detector.add(variant('；'), 'b') is None
+
+
+def test_later_representative_takes_over_discarded_buckets():
+    detector = NearDuplicateDetector()
+    detector.add(variant('。'), 'a')
+    detector.discard(['a'])
+    detector.add(variant('；'), 'b')
+
+    assert detector.add(variant('，'), 'c') == 'b'
+    assert detector.report()['representatives'] == 1
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / 'invention_duplicates.npz'
+    first = NearDuplicateDetector()
+    first.add(variant('。'), 'a')
+    first.add(OTHER, 'b')
+    first.discard(['b'])
+    first.save(path, token='run-1')
+
+    second = NearDuplicateDetector()
+    assert not second.load(path, token='run-2')
+    assert second.load(path, token='run-1')
+    assert second.add(variant('；'), 'c') == 'a'
+    assert second.add(OTHER, 'd') is None
+    # A restored representative is not a duplicate of itself
+    assert second.add(variant('。'), 'a') is None
+
+
+def test_load_rejects_other_settings(tmp_path):
+    path = tmp_path / 'invention_duplicates.npz'
+    first = NearDuplicateDetector()
+    first.add(BOILERPLATE, 'a')
+    first.save(path)
+
+    assert not NearDuplicateDetector(threshold=0.8).load(path)
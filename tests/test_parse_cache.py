@@ -0,0 +1,129 @@
+"""
+Parse cache (rag.services.parse_cache): reuse and invalidation.
+"""
+import os
+import zipfile
+
+import pytest
+
+from rag.services.parse_cache import ParseCache
+from rag.services.period_archive import split_member_path
+from rag.services.synthetic_xml import generate_corpus
+from rag.services.tipo_xml_parser import PARSER_VERSION, TIPOXMLParser
+
+
+class CountingParser(TIPOXMLParser):
+    """Parser that records which files it actually parsed."""
+
+    def __init__(self, cache):
+        super().__init__(workers=1, cache=cache)
+        self.parsed = []
+
+    def parse_patent_xml(self, xml_file, f=None):
+        self.parsed.append(xml_file)
+        return super().parse_patent_xml(xml_file, f)
+
+
+def run(directory, cache_path, version=PARSER_VERSION):
+    cache = ParseCache(cache_path, version)
+    parser = CountingParser(cache)
+    patents = list(parser.iter_directory(str(directory)))
+    cache.close()
+    return patents, parser.parsed
+
+
+def touch(path, seconds=10):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10 ** 9))
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    directory = tmp_path / 'xml'
+    generate_corpus(directory, files=6, seed=3, period_size=3)
+    return directory
+
+
+@pytest.fixture
+def archives(tmp_path):
+    directory = tmp_path / 'archives'
+    generate_corpus(directory, files=6, seed=3, period_size=3, archive=True)
+    return directory
+
+
+def test_second_run_is_served_from_cache(corpus, tmp_path):
+    first, parsed = run(corpus, tmp_path / 'cache.sqlite3')
+    assert len(parsed) == 6
+
+    second, parsed = run(corpus, tmp_path / 'cache.sqlite3')
+
+    assert parsed == []
+    assert second == first
+
+
+def test_modified_file_is_parsed_again(corpus, tmp_path):
+    first, _ = run(corpus, tmp_path / 'cache.sqlite3')
+    xml_file = sorted(corpus.rglob('*.xml'))[1]
+    text = xml_file.read_text(encoding='utf-8')
+    xml_file.write_text(text.replace(first[1]['title'], '更新後的專利名稱'), encoding='utf-8')
+    touch(xml_file)
+
+    second, parsed = run(corpus, tmp_path / 'cache.sqlite3')
+
+    assert parsed == [str(xml_file)]
+    assert second[1]['title'] == '更新後的專利名稱'
+    assert second[0] == first[0]
+
+
+def test_parser_version_change_invalidates_everything(corpus, tmp_path):
+    run(corpus, tmp_path / 'cache.sqlite3')
+
+    _, parsed = run(corpus, tmp_path / 'cache.sqlite3', version=PARSER_VERSION + 1)
+
+    assert len(parsed) == 6
+
+
+def test_deleted_files_are_pruned(corpus, tmp_path):
+    run(corpus, tmp_path / 'cache.sqlite3')
+    sorted(corpus.rglob('*.xml'))[0].unlink()
+
+    run(corpus, tmp_path / 'cache.sqlite3')
+
+    cache = ParseCache(tmp_path / 'cache.sqlite3', PARSER_VERSION)
+    rows = cache._db.execute('SELECT COUNT(*) FROM parsed').fetchone()[0]
+    cache.close()
+    assert rows == 5
+
+
+def test_archive_members_are_cached(archives, tmp_path):
+    first, parsed = run(archives, tmp_path / 'cache.sqlite3')
+    assert len(parsed) == 6
+    assert all(split_member_path(path) for path in parsed)
+
+    second, parsed = run(archives, tmp_path / 'cache.sqlite3')
+
+    assert parsed == []
+    assert second == first
+
+
+def test_changed_archive_invalidates_its_members(archives, tmp_path):
+    first, _ = run(archives, tmp_path / 'cache.sqlite3')
+    archive = sorted(archives.rglob('*.zip'))[0]
+
+    # Replace one member's content: the whole archive is a new file
+    rewritten = archive.with_name('rewritten.zip')
+    with zipfile.ZipFile(archive) as source, zipfile.ZipFile(rewritten, 'w') as target:
+        names = [name for name in source.namelist() if name.endswith('.xml') and 'index' not in name]
+        for info in source.infolist():
+            data = source.read(info)
+            if info.filename == names[0]:
+                data = data.decode('utf-8').replace(first[0]['title'], '更新後的專利名稱').encode('utf-8')
+            target.writestr(info, data)
+    os.replace(rewritten, archive)
+    touch(archive)
+
+    second, parsed = run(archives, tmp_path / 'cache.sqlite3')
+
+    assert sorted(split_member_path(path)[0] for path in parsed) == [str(archive)] * 3
+    assert second[0]['title'] == '更新後的專利名稱'
+    assert second[3:] == first[3:]
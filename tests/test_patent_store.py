@@ -0,0 +1,83 @@
+"""
+Patent and chunk text store (rag.services.patent_store).
+"""
+import pytest
+
+from rag.models import Patent, PatentChunk
+from rag.services import patent_store
+
+
+@pytest.fixture(autouse=True)
+def enable_db(db):
+    pass
+
+
+def make_chunk(number, index, text='', title='散熱裝置', duplicate_of=''):
+    return {
+        'text': text or f'{number} 第{index}段',
+        'metadata': {
+            'patent_number': number,
+            'title': title,
+            'applicant': '範例科技股份有限公司',
+            'publication_date': '2023-07-15',
+            'section': 'invention',
+            'part': 'claims',
+            'heading': '申請專利範圍',
+            'chunk_index': index,
+            'total_chunks': 2,
+            'duplicate_of': duplicate_of,
+        },
+    }
+
+
+def save(*chunks, section='invention'):
+    ids = [f"{chunk['metadata']['patent_number']}:claims:{chunk['metadata']['chunk_index']}"
+           for chunk in chunks]
+    patent_store.save_chunks(ids, list(chunks), section)
+    return ids
+
+
+def test_upsert_updates_patent_and_chunk():
+    save(make_chunk('I100001', 0), make_chunk('I100001', 1))
+
+    save(make_chunk('I100001', 0, text='更新後的內容', title='改良式散熱裝置'))
+
+    patent = Patent.objects.get(key='I100001')
+    assert patent.title == '改良式散熱裝置'
+    assert PatentChunk.objects.get(chunk_id='I100001:claims:0').text == '更新後的內容'
+    assert PatentChunk.objects.filter(patent=patent).count() == 2
+
+
+def test_hydrate_merges_patent_and_chunk_fields():
+    representative, = save(make_chunk('I100001', 0))
+    save(make_chunk('I100002', 0, duplicate_of=representative))
+
+    hydrated = patent_store.hydrate([representative, 'I999999:claims:0'])
+
+    assert list(hydrated) == [representative]
+    assert hydrated[representative]['text'] == 'I100001 第0段'
+    metadata = hydrated[representative]['metadata']
+    assert metadata['patent_number'] == 'I100001'
+    assert metadata['applicant'] == '範例科技股份有限公司'
+    assert metadata['heading'] == '申請專利範圍'
+    assert metadata['chunk_index'] == 0
+    assert metadata['duplicate_patents'] == ['I100002']
+
+
+def test_delete_chunks_removes_orphaned_patents_only():
+    first, second = save(make_chunk('I100001', 0), make_chunk('I100001', 1))
+    other, = save(make_chunk('I100002', 0))
+
+    patent_store.delete_chunks([first, other])
+
+    assert set(PatentChunk.objects.values_list('chunk_id', flat=True)) == {second}
+    assert set(Patent.objects.values_list('key', flat=True)) == {'I100001'}
+
+
+def test_prune_section_keeps_keep_ids():
+    kept, stale = save(make_chunk('I100001', 0), make_chunk('I100001', 1))
+    other_section, = save(make_chunk('M200001', 0), section='utility')
+
+    assert patent_store.prune_section('invention', {kept}) == 1
+
+    assert set(PatentChunk.objects.values_list('chunk_id', flat=True)) == {kept, other_section}
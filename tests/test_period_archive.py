@@ -0,0 +1,204 @@
+"""
+Reading patent XML straight out of period archives (rag.services.period_archive).
+"""
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+
+from rag.services.period_archive import (
+    PeriodArchive, is_archive, is_patent_xml, list_archive, member_path, open_source,
+    split_member_path, total_size
+)
+from rag.services.tipo_xml_parser import TIPOXMLParser
+
+SAMPLE_DIR = Path(settings.BASE_DIR) / 'data' / 'test_patent_downloads' / '111' / 'vol49_iss36'
+SAMPLES = {path.name: path.read_bytes() for path in sorted(SAMPLE_DIR.glob('*.xml'))}
+
+
+def index_xml(file_names):
+    patents = ''.join(
+        f'<Patent><FileName>{name}</FileName></Patent>' for name in file_names
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><Index>{patents}</Index>'.encode('utf-8')
+
+
+def period_members(index=None):
+    """(name, data) of a period: patent XML, an image, the DTD and optionally index.xml."""
+    members = [(f'period/{name}', data) for name, data in SAMPLES.items()]
+    members.insert(1, ('period/images/figure1.png', b'\x89PNG fake image'))
+    members.append(('period/patent.dtd', b'<!ELEMENT Patent ANY>'))
+    if index is not None:
+        members.insert(0, ('period/index.xml', index_xml(index)))
+    return members
+
+
+def write_zip(path, members):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return str(path)
+
+
+def write_tar(path, members):
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+@pytest.fixture(params=['zip', 'tar'])
+def write_archive(request, tmp_path):
+    def write(members, name='vol49_iss36'):
+        if request.param == 'zip':
+            return write_zip(tmp_path / f'{name}.zip', members)
+        return write_tar(tmp_path / f'{name}.tar.gz', members)
+    return write
+
+
+def test_names():
+    assert is_archive('/data/111/vol49_iss36.ZIP')
+    assert is_archive('vol49_iss36.tar.gz')
+    assert not is_archive('105106830.xml')
+    assert is_patent_xml('period/105106830.xml')
+    assert not is_patent_xml('period/index.xml')
+    assert not is_patent_xml('period/patent.dtd')
+
+    path = member_path('/data/vol49_iss36.zip', 'period/105106830.xml')
+    assert path == '/data/vol49_iss36.zip!/period/105106830.xml'
+    assert split_member_path(path) == ('/data/vol49_iss36.zip', 'period/105106830.xml')
+    assert split_member_path('/data/105106830.xml') is None
+
+
+def test_members_without_index(write_archive):
+    archive = write_archive(period_members())
+
+    with PeriodArchive(archive) as period:
+        assert period.members() == [f'period/{name}' for name in SAMPLES]
+
+
+def test_index_selects_members(write_archive):
+    # Entries may come without .xml and with Windows separators
+    listed = [name[:-len('.xml')] for name in list(SAMPLES)[:2]]
+    archive = write_archive(period_members(index=['folder\\' + listed[0], listed[1]]))
+
+    with PeriodArchive(archive) as period:
+        assert period.members() == [f'period/{name}.xml' for name in listed]
+
+
+def test_index_without_matches_falls_back_to_all_xml(write_archive):
+    archive = write_archive(period_members(index=['999999999']))
+
+    assert list_archive(archive) == [member_path(archive, f'period/{name}') for name in SAMPLES]
+
+
+def test_unreadable_index_falls_back_to_all_xml(write_archive):
+    members = [('period/index.xml', b'<Index><Patent>')] + period_members()
+    archive = write_archive(members)
+
+    assert len(list_archive(archive)) == len(SAMPLES)
+
+
+def test_iter_members_in_order_with_missing(write_archive):
+    archive = write_archive(period_members())
+    names = [f'period/{name}' for name in SAMPLES]
+    wanted = [names[0], 'period/missing.xml', names[2]]
+
+    with PeriodArchive(archive) as period:
+        read = [(name, f.read() if f is not None else None) for name, f in period.iter_members(wanted)]
+
+    assert read[0] == (names[0], SAMPLES[names[0].split('/')[-1]])
+    assert read[1][0] == 'period/missing.xml'
+    if archive.endswith('.zip'):
+        # Zip lookups are by name: a missing member does not stop the rest
+        assert read[1][1] is None
+        assert read[2] == (names[2], SAMPLES[names[2].split('/')[-1]])
+    else:
+        # A tar is read forward once: names after a missing one are not found
+        assert read[1:] == [('period/missing.xml', None), (names[2], None)]
+
+
+def test_open_source_and_sizes(write_archive, tmp_path):
+    archive = write_archive(period_members())
+    name = next(iter(SAMPLES))
+    plain = tmp_path / name
+    plain.write_bytes(SAMPLES[name])
+
+    with open_source(member_path(archive, f'period/{name}')) as f:
+        assert f.read() == SAMPLES[name]
+    with open_source(str(plain)) as f:
+        assert f.read() == SAMPLES[name]
+    with pytest.raises(FileNotFoundError):
+        with open_source(member_path(archive, 'period/missing.xml')):
+            pass
+
+    paths = list_archive(archive) + [str(plain)]
+    assert total_size(paths) == sum(len(data) for data in SAMPLES.values()) + len(SAMPLES[name])
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parse_archive_like_plain_files(tmp_path, workers):
+    write_zip(tmp_path / 'vol49_iss36.zip', period_members(index=list(SAMPLES)))
+    write_tar(tmp_path / 'vol49_iss37.tar.gz', period_members())
+    parser = TIPOXMLParser(workers=workers, batch_size=2)
+    expected = [parser.parse_patent_xml(str(SAMPLE_DIR / name)) for name in SAMPLES]
+
+    xml_files = parser.find_xml_files(str(tmp_path))
+    patents = list(parser.iter_parsed(xml_files))
+
+    assert len(xml_files) == 2 * len(SAMPLES)
+    for patent, xml_file in zip(patents, xml_files):
+        assert patent['url'] == f'file://{xml_file}'
+    strip = [{key: value for key, value in patent.items() if key != 'url'} for patent in patents]
+    plain = [{key: value for key, value in patent.items() if key != 'url'} for patent in expected]
+    assert strip == plain * 2
+
+
+@pytest.fixture
+def tar_opens(monkeypatch):
+    """Archive paths tarfile.open is called with (spools are opened by fileobj)."""
+    opened = []
+    open_tar = tarfile.open
+
+    def counting_open(name=None, *args, **kwargs):
+        if name is not None:
+            opened.append(str(name))
+        return open_tar(name, *args, **kwargs)
+
+    monkeypatch.setattr(tarfile, 'open', counting_open)
+    return opened
+
+
+def test_spool_is_read_instead_of_the_archive(tmp_path, tar_opens):
+    archive = write_tar(tmp_path / 'vol49_iss36.tar.gz', period_members(index=list(SAMPLES)[1:]))
+    tar_opens.clear()
+    spool = io.BytesIO()
+
+    with PeriodArchive(archive) as period:
+        assert period.compressed
+        names = period.members(spool)
+    with PeriodArchive(archive, spool=spool) as period:
+        read = [(name, f.read()) for name, f in period.iter_members(names)]
+
+    assert read == [(f'period/{name}', SAMPLES[name]) for name in list(SAMPLES)[1:]]
+    assert tar_opens == [archive]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_compressed_tar_is_decompressed_once(tmp_path, tar_opens, workers):
+    archive = write_tar(tmp_path / 'vol49_iss36.tar.gz', period_members())
+    tar_opens.clear()
+    parser = TIPOXMLParser(workers=workers, batch_size=2)
+
+    patents = list(parser.iter_directory(str(tmp_path)))
+
+    assert [patent['url'] for patent in patents] == [
+        f'file://{member_path(archive, f"period/{name}")}' for name in SAMPLES
+    ]
+    assert tar_opens == [archive]
+    assert parser._spools == {}
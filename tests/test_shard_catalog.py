@@ -0,0 +1,121 @@
+"""
+Shard routing and pruning (rag.services.shard_catalog).
+"""
+import pytest
+
+from rag.services.shard_catalog import ShardCatalog, publication_year
+
+VERSION = 'taiwan_patents__v20250101120000'
+
+
+class FakeCollection:
+    def __init__(self, name, metadata=None, count=0):
+        self.name = name
+        self.metadata = metadata
+        self._count = count
+
+    def count(self):
+        return self._count
+
+    def modify(self, metadata=None):
+        self.metadata = dict(metadata)
+
+
+class FakeChroma:
+    def __init__(self):
+        self.collections = {}
+
+    def get_or_create_collection(self, name):
+        return self.collections.setdefault(name, FakeCollection(name))
+
+
+def catalog(shard_by, chunks=()):
+    catalog = ShardCatalog(FakeChroma(), FakeCollection(VERSION))
+    catalog.initialize(shard_by)
+    for metadata in chunks:
+        catalog.shard_for(dict(metadata, year=publication_year(metadata)))
+    return catalog
+
+
+CHUNKS = [
+    {'section': 'invention', 'publication_date': '2021-03-01'},
+    {'section': 'invention', 'publication_date': '2023/07/15'},
+    {'section': 'utility', 'publication_date': '112/01/10'},   # ROC year 112 = 2023
+    {'section': 'design', 'publication_date': ''},
+]
+
+
+@pytest.mark.parametrize('metadata,year', [
+    ({'publication_date': '2023-07-15'}, 2023),
+    ({'publication_date': '20230715'}, 2023),
+    ({'publication_date': '112/07/15'}, 2023),
+    ({'publication_date': '', 'application_date': '99.12.31'}, 2010),
+    ({'publication_date': 'unknown'}, None),
+    ({}, None),
+])
+def test_publication_year(metadata, year):
+    assert publication_year(metadata) == year
+
+
+def test_shards_by_section_and_year():
+    shards = catalog('year', CHUNKS).shards
+
+    assert sorted(shards) == [
+        f'{VERSION}__design__unknown',
+        f'{VERSION}__invention__2021',
+        f'{VERSION}__invention__2023',
+        f'{VERSION}__utility__2023',
+    ]
+
+
+def test_catalog_is_saved_in_root_metadata():
+    first = catalog('year', CHUNKS)
+
+    reopened = ShardCatalog(first.chroma_client, first.root)
+
+    assert reopened.shard_by == 'year'
+    assert reopened.shards == first.shards
+
+
+def test_select_prunes_by_section():
+    selected = catalog('year', CHUNKS).select(sections=['invention'])
+
+    assert selected == [f'{VERSION}__invention__2021', f'{VERSION}__invention__2023']
+
+
+def test_select_prunes_by_year_keeping_unknown():
+    selected = catalog('year', CHUNKS).select(year_from=2022, year_to=2023)
+
+    assert selected == [
+        f'{VERSION}__design__unknown',
+        f'{VERSION}__invention__2023',
+        f'{VERSION}__utility__2023',
+    ]
+
+
+def test_select_by_section_and_year():
+    shards = catalog('year', CHUNKS)
+
+    assert shards.select(sections=['utility'], year_to=2022) == []
+    assert shards.select(sections=['invention'], year_to=2021) == [f'{VERSION}__invention__2021']
+
+
+def test_section_sharding_ignores_years():
+    shards = catalog('section', CHUNKS)
+
+    assert shards.select(year_from=2030) == sorted(shards.shards)
+    assert shards.select(sections=['design']) == [f'{VERSION}__design__all']
+
+
+def test_legacy_unsharded_index_is_one_shard():
+    legacy = ShardCatalog(FakeChroma(), FakeCollection(VERSION, count=10))
+
+    assert legacy.select(sections=['utility'], year_from=2020) == [VERSION]
+    assert legacy.shard_for({'section': 'utility'}) == VERSION
+
+
+def test_unsafe_section_names_stay_distinct():
+    shards = catalog('section', [{'section': '發明'}, {'section': '新型'}]).shards
+
+    assert len(shards) == 2
+    assert all(name.isascii() for name in shards)
@@ -0,0 +1,98 @@
+"""
+Chinese-aware text splitter (rag.services.text_splitter).
+"""
+import random
+
+import pytest
+
+from rag.services.synthetic_xml import paragraph
+from rag.services.text_splitter import PatentTextSplitter
+
+# Characters a cut or an overlap start can follow
+BOUNDARY_ENDS = '。！？!?」』）)；;：:，,、】\n'
+
+
+def numbered_sentences(count):
+    """Text of distinct sentences, so every chunk has one position in it."""
+    return ''.join(f'第{n}項元件設置於基板上，且電性連接至控制單元；藉此提升效率。' for n in range(count))
+
+
+def positions(text, chunks):
+    """Start offset of each chunk in text."""
+    starts = []
+    for chunk in chunks:
+        start = text.find(chunk, starts[-1] + 1 if starts else 0)
+        assert start >= 0, chunk
+        starts.append(start)
+    return starts
+
+
+@pytest.mark.parametrize('chunk_size,chunk_overlap', [(100, 20), (300, 50), (1000, 100)])
+def test_no_chunk_exceeds_chunk_size(chunk_size, chunk_overlap):
+    rng = random.Random(5)
+    text = ''.join(paragraph(rng, n, 10) for n in range(1, 40))
+
+    chunks = PatentTextSplitter(chunk_size, chunk_overlap).split_text(text)
+
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) <= chunk_size
+
+
+@pytest.mark.parametrize('text,first', [
+    # Paragraph marks win over later sentence, clause and phrase ends
+    ('甲' * 22 + '【0002】乙乙。乙乙；乙乙，' + '丙' * 100, '甲' * 22),
+    ('甲' * 22 + '。乙乙乙；乙乙乙，' + '丙' * 100, '甲' * 22 + '。'),
+    ('甲' * 22 + '；乙乙乙，乙乙乙' + '丙' * 100, '甲' * 22 + '；'),
+    ('甲' * 22 + '，' + '丙' * 100, '甲' * 22 + '，'),
+])
+def test_cuts_at_strongest_boundary(text, first):
+    chunks = PatentTextSplitter(chunk_size=40, chunk_overlap=0).split_text(text)
+
+    assert chunks[0] == first
+
+
+def test_overlap_is_bounded_and_starts_at_a_boundary():
+    text = numbered_sentences(60)
+    splitter = PatentTextSplitter(chunk_size=200, chunk_overlap=40)
+
+    chunks = splitter.split_text(text)
+    starts = positions(text, chunks)
+
+    assert len(chunks) > 3
+    for previous, start, chunk in zip(starts, starts[1:], chunks):
+        overlap = previous + len(chunk) - start
+        assert 0 < overlap <= splitter.chunk_overlap
+        # Every 40-character window of this text holds a boundary
+        assert text[start - 1] in BOUNDARY_ENDS
+
+
+def test_text_without_boundaries_is_hard_cut():
+    text = ''.join(chr(0x4e00 + n) for n in range(250))
+
+    chunks = PatentTextSplitter(chunk_size=100, chunk_overlap=10).split_text(text)
+
+    assert chunks == [text[0:100], text[90:190], text[180:]]
+
+
+@pytest.mark.parametrize('text', ['', '   ', '\n　\t\n', ' ' * 3000, '\n' * 3000])
+def test_empty_and_whitespace_only_text(text):
+    assert PatentTextSplitter(chunk_size=100, chunk_overlap=10).split_text(text) == []
+
+
+def test_short_text_is_one_stripped_chunk():
+    assert PatentTextSplitter(chunk_size=100, chunk_overlap=10).split_text('  散熱裝置。\n') == ['散熱裝置。']
+
+
+def test_zero_overlap_partitions_the_text():
+    text = numbered_sentences(40)
+
+    chunks = PatentTextSplitter(chunk_size=150, chunk_overlap=0).split_text(text)
+
+    assert ''.join(chunks) == text
+    assert all(chunk[-1] in BOUNDARY_ENDS for chunk in chunks)
+
+
+@pytest.mark.parametrize('chunk_size,chunk_overlap', [(100, 100), (100, 150)])
+def test_overlap_must_be_smaller_than_chunk_size(chunk_size, chunk_overlap):
+    with pytest.raises(ValueError):
+        PatentTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
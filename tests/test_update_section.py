@@ -0,0 +1,142 @@
+"""
+Incremental processing (DocumentProcessor.update_section): manifest reuse,
+change log and tombstones.
+"""
+import json
+
+import pytest
+
+from rag.services.chunk_store import iter_chunks, source_fingerprint
+from rag.services.docs_store import PatentWriter, docs_path
+from rag.services.document_processor import DocumentProcessor, chunk_id
+from rag.services.processing_manifest import ChangeLog
+
+SUBJECTS = {
+    'I100001': '散熱裝置，包含一殼體、一風扇及一熱管，熱管連接殼體與風扇',
+    'I100002': '電池模組，包含複數電池芯、一導熱片及一溫度感測器',
+    'I100003': '顯示面板，包含一基板、一發光層及一封裝層',
+    'I100004': '無線充電座，包含一線圈、一磁性件及一控制電路',
+}
+
+
+def make_patent(number, claims_suffix=''):
+    subject = SUBJECTS[number]
+    return {
+        'patent_number': number,
+        'title': subject.split('，')[0],
+        'patent_type': 'invention',
+        'abstract': f'本發明提供一種{subject}。',
+        'description': f'【技術領域】本發明係關於一種{subject}。' * 8,
+        'claims': f'1. 一種{subject}。{claims_suffix}',
+        'publication_date': '2023-07-15',
+    }
+
+
+@pytest.fixture
+def dirs(settings, tmp_path):
+    settings.RAW_DATA_DIR = tmp_path / 'raw'
+    settings.PROCESSED_DATA_DIR = tmp_path / 'processed'
+    settings.PATENTS_COMPRESSION = ''
+    settings.RAW_DATA_DIR.mkdir()
+    settings.PROCESSED_DATA_DIR.mkdir()
+    return tmp_path
+
+
+def write_docs(patents):
+    with PatentWriter(docs_path('invention')) as writer:
+        writer.write_all(patents)
+
+
+def processor():
+    return DocumentProcessor(chunk_size=120, chunk_overlap=10, workers=1, duplicate_threshold=0.9)
+
+
+def last_change():
+    with open(ChangeLog('invention').path, encoding='utf-8') as f:
+        return json.loads(f.readlines()[-1])
+
+
+def test_first_run_processes_everything(dirs):
+    write_docs([make_patent('I100001'), make_patent('I100002')])
+
+    result = processor().update_section('invention')
+
+    assert result['documents'] == {'processed': 2, 'reused': 0, 'removed': 0}
+    assert last_change()['full'] is True
+
+
+def test_unchanged_documents_are_reused(dirs):
+    write_docs([make_patent('I100001'), make_patent('I100002')])
+    processor().update_section('invention')
+    store = source_fingerprint('invention')
+    chunks = list(iter_chunks('invention'))
+    ChangeLog('invention').mark_indexed(store)
+
+    result = processor().update_section('invention')
+
+    assert result['documents'] == {'processed': 0, 'reused': 2, 'removed': 0}
+    # Nothing changed: the store and the change log are left alone
+    assert source_fingerprint('invention') == store
+    assert list(iter_chunks('invention')) == chunks
+    assert ChangeLog('invention').pending(store) == set()
+
+
+def test_changes_and_tombstones(dirs):
+    write_docs([make_patent('I100001'), make_patent('I100002'), make_patent('I100003')])
+    processor().update_section('invention')
+    ChangeLog('invention').mark_indexed(source_fingerprint('invention'))
+    before = {chunk_id(chunk) for chunk in iter_chunks('invention')}
+
+    # I100002 edited, I100003 removed, I100004 added
+    updated = [make_patent('I100001'), make_patent('I100002', '2. 如請求項1所述之電池模組。'),
+               make_patent('I100004')]
+    write_docs(updated)
+    result = processor().update_section('invention')
+
+    assert result['documents'] == {'processed': 2, 'reused': 1, 'removed': 1}
+    change = last_change()
+    assert change['changed'] == ['I100002', 'I100004']
+    assert change['removed'] == ['I100003']
+    assert ChangeLog('invention').pending(source_fingerprint('invention')) == {'I100002', 'I100003', 'I100004'}
+
+    # The store is what a full run over the new documents produces
+    after = [chunk_id(chunk) for chunk in iter_chunks('invention')]
+    full = [chunk_id(chunk) for chunk in processor().iter_document_chunks(updated)]
+    assert after == full
+    assert {cid for cid in before if cid.startswith('I100001:')} <= set(after)
+    assert not any(cid.startswith('I100003:') for cid in after)
+
+
+def test_full_run_ignores_manifest(dirs):
+    write_docs([make_patent('I100001')])
+    processor().update_section('invention')
+
+    result = processor().update_section('invention', full=True)
+
+    assert result['documents'] == {'processed': 1, 'reused': 0, 'removed': 0}
+    assert last_change()['full'] is True
+
+
+def test_config_change_reprocesses_everything(dirs):
+    write_docs([make_patent('I100001'), make_patent('I100002')])
+    processor().update_section('invention')
+
+    other = DocumentProcessor(chunk_size=200, chunk_overlap=10, workers=1, duplicate_threshold=0.9)
+    result = other.update_section('invention')
+
+    assert result['documents']['processed'] == 2
+    assert result['documents']['reused'] == 0
+
+
+def test_invalidated_log_forces_a_full_diff(dirs):
+    write_docs([make_patent('I100001')])
+    processor().update_section('invention')
+    store = source_fingerprint('invention')
+    ChangeLog('invention').mark_indexed(store)
+    assert ChangeLog('invention').pending(store) == set()
+
+    # e.g. after `ingest` wrote to the index directly
+    ChangeLog('invention').invalidate()
+
+    assert ChangeLog('invention').pending(store) is None
+    assert last_change()['full'] is True
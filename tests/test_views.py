@@ -0,0 +1,117 @@
+"""
+Query views: filters reach RAGEngine.query() from the API and the web form.
+"""
+import pytest
+
+from rag import views
+
+RESULT = {
+    'answer': '找到 1 筆相關專利',
+    'sources': [{
+        'title': '散熱裝置',
+        'url': 'https://example.test/I100001',
+        'section': 'invention',
+        'excerpt': '一種散熱裝置',
+        'patent_number': 'I100001',
+    }],
+    'response_time_ms': 12,
+}
+
+
+class FakeEngine:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def query(self, question, filters=None):
+        self.calls.append((question, filters))
+        if self.error:
+            raise self.error
+        return RESULT
+
+
+@pytest.fixture(autouse=True)
+def static_storage(settings):
+    # The manifest storage needs collectstatic; templates only need URLs here
+    settings.STORAGES = dict(settings.STORAGES, staticfiles={
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    })
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(views, '_get_rag_engine', lambda: engine)
+    return engine
+
+
+def test_api_query_passes_filters(client, engine):
+    response = client.post('/api/query/', {
+        'question': '散熱',
+        'sections': ['invention', 'utility'],
+        'year_from': 2020,
+        'year_to': 2023,
+    }, content_type='application/json')
+
+    assert response.status_code == 200
+    assert response.json()['answer'] == RESULT['answer']
+    assert engine.calls == [('散熱', {'sections': ['invention', 'utility'], 'year_from': 2020, 'year_to': 2023})]
+
+
+def test_api_query_without_filters(client, engine):
+    response = client.post('/api/query/', {'question': '散熱'}, content_type='application/json')
+
+    assert response.status_code == 200
+    assert engine.calls == [('散熱', {})]
+
+
+def test_api_query_rejects_invalid_year(client, engine):
+    response = client.post('/api/query/', {'question': '散熱', 'year_from': 'soon'},
+                           content_type='application/json')
+
+    assert response.status_code == 400
+    assert engine.calls == []
+
+
+def test_api_query_engine_not_ready(client, monkeypatch):
+    engine = FakeEngine(error=ValueError('Vector database not initialized.'))
+    monkeypatch.setattr(views, '_get_rag_engine', lambda: engine)
+
+    response = client.post('/api/query/', {'question': '散熱'}, content_type='application/json')
+
+    assert response.status_code == 503
+
+
+def test_form_query_passes_filters(client, engine):
+    response = client.post('/query/', {
+        'question': '散熱',
+        'sections': ['utility'],
+        'year_from': '2021',
+        'year_to': '',
+    })
+
+    assert response.status_code == 200
+    assert engine.calls == [('散熱', {'sections': ['utility'], 'year_from': 2021})]
+    assert RESULT['answer'] in response.content.decode('utf-8')
+
+
+def test_form_query_without_filters(client, engine):
+    response = client.post('/query/', {'question': '散熱'})
+
+    assert response.status_code == 200
+    assert engine.calls == [('散熱', {})]
+
+
+def test_form_query_rejects_invalid_year(client, engine):
+    response = client.post('/query/', {'question': '散熱', 'year_to': '99'})
+
+    assert response.status_code == 200
+    assert '篩選條件無效' in response.content.decode('utf-8')
+    assert engine.calls == []
+
+
+def test_form_query_requires_question(client, engine):
+    response = client.post('/query/', {'question': '  '})
+
+    assert '請輸入問題' in response.content.decode('utf-8')
+    assert engine.calls == []
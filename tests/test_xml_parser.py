@@ -0,0 +1,54 @@
+"""
+Streaming patent XML parser against the ElementTree reference implementation.
+"""
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+
+from rag.services.synthetic_xml import generate_corpus
+from rag.services.tipo_xml_parser import TIPOXMLParser
+
+SAMPLES = sorted((Path(settings.BASE_DIR) / 'data').glob('test_*/**/*.xml'))
+
+
+@pytest.fixture(scope='module')
+def synthetic(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('synthetic')
+    generate_corpus(directory, files=40, seed=7, period_size=20,
+                    types=('invention', 'utility', 'design'))
+    return TIPOXMLParser().find_xml_files(str(directory))
+
+
+@pytest.mark.parametrize('xml_file', SAMPLES, ids=lambda path: path.name)
+def test_sample_files_match_tree_parser(xml_file):
+    parser = TIPOXMLParser()
+
+    streamed = parser.parse_patent_xml(str(xml_file))
+
+    assert streamed is not None
+    assert streamed == parser.parse_patent_xml_tree(str(xml_file))
+
+
+def test_synthetic_corpus_matches_tree_parser(synthetic):
+    parser = TIPOXMLParser()
+
+    assert len(synthetic) == 40
+    for xml_file in synthetic:
+        assert parser.parse_patent_xml(xml_file) == parser.parse_patent_xml_tree(xml_file), xml_file
+
+
+def test_parse_from_open_file(synthetic):
+    parser = TIPOXMLParser()
+
+    with open(synthetic[0], 'rb') as f:
+        assert parser.parse_patent_xml(synthetic[0], f) == parser.parse_patent_xml(synthetic[0])
+
+
+def test_malformed_xml(tmp_path):
+    xml_file = tmp_path / 'broken.xml'
+    xml_file.write_text('<?xml version="1.0"?><Patent><Title>散熱', encoding='utf-8')
+    parser = TIPOXMLParser()
+
+    assert parser.parse_patent_xml(str(xml_file)) is None
+    assert parser.parse_patent_xml_tree(str(xml_file)) is None